@@ -0,0 +1,111 @@
+"""
+Pull Throughput Benchmark
+Runs the real pull path (market paging + concurrent candle fetches)
+against mock_kalshi_server for a range of concurrency settings and
+reports markets/sec, requests/sec and how often the server pushed back.
+No network or cache is involved, so numbers are comparable run to run.
+
+    python src/bench_pull.py
+    python src/bench_pull.py --latency 0.08 --rate-limit 20 --in-flight 1 4 8 16
+    python src/bench_pull.py --error-rate 0.05 --period-interval 60
+"""
+
+import argparse
+import time
+from datetime import datetime, timezone, timedelta
+
+from candle_decode import candles_to_frame
+from kalshi_client import CircuitBreaker, KalshiClient
+from kalshi_fetch import fetch_candles_chunked, fetch_panel_pages
+from mock_kalshi_server import MockKalshiServer
+
+
+def bench_once(server, series, in_flight, client_rate, period_interval, days_back):
+    """One full pull of `series` from `server`; returns a result row"""
+    # Backoff and breaker pauses scaled down so we time the pull path, not sleeps
+    client = KalshiClient(base=server.url, rate=client_rate, burst=max(1, int(client_rate)),
+                          pool_size=max(in_flight, 1), backoff_base=0.01,
+                          breaker=CircuitBreaker(cooldown=1.0))
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=days_back)
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+
+    def pull(series_ticker, market_ticker, s, e, finalized=False):
+        data = fetch_candles_chunked(client, series_ticker, market_ticker, s, e,
+                                     period_interval=period_interval, finalized=finalized)
+        return candles_to_frame(data)
+
+    before = dict(server.stats)
+    t0 = time.perf_counter()
+    panel = fetch_panel_pages(client.iter_market_pages(series), series, start_ts, end_ts,
+                              pull, max_in_flight=in_flight, select=_with_threshold)
+    elapsed = time.perf_counter() - t0
+    client.close()
+
+    delta = {k: server.stats[k] - before[k] for k in server.stats}
+    markets = panel["ticker"].nunique() if not panel.empty else 0
+    return {
+        "in_flight": in_flight,
+        "seconds": elapsed,
+        "markets": markets,
+        "rows": len(panel),
+        "markets_per_s": markets / elapsed,
+        "requests_per_s": delta["requests"] / elapsed,
+        "throttled": delta["throttled"],
+        "errors": delta["errors"],
+    }
+
+
+def _with_threshold(page):
+    page = page.copy()
+    page["threshold"] = page["title"].str.extract(r"above\s*([0-9.]+)", expand=False).astype(float)
+    return page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pulls against the mock Kalshi API")
+    parser.add_argument("--series", default="KXU3")
+    parser.add_argument("--in-flight", type=int, nargs="*", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--client-rate", type=float, default=1000.0,
+                        help="client token-bucket rate (requests/sec)")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate-limit", type=float, help="server requests/sec before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--period-interval", type=int, default=1440)
+    parser.add_argument("--days-back", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    server = MockKalshiServer(latency=args.latency, jitter=args.jitter,
+                              rate_limit=args.rate_limit, error_rate=args.error_rate,
+                              page_size=args.page_size, months=args.months).start()
+    print("=" * 70)
+    print(f"Mock API {server.url}: latency {args.latency}s ±{args.jitter}s, "
+          f"rate limit {args.rate_limit or 'none'}, error rate {args.error_rate}, "
+          f"page size {args.page_size}")
+    print("=" * 70)
+
+    results = []
+    try:
+        for n in args.in_flight:
+            print(f"\n--- max_in_flight={n} ---")
+            results.append(bench_once(server, args.series, n, args.client_rate,
+                                      args.period_interval, args.days_back))
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 70)
+    print(f"{'in_flight':>9} {'seconds':>8} {'markets':>8} {'rows':>7} "
+          f"{'mkts/s':>8} {'req/s':>8} {'429s':>6} {'5xx':>5}")
+    for r in results:
+        print(f"{r['in_flight']:>9} {r['seconds']:>8.2f} {r['markets']:>8} {r['rows']:>7} "
+              f"{r['markets_per_s']:>8.1f} {r['requests_per_s']:>8.1f} "
+              f"{r['throttled']:>6} {r['errors']:>5}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Black-Scholes
+Vectorised Black-Scholes over whole option chains: every function takes
+arrays (or scalars) that broadcast against each other, so a chain of
+strikes x expiries x dates is one call. σ and T are annualised, rates
+continuously compounded.
+
+    prob_above  N(d2), the risk-neutral P(S_T > K) that docs/main.tex
+                compares with Kalshi's P(X > x)
+    price, delta, vega
+
+    python src/black_scholes.py --chain data/fixtures/options --probs-out data/options_probs.parquet
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def _pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def d1_d2(S, K, T, sigma, r=0.0, q=0.0):
+    """d1, d2; NaN where T or σ is not positive"""
+    S, K, T, sigma = (np.asarray(a, dtype=np.float64) for a in (S, K, T, sigma))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vol = np.where((T > 0) & (sigma > 0), sigma * np.sqrt(T), np.nan)
+        d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol
+    return d1, d1 - vol
+
+
+def _terms(S, K, T, sigma, r=0.0, q=0.0):
+    """d1, d2, discounted spot S·e^{-qT} and strike K·e^{-rT}: shared by every formula below"""
+    d1, d2 = d1_d2(S, K, T, sigma, r, q)
+    T = np.asarray(T, dtype=np.float64)
+    return d1, d2, S * np.exp(-q * T), K * np.exp(-r * T)
+
+
+def _price(n1, n2, fs, dk, call):
+    """Value from N(d1), N(d2) and the discounted spot/strike"""
+    c = fs * n1 - dk * n2
+    return np.where(call, c, c - fs + dk)  # put from parity
+
+
+def _delta(n1, disc_q, call):
+    return np.where(call, disc_q * n1, disc_q * (n1 - 1.0))
+
+
+def _vega(d1, fs, T):
+    return fs * _pdf(d1) * np.sqrt(T)
+
+
+def prob_above(S, K, T, sigma, r=0.0, q=0.0):
+    """Risk-neutral probability the underlying finishes above K: N(d2)"""
+    return ndtr(d1_d2(S, K, T, sigma, r, q)[1])
+
+
+def price(S, K, T, sigma, r=0.0, q=0.0, call=True):
+    """Option value; `call` is a bool or boolean array (False = put)"""
+    d1, d2, fs, dk = _terms(S, K, T, sigma, r, q)
+    return _price(ndtr(d1), ndtr(d2), fs, dk, call)
+
+
+def delta(S, K, T, sigma, r=0.0, q=0.0, call=True):
+    d1, _ = d1_d2(S, K, T, sigma, r, q)
+    return _delta(ndtr(d1), np.exp(-q * np.asarray(T)), call)
+
+
+def vega(S, K, T, sigma, r=0.0, q=0.0):
+    """∂price/∂σ (per 1.00 of vol), same for calls and puts"""
+    d1, _, fs, _ = _terms(S, K, T, sigma, r, q)
+    return _vega(d1, fs, T)
+
+
+def chain_greeks(chain, sigma=None):
+    """
+    N(d2), delta, vega (and model price) for every contract of a chain
+    frame from option_chain.load_chain, in one broadcast. `sigma` defaults
+    to the chain's iv column.
+    """
+    S = chain["underlying"].to_numpy(np.float64)
+    K = chain["strike"].to_numpy(np.float64)
+    T = chain["T"].to_numpy(np.float64)
+    r = chain["rate"].to_numpy(np.float64)
+    q = chain["div_yield"].to_numpy(np.float64)
+    call = chain["type"].to_numpy() == "C"
+    sigma = chain["iv"].to_numpy(np.float64) if sigma is None else np.asarray(sigma)
+
+    d1, d2, fs, dk = _terms(S, K, T, sigma, r, q)
+    n1, n2 = ndtr(d1), ndtr(d2)
+    return pd.DataFrame({
+        "prob": n2,
+        "delta": _delta(n1, np.exp(-q * T), call),
+        "vega": _vega(d1, fs, T),
+        "model_price": _price(n1, n2, fs, dk, call),
+    }, index=chain.index)
+
+
+def nearest_expiry(chain, min_days=1):
+    """Rows of each date's nearest expiry at least `min_days` out"""
+    days = (chain["expiry"] - chain["date"]).dt.days
+    c = chain[days >= min_days]
+    first = c.groupby("date")["expiry"].transform("min")
+    return c[c["expiry"] == first]
+
+
+def main(argv=None):
+    from option_chain import load_chain, write_frame
+
+    parser = argparse.ArgumentParser(description="Black-Scholes N(d2)/delta/vega over an option chain")
+    parser.add_argument("--chain", required=True, help="CSV/Parquet file or directory of them")
+    parser.add_argument("--out", help="write every contract's results here (.parquet/.csv)")
+    parser.add_argument("--probs-out",
+                        help="write nearest-expiry P(S_T > K) per date/strike for discrepancy.py")
+    parser.add_argument("--min-days", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"BLACK-SCHOLES N(d2): {args.chain}")
+    print("=" * 70)
+
+    chain = load_chain(args.chain)
+    if chain["iv"].isna().all():
+        print("✗ Chain has no iv column; solve implied vols first")
+        return None
+
+    t0 = time.perf_counter()
+    res = chain_greeks(chain)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(chain)} contracts ({chain['date'].nunique()} dates, "
+          f"{chain['expiry'].nunique()} expiries, {chain['strike'].nunique()} strikes) "
+          f"in {elapsed * 1000:.0f}ms ({len(chain) / elapsed / 1e6:.1f}M contracts/s)")
+
+    out = pd.concat([chain, res], axis=1)
+    if args.out:
+        write_frame(out, args.out)
+        print(f"✓ Saved {args.out}")
+
+    # N(d2) is the same for a call and a put at one strike; keep calls where both exist
+    front = nearest_expiry(out, args.min_days).sort_values("type")
+    front = front.drop_duplicates(subset=["date", "strike"], keep="first")
+    latest = front[front["date"] == front["date"].max()]
+    atm = latest.iloc[(latest["strike"] - latest["underlying"]).abs().argsort()[:5]]
+    print(f"\nLatest {latest['date'].iloc[0].date()}, expiry {latest['expiry'].iloc[0].date()}, "
+          f"spot {latest['underlying'].iloc[0]:.2f}:")
+    print(f"{'Strike':>8} {'IV':>7} {'P(S>K)':>8} {'Delta':>7} {'Vega':>8}")
+    for _, r in atm.sort_values("strike").iterrows():
+        print(f"{r['strike']:>8g} {r['iv']:>7.3f} {r['prob']:>8.4f} {r['delta']:>7.3f} "
+              f"{r['vega']:>8.2f}")
+
+    if args.probs_out:
+        write_frame(front[["date", "strike", "expiry", "prob"]].sort_values(["date", "strike"]),
+                    args.probs_out)
+        print(f"✓ Saved {args.probs_out}")
+    return out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Candle Cache
+Content-addressed on-disk cache for candlestick responses.
+Finalized markets never change, so their candles are kept with no expiry;
+active markets expire after a TTL. Total size is bounded with LRU eviction
+(file mtime is bumped on every hit and used as the recency clock).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = "data/cache/candles"
+MAX_BYTES = 512 * 1024 * 1024
+ACTIVE_TTL = 15 * 60  # seconds
+EVICT_TO = 0.9  # after eviction, total size is at most this fraction of MAX_BYTES
+
+
+def cache_key(series_ticker: str, market_ticker: str, start_ts: int, end_ts: int,
+              period_interval: int):
+    raw = json.dumps([series_ticker, market_ticker, int(start_ts), int(end_ts),
+                      int(period_interval)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CandleCache:
+    """Size-bounded LRU cache of candlestick payloads on disk"""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES, active_ttl=ACTIVE_TTL):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.active_ttl = active_ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = None  # scanned lazily on first write
+
+    def _path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, series_ticker, market_ticker, start_ts, end_ts, period_interval):
+        """Cached payload, or None on miss/expiry"""
+        path = self._path(cache_key(series_ticker, market_ticker, start_ts, end_ts,
+                                    period_interval))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        if not entry["finalized"] and time.time() - entry["fetched_at"] > self.active_ttl:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self.lock:
+            self.hits += 1
+        return entry["payload"]
+
+    def put(self, series_ticker, market_ticker, start_ts, end_ts, period_interval,
+            payload, finalized=False):
+        path = self._path(cache_key(series_ticker, market_ticker, start_ts, end_ts,
+                                    period_interval))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        body = json.dumps({"finalized": bool(finalized), "fetched_at": time.time(),
+                           "payload": payload}).encode()
+
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+
+        with self.lock:
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+
+            if self.total_bytes is None:
+                self.total_bytes = self._scan_size()
+            else:
+                self.total_bytes += len(body) - old
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        return [p for p in self.root.glob("*/*.json") if p.is_file()]
+
+    def _scan_size(self):
+        return sum(p.stat().st_size for p in self._entries())
+
+    def _evict(self):
+        """Drop least recently used entries until under EVICT_TO * max_bytes"""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO
+
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+
+        self.total_bytes = total
+
+    def clear(self):
+        with self.lock:
+            for p in self._entries():
+                p.unlink()
+            self.total_bytes = 0
@@ -0,0 +1,116 @@
+"""
+Candle Decoder
+Turns a Kalshi candlestick payload into typed numpy columns in one pass.
+
+Handles both schema variants we have seen:
+  - nested: end_period_ts, volume, open_interest, and price / yes_bid /
+    yes_ask objects with open/high/low/close (price also mean/previous),
+    in cents or as *_dollars strings
+  - flat:   ts, open, high, low, close, volume, open_interest
+"""
+
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+GROUPS = {
+    "price": ("open", "high", "low", "close", "mean", "previous"),
+    "yes_bid": ("open", "high", "low", "close"),
+    "yes_ask": ("open", "high", "low", "close"),
+}
+PRICE_FIELDS = [f"{g}_{k}" for g, keys in GROUPS.items() for k in keys]
+COUNT_FIELDS = ["volume", "open_interest"]
+FIELDS = ["end_period_ts"] + COUNT_FIELDS + PRICE_FIELDS
+
+_FLAT_PRICE = ("open", "high", "low", "close")
+_EMPTY = {}
+_get = dict.get
+
+
+def _field(dicts, key):
+    """float64 column of one key across dicts, NaN where missing or null"""
+    values = map(_get, dicts, repeat(key), repeat(np.nan))
+    try:
+        return np.fromiter(values, dtype=np.float64, count=len(dicts))
+    except (TypeError, ValueError):
+        # Older numpy won't take None (JSON null) in fromiter
+        return np.array([_get(d, key) for d in dicts], dtype=np.float64)
+
+
+def _nested_columns(candles):
+    cols = {f: _field(candles, f) for f in ("end_period_ts", *COUNT_FIELDS)}
+    for group, keys in GROUPS.items():
+        objs = [c.get(group) or _EMPTY for c in candles]
+        for k in keys:
+            col = _field(objs, k)
+            # Newer responses only carry "0.4500"-style dollar strings; fill
+            # just the gaps, so cent payloads never take this path
+            miss = np.flatnonzero(np.isnan(col))
+            if miss.size == len(objs):
+                col = _field(objs, f"{k}_dollars") * 100.0
+            elif miss.size:
+                col[miss] = _field([objs[i] for i in miss], f"{k}_dollars") * 100.0
+            cols[f"{group}_{k}"] = col
+    return cols
+
+
+def _flat_columns(candles):
+    cols = {"end_period_ts": _field(candles, "ts")}
+    cols.update((f, _field(candles, f)) for f in COUNT_FIELDS)
+    missing = np.full(len(candles), np.nan)
+    for group, keys in GROUPS.items():
+        for k in keys:
+            flat = group == "price" and k in _FLAT_PRICE
+            cols[f"{group}_{k}"] = _field(candles, k) if flat else missing.copy()
+    return cols
+
+
+def decode_candles(payload):
+    """
+    {field: np.ndarray} for every candle field, built one column at a time
+    (one np.fromiter pass per field, no per-candle rows). end_period_ts
+    is int64 and candles without one are dropped; everything else is float64
+    with NaN where the field was missing. Prices stay in cents.
+    """
+    candles = payload.get("candlesticks", []) if isinstance(payload, dict) else payload
+    if not candles:
+        return {f: np.empty(0, dtype=np.int64 if f == "end_period_ts" else np.float64)
+                for f in FIELDS}
+
+    nested = "end_period_ts" in candles[0] or "price" in candles[0]
+    cols = _nested_columns(candles) if nested else _flat_columns(candles)
+
+    keep = ~np.isnan(cols["end_period_ts"])
+    if not keep.all():
+        cols = {f: v[keep] for f, v in cols.items()}
+    cols["end_period_ts"] = cols["end_period_ts"].astype(np.int64)
+    return {f: cols[f] for f in FIELDS}
+
+
+def candles_to_frame(payload):
+    """
+    Panel-ready DataFrame: date, prob_close, end_period_ts (which keeps
+    intraday candles distinct), then every other decoded field with prices
+    converted from cents to probabilities. Candles without a close price
+    are dropped, as before.
+    """
+    cols = decode_candles(payload)
+    ts = cols.pop("end_period_ts")
+    if len(ts) == 0:
+        return pd.DataFrame()
+
+    for f in PRICE_FIELDS:
+        cols[f] = cols[f] / 100.0
+
+    keep = ~np.isnan(cols["price_close"])
+    if not keep.any():
+        return pd.DataFrame()
+
+    df = pd.DataFrame({f: v[keep] for f, v in cols.items()})
+    df.insert(0, "date", (ts[keep] // 86400).astype("datetime64[D]").astype(object))  # UTC dates
+    df.insert(1, "prob_close", df.pop("price_close"))
+    df.insert(2, "end_period_ts", ts[keep])
+    if (np.diff(ts[keep]) < 0).any():
+        df = df.sort_values("end_period_ts").reset_index(drop=True)
+    return df
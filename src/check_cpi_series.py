@@ -1,6 +1,6 @@
 import requests
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from kalshi_client import BASE
 
 # CPI-related series we found
 series_list = [
@@ -0,0 +1,130 @@
+"""
+Cross-Correlation
+All-lags Pearson cross-correlation in one FFT pass, replacing per-lag
+`x.shift(lag).corr(y)` loops.
+
+Lag convention matches those loops: corr[lag] pairs x[t] with y[t + lag],
+so a positive lag means x leads y. Each lag is normalised over its own
+overlap, and NaNs in either series drop just the affected pairs, so the
+result equals pandas' pairwise-complete `.corr` at every lag.
+"""
+
+import numpy as np
+from scipy import fft
+
+
+def _xcorr(a, b, n, max_lag):
+    """sum_i a[..., i] * b[..., i + k] for k = -max_lag..max_lag"""
+    c = fft.irfft(np.conj(fft.rfft(a, n, axis=-1)) * fft.rfft(b, n, axis=-1), n, axis=-1)
+    return np.concatenate([c[..., n - max_lag:], c[..., :max_lag + 1]], axis=-1)
+
+
+def lagged_corr(x, y, max_lag: int, min_periods: int = 2):
+    """
+    Pearson correlation of x[t] with y[t + lag] for every lag in
+    -max_lag..max_lag.
+
+    x and y are arrays (or Series) whose last axis is time; leading axes
+    broadcast, so many series pairs are scanned at once. Returns
+    (lags, corr) with corr shaped (..., 2 * max_lag + 1). Lags with fewer
+    than `min_periods` overlapping pairs, or no variance, are NaN.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x, y = np.broadcast_arrays(x, y)
+    T = x.shape[-1]
+    max_lag = min(int(max_lag), T - 1)
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    mx = ~np.isnan(x)
+    my = ~np.isnan(y)
+    # Centre on the overall means first so the per-lag moments don't cancel badly
+    x0 = np.where(mx, x - np.nanmean(np.where(mx, x, np.nan), axis=-1, keepdims=True), 0.0)
+    y0 = np.where(my, y - np.nanmean(np.where(my, y, np.nan), axis=-1, keepdims=True), 0.0)
+    mx = mx.astype(np.float64)
+    my = my.astype(np.float64)
+
+    n_fft = fft.next_fast_len(T + max_lag, real=True)
+    n = np.rint(_xcorr(mx, my, n_fft, max_lag))
+    sx = _xcorr(x0, my, n_fft, max_lag)
+    sy = _xcorr(mx, y0, n_fft, max_lag)
+    sxx = _xcorr(x0 * x0, my, n_fft, max_lag)
+    syy = _xcorr(mx, y0 * y0, n_fft, max_lag)
+    sxy = _xcorr(x0, y0, n_fft, max_lag)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+
+    # FFT round-off can leave tiny positive variances where there are none
+    bad = (n < min_periods) | ~(var > 1e-12 * np.abs(n * sxx * n * syy))
+    corr = np.where(bad, np.nan, np.clip(corr, -1.0, 1.0))
+    return lags, corr
+
+
+def best_lag(lags, corr):
+    """(lag, corr) with the largest |corr| along the last axis (NaN-safe)"""
+    corr = np.asarray(corr)
+    i = np.nanargmax(np.abs(corr), axis=-1)
+    return lags[i], np.take_along_axis(corr, np.expand_dims(i, -1), axis=-1)[..., 0][()]
+
+
+def _window_sums(a, window):
+    """Sum of a[..., t - window + 1 : t + 1] for every t (expanding if window is None)"""
+    c = np.cumsum(a, axis=-1)
+    if window is None or window >= a.shape[-1]:
+        return c
+    out = c.copy()
+    out[..., window:] -= c[..., :-window]
+    return out
+
+
+def rolling_lagged_corr(x, y, max_lag: int, window=None, min_periods=None):
+    """
+    lagged_corr over a sliding window: corr[t, k] is the Pearson correlation
+    of x[s - lag] with y[s] for s in the `window` rows ending at t (all rows
+    up to t when window is None), i.e. pandas'
+    `x.shift(lag).rolling(window).corr(y)` for every lag at once.
+
+    The window sums are differences of running sums, so each step costs
+    O(1) per lag however wide the window. Returns (lags, corr) with corr
+    shaped (T, 2 * max_lag + 1). `min_periods` defaults to the window
+    (2 when expanding).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    T = len(x)
+    max_lag = min(int(max_lag), T - 1)
+    lags = np.arange(-max_lag, max_lag + 1)
+    if min_periods is None:
+        min_periods = window if window is not None else 2
+
+    # xs[k, t] = x[t - lags[k]]
+    xs = np.full((len(lags), T), np.nan)
+    for k, lag in enumerate(lags):
+        if lag >= 0:
+            xs[k, lag:] = x[:T - lag]
+        else:
+            xs[k, :lag] = x[-lag:]
+
+    m = ~(np.isnan(xs) | np.isnan(y))
+    # Centre on the overall means so running sums stay small
+    a = np.where(m, xs - np.nanmean(x), 0.0)
+    b = np.where(m, y - np.nanmean(y), 0.0)
+
+    n = _window_sums(m.astype(np.float64), window)
+    sx = _window_sums(a, window)
+    sy = _window_sums(b, window)
+    sxx = _window_sums(a * a, window)
+    syy = _window_sums(b * b, window)
+    sxy = _window_sums(a * b, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+
+    bad = (n < min_periods) | ~(var > 1e-12 * np.abs(n * sxx * n * syy))
+    corr = np.where(bad, np.nan, np.clip(corr, -1.0, 1.0))
+    return lags, corr.T
@@ -7,7 +7,8 @@ import requests
 import json
 from datetime import datetime, timezone
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from kalshi_client import BASE
+from market_catalog import get_catalog
 
 
 def test_api_connection():
@@ -99,32 +100,20 @@ def search_all_cpi_markets():
     print("Searching for CPI Markets")
     print("=" * 60)
     
-    url = f"{BASE}/markets"
-    params = {"limit": 100, "status": "all"}
-    
     try:
-        r = requests.get(url, params=params, timeout=10)
+        catalog = get_catalog()
+        catalog.sync()
         
-        if r.status_code == 200:
-            data = r.json()
-            markets = data.get("markets", [])
-            
-            # Filter for CPI
-            cpi_markets = [
-                m for m in markets 
-                if "cpi" in str(m.get("title", "")).lower() 
-                or "cpi" in str(m.get("ticker", "")).lower()
-            ]
-            
-            print(f"\nFound {len(cpi_markets)} CPI-related markets:")
-            
-            for m in cpi_markets[:20]:  # Show first 20
-                print(f"\n  Ticker: {m.get('ticker')}")
-                print(f"  Title: {m.get('title')}")
-                print(f"  Series: {m.get('series_ticker')}")
-                print(f"  Event: {m.get('event_ticker')}")
-        else:
-            print(f"Error: {r.text}")
+        # Full-text match on title or ticker, every status
+        cpi_markets = catalog.search("cpi OR kxcpi*").to_dict("records")
+        
+        print(f"\nFound {len(cpi_markets)} CPI-related markets:")
+        
+        for m in cpi_markets[:20]:  # Show first 20
+            print(f"\n  Ticker: {m.get('ticker')}")
+            print(f"  Title: {m.get('title')}")
+            print(f"  Series: {m.get('series_ticker')}")
+            print(f"  Event: {m.get('event_ticker')}")
             
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,245 @@
+"""
+Discrepancy Coefficient
+λ_t = |P_Kalshi,t − P_Options,t| per date and strike (docs/main.tex), with
+rolling statistics that flag when the gap is unusually wide:
+
+    mean, std  over the last `window` bars (pandas rolling, ddof=1)
+    z          (λ − mean) / std
+    pct        share of the window at or below λ
+
+Two modes that agree bar for bar:
+
+- discrepancy_batch: the whole history at once from running sums.
+- DiscrepancyStream: one bar at a time for live data; each update is O(1)
+  in the window length (ring buffer + running sums + a fixed histogram).
+
+λ lies in [0, 1], so the percentile comes from a BINS-bucket histogram of
+the window rather than sorting it. Values sharing λ's bucket are taken as
+spread evenly across it; everything outside the bucket is ranked exactly.
+
+Both sides must be on the same underlying: the ladder's thresholds have
+to fall inside the options' strike range, e.g. an S&P 500 ladder against
+the SPX probabilities from black_scholes.py.
+
+    python src/discrepancy.py --series KXINX --options data/options_probs.parquet
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+WINDOW = 60
+BINS = 200
+MIN_PERIODS = 10
+
+
+def _bin(lam, bins):
+    return np.clip((lam * bins).astype(np.int64), 0, bins - 1)
+
+
+def _stats(n, s, ss, below, same, lam, bins, min_periods):
+    """mean, std, z, pct from window count, sum, sum of squares and histogram ranks"""
+    # λ itself, plus the rest of its bin taken as spread evenly across the bin
+    frac = np.clip(np.nan_to_num(lam) * bins - _bin(np.nan_to_num(lam), bins), 0.0, 1.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        var = np.maximum(ss - s * s / n, 0.0) / (n - 1)
+        std = np.sqrt(var)
+        z = np.where(std > 0, (lam - mean) / std, np.nan)
+        pct = (below + 1 + (same - 1) * frac) / n
+    ok = (n >= min_periods) & ~np.isnan(lam)
+    return {"lambda": lam,
+            "mean": np.where(ok, mean, np.nan),
+            "std": np.where(ok, std, np.nan),
+            "z": np.where(ok, z, np.nan),
+            "pct": np.where(ok, pct, np.nan)}
+
+
+def discrepancy_batch(p_kalshi, p_options, window=WINDOW, bins=BINS, min_periods=MIN_PERIODS):
+    """
+    λ and its rolling statistics over (T, K) aligned probability arrays
+    (dates x strikes, NaN where unquoted). Returns {name: (T, K)}.
+    """
+    lam = np.abs(np.asarray(p_kalshi, dtype=np.float64) - np.asarray(p_options, dtype=np.float64))
+    have = ~np.isnan(lam)
+    v = np.where(have, lam, 0.0)
+
+    def window_sum(a):
+        c = np.cumsum(a, axis=0)
+        out = c.copy()
+        out[window:] -= c[:-window]
+        return out
+
+    n = window_sum(have.astype(np.float64))
+    s = window_sum(v)
+    ss = window_sum(v * v)
+
+    # Per-bin window counts, then the counts strictly below / in each λ's own bin
+    onehot = np.zeros(lam.shape + (bins,))
+    b = _bin(v, bins)
+    np.put_along_axis(onehot, b[..., None], have[..., None].astype(np.float64), axis=-1)
+    hist = window_sum(onehot)
+    below_all = np.cumsum(hist, axis=-1) - hist
+    below = np.take_along_axis(below_all, b[..., None], axis=-1)[..., 0]
+    same = np.take_along_axis(hist, b[..., None], axis=-1)[..., 0]
+
+    return _stats(n, s, ss, below, same, np.where(have, lam, np.nan), bins, min_periods)
+
+
+class DiscrepancyStream:
+    """
+    Incremental λ statistics for K strikes. Feed one bar per update();
+    warm it with history first so live bars continue the same windows.
+    """
+
+    def __init__(self, strikes, window=WINDOW, bins=BINS, min_periods=MIN_PERIODS):
+        self.strikes = np.asarray(strikes, dtype=np.float64)
+        self.window = window
+        self.bins = bins
+        self.min_periods = min_periods
+        K = len(self.strikes)
+        self.ring = np.full((window, K), np.nan)
+        self.pos = 0
+        self.n = np.zeros(K)
+        self.sum = np.zeros(K)
+        self.sumsq = np.zeros(K)
+        self.hist = np.zeros((K, bins))
+        self.bars = 0
+
+    def _resum(self):
+        """Recompute running sums from the ring once per lap so float drift can't build up"""
+        have = ~np.isnan(self.ring)
+        v = np.where(have, self.ring, 0.0)
+        self.n = have.sum(axis=0).astype(np.float64)
+        self.sum = v.sum(axis=0)
+        self.sumsq = (v * v).sum(axis=0)
+
+    def update(self, p_kalshi, p_options):
+        """Add one bar (arrays over strikes); returns {name: (K,)} for it"""
+        lam = np.abs(np.asarray(p_kalshi, dtype=np.float64) -
+                     np.asarray(p_options, dtype=np.float64))
+        rows = np.arange(len(self.strikes))
+
+        old = self.ring[self.pos]
+        gone = ~np.isnan(old)
+        o = np.where(gone, old, 0.0)
+        self.n -= gone
+        self.sum -= o
+        self.sumsq -= o * o
+        self.hist[rows, _bin(o, self.bins)] -= gone
+
+        have = ~np.isnan(lam)
+        v = np.where(have, lam, 0.0)
+        b = _bin(v, self.bins)
+        self.n += have
+        self.sum += v
+        self.sumsq += v * v
+        self.hist[rows, b] += have
+
+        self.ring[self.pos] = lam
+        self.pos = (self.pos + 1) % self.window
+        self.bars += 1
+        if self.pos == 0:
+            self._resum()
+
+        below = np.cumsum(self.hist, axis=-1)[rows, b] - self.hist[rows, b]
+        same = self.hist[rows, b]
+        return _stats(self.n, self.sum, self.sumsq, below, same, lam, self.bins,
+                      self.min_periods)
+
+    def warm(self, p_kalshi, p_options):
+        """Replay the last `window` bars of (T, K) history without keeping the output"""
+        for pk, po in zip(p_kalshi[-self.window:], p_options[-self.window:]):
+            self.update(pk, po)
+        return self
+
+
+def align(kalshi, options):
+    """
+    Put two date x strike probability frames on Kalshi's strikes and their
+    common dates. Options quotes are interpolated linearly in the strike,
+    never extrapolated.
+    """
+    strikes = kalshi.columns.astype(float)
+    opt = options.copy()
+    opt.columns = opt.columns.astype(float)
+    opt = opt.reindex(columns=opt.columns.union(strikes)).sort_index(axis=1)
+    opt = opt.interpolate(method="index", axis=1, limit_area="inside")[strikes]
+    dates = kalshi.index.intersection(opt.index)
+    return kalshi.loc[dates], opt.loc[dates]
+
+
+def to_frame(dates, strikes, result, p_kalshi, p_options):
+    """Long frame: date, strike, p_kalshi, p_options, lambda, mean, std, z, pct"""
+    idx = pd.MultiIndex.from_product([pd.DatetimeIndex(dates), strikes], names=["date", "strike"])
+    out = pd.DataFrame({"p_kalshi": np.ravel(p_kalshi), "p_options": np.ravel(p_options),
+                        **{k: np.ravel(v) for k, v in result.items()}}, index=idx)
+    return out.dropna(subset=["lambda"]).reset_index()
+
+
+def kalshi_front_frame(series_ticker):
+    """Front-event P(X > strike) as a date x strike frame (missing strikes interpolated)"""
+    from implied_moments import fill_missing_strikes, front_events
+    from ladder_density import series_grid
+
+    grid = series_grid(series_ticker)
+    surv = fill_missing_strikes(grid["strikes"], grid["survival"])
+    front, has = front_events(grid, ~np.isnan(surv).all(axis=-1))
+    rows = surv[front, np.arange(len(grid["dates"]))][has]
+    return pd.DataFrame(rows, index=pd.DatetimeIndex(grid["dates"][has], name="date"),
+                        columns=pd.Index(grid["strikes"], name="strike"))
+
+
+def read_options_probs(path):
+    """Long CSV/Parquet of options probabilities (date, strike, prob) as date x strike"""
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"])
+    return df.pivot_table(index="date", columns="strike", values="prob", aggfunc="last")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kalshi vs options discrepancy coefficient λ")
+    parser.add_argument("--series", default="KXINX")
+    parser.add_argument("--options", required=True,
+                        help="CSV/Parquet with date, strike, prob (options-implied P(X > strike)) "
+                             "on the same underlying as --series")
+    parser.add_argument("--window", type=int, default=WINDOW)
+    parser.add_argument("--min-periods", type=int, default=MIN_PERIODS)
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"DISCREPANCY COEFFICIENT λ: {args.series} vs {args.options}")
+    print("=" * 70)
+
+    kalshi, options = align(kalshi_front_frame(args.series), read_options_probs(args.options))
+    if kalshi.empty:
+        print("✗ No overlapping dates")
+        return None
+    print(f"{len(kalshi)} dates x {kalshi.shape[1]} strikes, window {args.window}")
+
+    res = discrepancy_batch(kalshi.to_numpy(), options.to_numpy(), args.window,
+                            min_periods=args.min_periods)
+    out = to_frame(kalshi.index, kalshi.columns, res, kalshi.to_numpy(), options.to_numpy())
+    if out.empty:
+        print("✗ No overlapping strikes (are both inputs on the same underlying?)")
+        return None
+
+    latest = out[out["date"] == out["date"].max()]
+    print(f"\nLatest ({latest['date'].iloc[0].date()}):")
+    print(f"{'Strike':>8} {'Kalshi':>8} {'Options':>8} {'λ':>8} {'z':>7} {'pct':>6}")
+    for _, r in latest.iterrows():
+        flag = "  ← wide" if r["z"] > 2 else ""
+        print(f"{r['strike']:>8g} {r['p_kalshi']:>8.3f} {r['p_options']:>8.3f} "
+              f"{r['lambda']:>8.3f} {r['z']:>7.2f} {r['pct']:>6.2f}{flag}")
+
+    Path("outputs").mkdir(exist_ok=True)
+    out.to_csv(f"outputs/discrepancy_{args.series}.csv", index=False)
+    print(f"\n✓ Saved outputs/discrepancy_{args.series}.csv")
+    return out
+
+
+if __name__ == "__main__":
+    main()
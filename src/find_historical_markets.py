@@ -2,7 +2,7 @@ import requests
 import pandas as pd
 from datetime import datetime
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from kalshi_client import BASE
 
 print("="*70)
 print("SEARCHING FOR MARKETS WITH HISTORICAL DATA")
@@ -1,22 +1,22 @@
 import requests
 import json
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from market_catalog import get_catalog
 
 print("Searching for CPI markets (including closed/historical)...")
 print("=" * 80)
 
-# Search WITHOUT status filter to get ALL markets
-r = requests.get(f"{BASE}/markets", params={"limit": 1000}, timeout=30)
+# Query the local catalog (synced incrementally) instead of paging every market
+catalog = get_catalog()
+error = None
+try:
+    catalog.sync()
+except requests.exceptions.RequestException as e:
+    error = e
 
-if r.status_code == 200:
-    markets = r.json().get("markets", [])
-    print(f"Total markets retrieved: {len(markets)}\n")
-    
-    # Search for CPI in title or ticker
-    cpi_markets = [m for m in markets if 
-                   'cpi' in m.get('title', '').lower() or 
-                   'cpi' in m.get('ticker', '').lower()]
+if error is None:
+    # Full-text match on title or ticker (prefix query also catches KXCPI... tickers)
+    cpi_markets = catalog.search("cpi OR kxcpi*").to_dict("records")
     
     print(f"CPI-related markets found: {len(cpi_markets)}\n")
     
@@ -24,7 +24,7 @@ if r.status_code == 200:
         # Group by series
         series_groups = {}
         for m in cpi_markets:
-            series = m.get('series_ticker', 'unknown')
+            series = m.get('series_ticker') or 'unknown'
             if series not in series_groups:
                 series_groups[series] = []
             series_groups[series].append(m)
@@ -46,11 +46,10 @@ if r.status_code == 200:
     else:
         print("No CPI markets found. Showing sample of what's available:")
         print("-" * 80)
-        for m in markets[:10]:
+        for m in catalog.search(limit=10).to_dict("records"):
             print(f"Title: {m.get('title')}")
             print(f"Ticker: {m.get('ticker')}")
             print(f"Series: {m.get('series_ticker')}")
             print()
 else:
-    print(f"Error: {r.status_code}")
-    print(r.text)
+    print(f"Error: {error}")
@@ -1,6 +1,7 @@
 import requests
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from kalshi_client import BASE
+from market_catalog import get_catalog
 
 # Try to get series ticker from one of the markets
 r = requests.get(f"{BASE}/markets/KXCPICOMBO-26JAN-0224", timeout=30)
@@ -19,16 +20,16 @@ if r.status_code == 200:
         print(f"\n\nSearching for all markets in series: {series}")
         print("=" * 80)
         
-        r2 = requests.get(f"{BASE}/markets", params={"series_ticker": series, "limit": 100}, timeout=30)
-        if r2.status_code == 200:
-            all_markets = r2.json().get("markets", [])
-            print(f"Found {len(all_markets)} markets in this series\n")
-            
-            for m in all_markets[:20]:
-                print(f"Ticker: {m.get('ticker')}")
-                print(f"Title: {m.get('title')[:80]}")
-                print(f"Status: {m.get('status')}")
-                print(f"Close time: {m.get('close_time')}")
-                print()
+        catalog = get_catalog()
+        catalog.sync(series)
+        all_markets = catalog.series_markets(series)
+        print(f"Found {len(all_markets)} markets in this series\n")
+        
+        for m in all_markets[:20]:
+            print(f"Ticker: {m.get('ticker')}")
+            print(f"Title: {m.get('title')[:80]}")
+            print(f"Status: {m.get('status')}")
+            print(f"Close time: {m.get('close_time')}")
+            print()
 else:
     print(f"Error: {r.status_code} - {r.text}")
@@ -0,0 +1,287 @@
+"""
+Batched Granger Causality
+Pure-numpy replacement for `statsmodels.grangercausalitytests` when only
+the ssr F-test is needed. The lagged design (const, y lags, x lags, y) is
+built once per pair; the cross-product matrix for lag p is the one for lag
+p-1 minus a single row, and the restricted and unrestricted OLS for every
+pair are solved as stacked normal equations. One call therefore covers
+every lag of every (threshold, IV column, direction) pair.
+
+F-stats and p-values match statsmodels' `ssr_ftest`: each lag p uses the
+pair's NaN-free rows with the first p dropped, so the sample shrinks with p.
+
+    python src/granger_batch.py --series KXCPICOREYOY --maxlag 5
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from panel_store import read_iv, read_kalshi_panel
+
+IV_COLUMNS = ("VIX", "VIX9D", "VIX1D")
+
+
+def _compact(y, x, diff):
+    """
+    Right-align each pair's rows where both y and x are present, as
+    `DataFrame.dropna()` would, optionally first-differencing afterwards.
+    Returns (y, x, n) with padding zeroed and n valid rows per pair.
+    """
+    valid = ~(np.isnan(y) | np.isnan(x))
+    order = np.argsort(valid, axis=-1, kind="stable")  # missing first, rest in time order
+    y = np.take_along_axis(y, order, axis=-1)
+    x = np.take_along_axis(x, order, axis=-1)
+    n = valid.sum(axis=-1)
+    T = y.shape[-1]
+
+    if diff:
+        y = np.diff(y, axis=-1)
+        x = np.diff(x, axis=-1)
+        T -= 1
+        n = np.maximum(n - 1, 0)
+
+    pad = np.arange(T) < (T - n)[:, None]
+    y = np.where(pad, 0.0, y)
+    x = np.where(pad, 0.0, x)
+
+    # F is scale invariant; standardising keeps the normal equations well conditioned
+    for a in (y, x):
+        cnt = np.maximum(n, 1)[:, None]
+        mean = a.sum(axis=-1, keepdims=True) / cnt
+        a -= np.where(pad, 0.0, mean)
+        sd = np.sqrt((a * a).sum(axis=-1, keepdims=True) / cnt)
+        a /= np.where(sd > 0, sd, 1.0)
+    return y, x, n
+
+
+def lagged_design(y, x, maxlag):
+    """(B, T, K) design: const, y lags 1..maxlag, x lags 1..maxlag, y"""
+    B, T = y.shape
+    Z = np.zeros((B, T, 2 * maxlag + 2))
+    Z[..., 0] = 1.0
+    for k in range(1, maxlag + 1):
+        Z[:, k:, k] = y[:, :-k]
+        Z[:, k:, maxlag + k] = x[:, :-k]
+    Z[..., -1] = y
+    return Z
+
+
+def ssr_from_gram(G, cols, yi):
+    """Residual sum of squares of y on `cols`, from stacked cross-products G"""
+    A = G[:, cols][:, :, cols]
+    b = G[:, cols, yi]
+    beta = np.einsum("bij,bj->bi", np.linalg.pinv(A), b)
+    return G[:, yi, yi] - np.einsum("bi,bi->b", b, beta)
+
+
+def granger_ftest(y, x, maxlag: int, diff: bool = False):
+    """
+    ssr F-test of "x Granger-causes y" for lags 1..maxlag.
+
+    y and x are arrays (or Series) whose last axis is time; leading axes
+    broadcast, so many pairs are tested at once. NaNs drop the row for that
+    pair only. With diff=True each pair is first-differenced after its
+    NaN rows are dropped.
+
+    Returns a dict of arrays shaped (..., maxlag): "F", "pvalue",
+    "df_denom" and "nobs". Lags without enough observations are NaN.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y, x = np.broadcast_arrays(y, x)
+    shape = y.shape[:-1]
+    T = y.shape[-1]
+    y, x, n = _compact(y.reshape(-1, T).copy(), x.reshape(-1, T).copy(), diff)
+    B, T = y.shape
+
+    Z = lagged_design(y, x, maxlag)
+    start = T - n  # first valid row per pair
+    rows = np.arange(B)
+
+    # Rows usable at lag 1; each later lag drops the pair's next-oldest row
+    use = np.arange(T) >= (start + 1)[:, None]
+    G = np.einsum("bt,btk,btl->bkl", use, Z, Z)
+
+    yi = 2 * maxlag + 1
+    F = np.full((B, maxlag), np.nan)
+    df_denom = np.zeros((B, maxlag), dtype=np.int64)
+    nobs = np.zeros((B, maxlag), dtype=np.int64)
+
+    for p in range(1, maxlag + 1):
+        if p > 1:
+            t = start + p - 1
+            z = Z[rows, np.minimum(t, T - 1)] * (t < T)[:, None]
+            G = G - z[:, :, None] * z[:, None, :]
+
+        own = list(range(p + 1))
+        joint = own + list(range(maxlag + 1, maxlag + 1 + p))
+        ssr_r = ssr_from_gram(G, own, yi)
+        ssr_u = ssr_from_gram(G, joint, yi)
+
+        nobs[:, p - 1] = np.maximum(n - p, 0)
+        df = nobs[:, p - 1] - 2 * p - 1
+        df_denom[:, p - 1] = df
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = (ssr_r - ssr_u) / p / (ssr_u / df)
+        F[:, p - 1] = np.where((df > 0) & (ssr_u > 0), np.maximum(f, 0.0), np.nan)
+
+    lags = np.arange(1, maxlag + 1)
+    with np.errstate(invalid="ignore"):
+        pvalue = stats.f.sf(F, lags, np.where(df_denom > 0, df_denom, np.nan))
+
+    out = {"F": F, "pvalue": pvalue, "df_denom": df_denom, "nobs": nobs}
+    return {k: v.reshape(*shape, maxlag) for k, v in out.items()}
+
+
+def rolling_granger(y, x, maxlag: int, window=None):
+    """
+    granger_ftest on every window of `window` consecutive rows (expanding
+    from the first row when window is None), one result per window end.
+
+    Running sums of the design's cross-products are the sufficient
+    statistics: a window's Gram matrix is the difference of two of them, so
+    sliding the window costs O(1) regardless of its width and nothing is
+    refit. y and x must be NaN-free (drop missing rows first).
+
+    Returns a dict of arrays shaped (T, maxlag), NaN where the window is not
+    yet full or too short for the lag.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    T = len(y)
+    y = (y - y.mean()) / (y.std() or 1.0)
+    x = (x - x.mean()) / (x.std() or 1.0)
+
+    Z = lagged_design(y[None], x[None], maxlag)[0]
+    cum = np.zeros((T + 1, Z.shape[1], Z.shape[1]))
+    np.cumsum(Z[:, :, None] * Z[:, None, :], axis=0, out=cum[1:])
+
+    ends = np.arange(T)
+    starts = np.zeros(T, dtype=np.int64) if window is None else ends - window + 1
+    yi = 2 * maxlag + 1
+    F = np.full((T, maxlag), np.nan)
+    df_denom = np.zeros((T, maxlag), dtype=np.int64)
+
+    for p in range(1, maxlag + 1):
+        # statsmodels drops each window's first p rows
+        first = np.clip(starts + p, 0, T)
+        G = cum[ends + 1] - cum[np.minimum(first, ends + 1)]
+        df = (ends + 1 - first) - 2 * p - 1
+        ok = (starts >= 0) & (df > 0)
+
+        own = list(range(p + 1))
+        joint = own + list(range(maxlag + 1, maxlag + 1 + p))
+        ssr_r = ssr_from_gram(G, own, yi)
+        ssr_u = ssr_from_gram(G, joint, yi)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = (ssr_r - ssr_u) / p / (ssr_u / df)
+        ok &= ssr_u > 0
+        F[:, p - 1] = np.where(ok, np.maximum(f, 0.0), np.nan)
+        df_denom[:, p - 1] = np.where(ok, df, 0)
+
+    with np.errstate(invalid="ignore"):
+        pvalue = stats.f.sf(F, np.arange(1, maxlag + 1),
+                            np.where(df_denom > 0, df_denom, np.nan))
+    return {"F": F, "pvalue": pvalue, "df_denom": df_denom}
+
+
+def load_threshold_panel(series_ticker, start=None, end=None):
+    """
+    date x threshold frame of prob_close, keeping the last row per date and
+    threshold as load_and_merge_data does for the median threshold.
+    """
+    k = read_kalshi_panel(series_ticker, start=start, end=end,
+                          columns=["threshold", "prob_close"])
+    k = k.drop_duplicates(subset=["date", "threshold"], keep="last")
+    return k.pivot(index="date", columns="threshold", values="prob_close").sort_index()
+
+
+def threshold_iv_grid(series_ticker, iv_columns=IV_COLUMNS, maxlag=5, diff=True,
+                      start=None, end=None):
+    """
+    Granger tests for every threshold x IV column in both directions, in one
+    batched call. Each pair keeps the dates where both series exist, so a
+    threshold that listed late or an IV index with a short history doesn't
+    truncate the others.
+
+    Returns a long DataFrame: threshold, iv, cause, lag, F, pvalue, nobs.
+    """
+    probs = load_threshold_panel(series_ticker, start, end)
+    iv = read_iv(start=start, end=end).set_index("date").sort_index()
+    iv_columns = [c for c in iv_columns if c in iv.columns]
+    dates = probs.index.intersection(iv.index)
+    if dates.empty or not iv_columns:
+        return pd.DataFrame(columns=["threshold", "iv", "cause", "lag", "F", "pvalue", "nobs"])
+
+    K = probs.loc[dates].to_numpy(dtype=np.float64).T  # (thresholds, T)
+    V = iv.loc[dates, iv_columns].to_numpy(dtype=np.float64).T  # (ivs, T)
+    K, V = np.broadcast_arrays(K[:, None, :], V[None, :, :])
+
+    # Axis 0: 0 = kalshi causes iv, 1 = iv causes kalshi
+    res = granger_ftest(np.stack([V, K]), np.stack([K, V]), maxlag, diff=diff)
+
+    idx = pd.MultiIndex.from_product(
+        [["kalshi", "iv"], probs.columns, iv_columns, range(1, maxlag + 1)],
+        names=["cause", "threshold", "iv", "lag"])
+    out = pd.DataFrame({"F": res["F"].ravel(), "pvalue": res["pvalue"].ravel(),
+                        "nobs": res["nobs"].ravel()}, index=idx).reset_index()
+    return out[["threshold", "iv", "cause", "lag", "F", "pvalue", "nobs"]]
+
+
+def summarize_grid(grid):
+    """Per threshold x IV column x direction: min p-value and the lag it occurs at"""
+    grid = grid.dropna(subset=["pvalue"])
+    best = grid.loc[grid.groupby(["threshold", "iv", "cause"])["pvalue"].idxmin()]
+    return best.sort_values(["cause", "threshold", "iv"],
+                            ascending=[False, True, True]).reset_index(drop=True)
+
+
+def print_summary(best):
+    print(f"\n{'Threshold':<10} {'IV':<7} {'Cause':<7} {'Lag':>4} {'F-stat':>9} "
+          f"{'p-value':>9} {'n':>5}  Result")
+    print("-" * 70)
+    for r in best.itertuples():
+        result = "✓ Significant" if r.pvalue < 0.05 else "✗ Not significant"
+        print(f"{r.threshold:<10g} {r.iv:<7} {r.cause:<7} {r.lag:>4} {r.F:>9.3f} "
+              f"{r.pvalue:>9.4f} {r.nobs:>5}  {result}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Granger tests across thresholds and IV columns")
+    parser.add_argument("--series", default="KXCPICOREYOY")
+    parser.add_argument("--iv", nargs="*", default=list(IV_COLUMNS))
+    parser.add_argument("--maxlag", type=int, default=5)
+    parser.add_argument("--levels", action="store_true",
+                        help="test levels instead of first differences")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--out", default="outputs/granger_grid.csv")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"GRANGER GRID: {args.series} thresholds x {', '.join(args.iv)}")
+    print("=" * 70)
+
+    grid = threshold_iv_grid(args.series, args.iv, args.maxlag, diff=not args.levels,
+                             start=args.start, end=args.end)
+    if grid.empty:
+        print("✗ No overlapping Kalshi and IV data")
+        return grid
+
+    n_pairs = len(grid) // args.maxlag
+    print(f"{n_pairs} tests x {args.maxlag} lags "
+          f"({'levels' if args.levels else 'first differences'})")
+    print_summary(summarize_grid(grid))
+
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    grid.to_csv(args.out, index=False)
+    print(f"\n✓ Saved {args.out}")
+    return grid
+
+
+if __name__ == "__main__":
+    main()
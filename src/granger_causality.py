@@ -5,31 +5,33 @@ Tests whether Kalshi probabilities predict future VIX movements
 
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.stattools import grangercausalitytests
 from statsmodels.tsa.stattools import adfuller
 import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings('ignore')
 
+from cross_corr import best_lag, lagged_corr
+from granger_batch import granger_ftest, print_summary, summarize_grid, threshold_iv_grid
+from panel_store import list_thresholds, read_iv, read_kalshi_panel
 
-def load_and_merge_data():
+SERIES_TICKER = "KXCPICOREYOY"
+
+
+def load_and_merge_data(series_ticker=SERIES_TICKER, start=None, end=None):
     """Load and merge Kalshi and Yahoo data"""
     print("Loading data...")
     
-    kalshi = pd.read_csv("data/kalshi_threshold_panel.csv")
-    iv = pd.read_csv("data/yahoo_iv_proxy.csv")
-    
-    kalshi["date"] = pd.to_datetime(kalshi["date"])
-    iv["date"] = pd.to_datetime(iv["date"])
-    
-    # Use median threshold
-    thresholds = sorted(kalshi["threshold"].unique())
+    # Use median threshold; only that threshold's rows are read from the store
+    thresholds = list_thresholds(series_ticker)
     mid_thr = thresholds[len(thresholds) // 2]
     
-    ksig = kalshi[kalshi["threshold"] == mid_thr][["date", "prob_close"]].copy()
+    ksig = read_kalshi_panel(series_ticker, thresholds=[mid_thr], start=start, end=end,
+                             columns=["prob_close"])
     ksig = ksig.sort_values("date").drop_duplicates(subset=["date"], keep="last")
     ksig = ksig.rename(columns={"prob_close": "kalshi_prob"})
     
+    iv = read_iv(start=start, end=end)
+    
     # Merge
     df = ksig.merge(iv, on="date", how="inner").sort_values("date")
     
@@ -102,36 +104,31 @@ def run_granger_test(data, var1, var2, maxlag=5):
     print(f"Testing with max lag: {maxlag}")
     print(f"Sample size: {len(test_data)}")
     
-    try:
-        results = grangercausalitytests(test_data, maxlag=maxlag, verbose=False)
-        
-        print(f"\n{'Lag':<6} {'F-stat':<12} {'p-value':<12} {'Result'}")
-        print("-" * 50)
-        
-        for lag in range(1, maxlag + 1):
-            # Extract F-test results (ssr_ftest)
-            f_stat = results[lag][0]['ssr_ftest'][0]
-            p_value = results[lag][0]['ssr_ftest'][1]
-            
-            result = "✓ Significant" if p_value < 0.05 else "✗ Not significant"
-            print(f"{lag:<6} {f_stat:<12.4f} {p_value:<12.4f} {result}")
-        
-        # Overall interpretation
-        print("\n" + "="*60)
-        min_pval = min(results[lag][0]['ssr_ftest'][1] for lag in range(1, maxlag + 1))
-        
-        if min_pval < 0.05:
-            print(f"✓ CONCLUSION: {var1} DOES Granger-cause {var2}")
-            print(f"  (Minimum p-value: {min_pval:.4f} < 0.05)")
-        else:
-            print(f"✗ CONCLUSION: {var1} does NOT Granger-cause {var2}")
-            print(f"  (Minimum p-value: {min_pval:.4f} >= 0.05)")
-        
-        return results
+    # All lags in one batched solve; same numbers as statsmodels' ssr_ftest
+    results = granger_ftest(test_data[var2], test_data[var1], maxlag)
+    
+    print(f"\n{'Lag':<6} {'F-stat':<12} {'p-value':<12} {'Result'}")
+    print("-" * 50)
+    
+    for lag in range(1, maxlag + 1):
+        f_stat = results["F"][lag - 1]
+        p_value = results["pvalue"][lag - 1]
         
-    except Exception as e:
-        print(f"✗ Error running test: {e}")
-        return None
+        result = "✓ Significant" if p_value < 0.05 else "✗ Not significant"
+        print(f"{lag:<6} {f_stat:<12.4f} {p_value:<12.4f} {result}")
+    
+    # Overall interpretation
+    print("\n" + "="*60)
+    min_pval = np.nanmin(results["pvalue"])
+    
+    if min_pval < 0.05:
+        print(f"✓ CONCLUSION: {var1} DOES Granger-cause {var2}")
+        print(f"  (Minimum p-value: {min_pval:.4f} < 0.05)")
+    else:
+        print(f"✗ CONCLUSION: {var1} does NOT Granger-cause {var2}")
+        print(f"  (Minimum p-value: {min_pval:.4f} >= 0.05)")
+    
+    return results
 
 
 def compute_lead_lag_correlation(df, var1, var2, max_lag=10):
@@ -143,21 +140,14 @@ def compute_lead_lag_correlation(df, var1, var2, max_lag=10):
     print(f"Lead-Lag Correlation: {var1} vs {var2}")
     print(f"{'='*60}")
     
-    correlations = []
+    # Every lag in one pass: corr[k] pairs var1[t] with var2[t + lag]
+    lags, corrs = lagged_corr(df[var1], df[var2], max_lag)
+    correlations = list(zip(lags.tolist(), corrs.tolist()))
     
     print(f"\n{'Lag':<6} {'Correlation':<15} {'Interpretation'}")
     print("-" * 60)
     
-    for lag in range(-max_lag, max_lag + 1):
-        if lag < 0:
-            # var1 lags var2 (var2 leads)
-            corr = df[var1].corr(df[var2].shift(-lag))
-        else:
-            # var1 leads var2
-            corr = df[var1].shift(lag).corr(df[var2])
-        
-        correlations.append((lag, corr))
-        
+    for lag, corr in correlations:
         if abs(lag) <= 5:  # Print nearby lags
             if lag < 0:
                 interp = f"{var2} leads by {abs(lag)}"
@@ -169,7 +159,7 @@ def compute_lead_lag_correlation(df, var1, var2, max_lag=10):
             print(f"{lag:<6} {corr:<15.4f} {interp}")
     
     # Find max correlation
-    max_corr_lag, max_corr = max(correlations, key=lambda x: abs(x[1]))
+    max_corr_lag, max_corr = best_lag(lags, corrs)
     
     print(f"\n{'='*60}")
     print(f"Maximum correlation: {max_corr:.4f} at lag {max_corr_lag}")
@@ -255,6 +245,16 @@ def main():
     # Test 2: Does VIX → Kalshi? (reverse causality check)
     results_v2k = run_granger_test(df, var2, var1, maxlag=5)
     
+    # Same test for every threshold x IV column, both directions, one batch
+    print("\n" + "="*70)
+    print("ALL THRESHOLDS x IV COLUMNS (first differences)")
+    print("="*70)
+    grid = threshold_iv_grid(SERIES_TICKER, maxlag=5)
+    if not grid.empty:
+        print_summary(summarize_grid(grid))
+        grid.to_csv("outputs/granger_grid.csv", index=False)
+        print(f"\n✓ Saved granger_grid.csv")
+    
     # Lead-lag correlation analysis
     correlations = compute_lead_lag_correlation(df, var1, var2, max_lag=10)
     plot_lead_lag(correlations, var1, var2)
@@ -270,6 +270,7 @@ def main():
     print("2. Who leads whom? (Lead-lag correlation)")
     print("\nNext steps:")
     print("- Review outputs/lead_lag_correlation.png")
+    print("- Review outputs/granger_grid.csv for other thresholds and IV tenors")
     print("- If significant: Kalshi provides predictive signal")
     print("- Calculate arb coefficient (ε) for trading opportunities")
 
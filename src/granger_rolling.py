@@ -0,0 +1,118 @@
+"""
+Rolling Granger / Lead-Lag
+Is the full-sample Kalshi → VIX result stable over time? Sweeps a daily-
+step window (default 120 days, or expanding) over the median-threshold
+changes and records the Granger p-value at each lag plus the lead-lag
+correlations, all from running sufficient statistics.
+
+    python src/granger_rolling.py --series KXU3 --window 120
+    python src/granger_rolling.py --expanding
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from cross_corr import rolling_lagged_corr
+from granger_batch import rolling_granger
+from panel_store import list_thresholds, read_iv, read_kalshi_panel
+
+
+def load_changes(series_ticker):
+    """Median-threshold probability and VIX first differences, as the Granger scripts use"""
+    thresholds = list_thresholds(series_ticker)
+    mid_thr = thresholds[len(thresholds) // 2]
+
+    ksig = read_kalshi_panel(series_ticker, thresholds=[mid_thr], columns=["prob_close"])
+    ksig = ksig.rename(columns={"prob_close": "kalshi_prob"})
+    ksig = ksig.sort_values("date").drop_duplicates(subset=["date"], keep="last")
+
+    df = ksig.merge(read_iv(columns=["VIX"]), on="date", how="inner").sort_values("date")
+    df["kalshi_change"] = df["kalshi_prob"].diff()
+    df["vix_change"] = df["VIX"].diff()
+    return df[["date", "kalshi_change", "vix_change"]].dropna().reset_index(drop=True), mid_thr
+
+
+def sweep(df, window=120, maxlag=5, max_corr_lag=10):
+    """One row per window end: Granger F/p per lag (Kalshi → VIX) and lead-lag correlations"""
+    g = rolling_granger(df["vix_change"], df["kalshi_change"], maxlag, window=window)
+    lags, corr = rolling_lagged_corr(df["kalshi_change"], df["vix_change"], max_corr_lag,
+                                     window=window)
+
+    out = {"date": df["date"]}
+    for p in range(1, maxlag + 1):
+        out[f"F_lag{p}"] = g["F"][:, p - 1]
+        out[f"p_lag{p}"] = g["pvalue"][:, p - 1]
+    for k, lag in enumerate(lags):
+        out[f"corr_{lag}"] = corr[:, k]
+    return pd.DataFrame(out).dropna(subset=["p_lag1"]).reset_index(drop=True)
+
+
+def plot_sweep(res, lag, label, path):
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+
+    ax1.plot(res["date"], res[f"p_lag{lag}"], color="#2E86AB", linewidth=1.5)
+    ax1.axhline(y=0.05, color="red", linestyle="--", linewidth=1, label="p = 0.05")
+    ax1.set_yscale("log")
+    ax1.set_ylabel("p-value (log)", fontsize=12)
+    ax1.set_title(f"Kalshi → VIX Granger p-value at lag {lag} ({label})",
+                  fontsize=14, fontweight="bold")
+    ax1.legend(loc="best")
+    ax1.grid(True, alpha=0.3)
+
+    ax2.plot(res["date"], res[f"corr_{lag}"], color="#A23B72", linewidth=1.5)
+    ax2.axhline(y=0, color="black", linestyle="-", linewidth=0.5)
+    ax2.set_ylabel(f"Correlation at lag {lag}", fontsize=12)
+    ax2.set_xlabel("Window end", fontsize=12)
+    ax2.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches="tight")
+    plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling/expanding Granger and lead-lag sweep")
+    parser.add_argument("--series", default="KXU3")
+    parser.add_argument("--window", type=int, default=120)
+    parser.add_argument("--expanding", action="store_true")
+    parser.add_argument("--maxlag", type=int, default=5)
+    parser.add_argument("--lag", type=int, default=2, help="lag to plot")
+    args = parser.parse_args(argv)
+
+    window = None if args.expanding else args.window
+    label = "expanding" if window is None else f"{window}-day window"
+
+    print("=" * 70)
+    print(f"ROLLING GRANGER / LEAD-LAG: {args.series} ({label})")
+    print("=" * 70)
+
+    df, mid_thr = load_changes(args.series)
+    print(f"Threshold: {mid_thr}, {len(df)} daily changes "
+          f"({df['date'].min().date()} to {df['date'].max().date()})")
+
+    t0 = time.perf_counter()
+    res = sweep(df, window, args.maxlag)
+    print(f"✓ {len(res)} windows x {args.maxlag} lags in {time.perf_counter() - t0:.3f}s")
+    if res.empty:
+        print("✗ Not enough observations for one window")
+        return res
+
+    p = res[f"p_lag{args.lag}"]
+    print(f"\nLag {args.lag}: p < 0.05 in {100 * np.mean(p < 0.05):.0f}% of windows "
+          f"(median p {p.median():.4f}, latest {p.iloc[-1]:.4f})")
+
+    Path("outputs").mkdir(exist_ok=True)
+    suffix = "expanding" if window is None else f"w{window}"
+    res.to_csv(f"outputs/granger_rolling_{suffix}.csv", index=False)
+    plot_sweep(res, args.lag, label, f"outputs/granger_rolling_{suffix}.png")
+    print(f"✓ Saved outputs/granger_rolling_{suffix}.csv and .png")
+    return res
+
+
+if __name__ == "__main__":
+    main()
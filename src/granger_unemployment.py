@@ -1,27 +1,27 @@
 import pandas as pd
-from statsmodels.tsa.stattools import grangercausalitytests, adfuller
+from statsmodels.tsa.stattools import adfuller
 import warnings
 warnings.filterwarnings('ignore')
 
+from granger_batch import granger_ftest
+from panel_store import list_thresholds, read_iv, read_kalshi_panel
+
+SERIES_TICKER = "KXU3"
+
 print("="*70)
 print("GRANGER CAUSALITY - UNEMPLOYMENT MARKETS")
 print("="*70)
 
-# Load data
-kalshi = pd.read_csv("data/kalshi_unemployment_panel.csv")
-iv = pd.read_csv("data/yahoo_iv_proxy.csv")
-
-kalshi["date"] = pd.to_datetime(kalshi["date"])
-iv["date"] = pd.to_datetime(iv["date"])
-
-# Use median threshold
-thresholds = sorted(kalshi["threshold"].unique())
+# Load data (median threshold only, straight from the columnar store)
+thresholds = list_thresholds(SERIES_TICKER)
 mid_thr = thresholds[len(thresholds) // 2]
 
-ksig = kalshi[kalshi["threshold"] == mid_thr][["date", "prob_close"]].copy()
+ksig = read_kalshi_panel(SERIES_TICKER, thresholds=[mid_thr], columns=["prob_close"])
 ksig = ksig.rename(columns={"prob_close": "kalshi_prob"})
 ksig = ksig.sort_values("date").drop_duplicates(subset=["date"], keep="last")
 
+iv = read_iv()
+
 df = ksig.merge(iv, on="date", how="inner").sort_values("date")
 
 print(f"\nDataset: {len(df)} observations")
@@ -42,18 +42,18 @@ print(f"\n{'='*70}")
 print("GRANGER TEST: Does Kalshi → VIX?")
 print(f"{'='*70}")
 
-results = grangercausalitytests(test_data, maxlag=5, verbose=False)
+results = granger_ftest(test_data["vix_change"], test_data["kalshi_change"], maxlag=5)
 
 print(f"\n{'Lag':<6} {'F-stat':<12} {'p-value':<12} {'Result'}")
 print("-" * 50)
 
 for lag in range(1, 6):
-    f_stat = results[lag][0]['ssr_ftest'][0]
-    p_value = results[lag][0]['ssr_ftest'][1]
+    f_stat = results["F"][lag - 1]
+    p_value = results["pvalue"][lag - 1]
     result = "✓ Significant" if p_value < 0.05 else "✗ Not significant"
     print(f"{lag:<6} {f_stat:<12.4f} {p_value:<12.4f} {result}")
 
-min_p = min(results[lag][0]['ssr_ftest'][1] for lag in range(1, 6))
+min_p = min(results["pvalue"][lag - 1] for lag in range(1, 6))
 
 print(f"\n{'='*70}")
 if min_p < 0.05:
@@ -1,10 +1,16 @@
 import pandas as pd
-from statsmodels.tsa.stattools import grangercausalitytests, adfuller
+from statsmodels.tsa.stattools import adfuller
 import matplotlib.pyplot as plt
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from cross_corr import lagged_corr
+from granger_batch import granger_ftest
+from panel_store import list_thresholds, read_iv, read_kalshi_panel
+
+SERIES_TICKER = "KXU3"
+
 def ensure_outputs_dir():
     Path("outputs").mkdir(exist_ok=True)
 
@@ -12,21 +18,16 @@ print("="*70)
 print("GRANGER CAUSALITY - UNEMPLOYMENT (with visualizations)")
 print("="*70)
 
-# Load data
-kalshi = pd.read_csv("data/kalshi_unemployment_panel.csv")
-iv = pd.read_csv("data/yahoo_iv_proxy.csv")
-
-kalshi["date"] = pd.to_datetime(kalshi["date"])
-iv["date"] = pd.to_datetime(iv["date"])
-
-# Use median threshold
-thresholds = sorted(kalshi["threshold"].unique())
+# Load data (median threshold only, straight from the columnar store)
+thresholds = list_thresholds(SERIES_TICKER)
 mid_thr = thresholds[len(thresholds) // 2]
 
-ksig = kalshi[kalshi["threshold"] == mid_thr][["date", "prob_close"]].copy()
+ksig = read_kalshi_panel(SERIES_TICKER, thresholds=[mid_thr], columns=["prob_close"])
 ksig = ksig.rename(columns={"prob_close": "kalshi_prob"})
 ksig = ksig.sort_values("date").drop_duplicates(subset=["date"], keep="last")
 
+iv = read_iv()
+
 df = ksig.merge(iv, on="date", how="inner").sort_values("date")
 
 print(f"\nDataset: {len(df)} observations")
@@ -46,7 +47,7 @@ print(f"\n{'='*70}")
 print("GRANGER TEST: Does Kalshi → VIX?")
 print(f"{'='*70}\n")
 
-results = grangercausalitytests(test_data, maxlag=5, verbose=False)
+results = granger_ftest(test_data["vix_change"], test_data["kalshi_change"], maxlag=5)
 
 # Extract results
 lags = []
@@ -57,8 +58,8 @@ print(f"{'Lag':<6} {'F-stat':<12} {'p-value':<12} {'Result'}")
 print("-" * 50)
 
 for lag in range(1, 6):
-    f_stat = results[lag][0]['ssr_ftest'][0]
-    p_value = results[lag][0]['ssr_ftest'][1]
+    f_stat = results["F"][lag - 1]
+    p_value = results["pvalue"][lag - 1]
     result = "✓ Significant" if p_value < 0.05 else "✗ Not significant"
     
     lags.append(lag)
@@ -117,15 +118,8 @@ plt.close()
 print(f"\n✓ Saved granger_unemployment_pvalues.png")
 
 # 2. Lead-lag correlation plot
-correlations = []
-lag_range = range(-10, 11)
-
-for lag in lag_range:
-    if lag < 0:
-        corr = df["kalshi_change"].corr(df["vix_change"].shift(-lag))
-    else:
-        corr = df["kalshi_change"].shift(lag).corr(df["vix_change"])
-    correlations.append(corr)
+# All lags in one pass; positive lag = Kalshi leads VIX
+lag_range, correlations = lagged_corr(df["kalshi_change"], df["vix_change"], 10)
 
 fig, ax = plt.subplots(figsize=(12, 6))
 colors = ['#2E86AB' if x >= 0 else '#A23B72' for x in lag_range]
@@ -0,0 +1,235 @@
+"""
+Implied Moments
+Summary statistics of each event's implied distribution for every date,
+computed from the full threshold ladder (see ladder_density) rather than
+one median P(X > x):
+
+    mean, std, skew   of the discrete distribution
+    tail_lo, tail_hi  P(X <= lowest strike), P(X > highest strike)
+
+Strikes missing inside a ladder are filled by linear interpolation of
+P(X > strike) between their quoted neighbours. Interior mass sits at bin
+midpoints and each tail half a strike step beyond the outermost quote.
+
+Everything stays on the grid's (event, date) axes. `front_moments`
+collapses that to one date-indexed frame for the nearest unresolved event
+(resolution dates from the market catalog's close times when it has been
+synced, see `event_expiry`), with day-over-day changes taken within an
+event so a roll to the next event is not read as a jump. That frame is what the Granger and lead-lag
+stages take in place of the single-threshold probability.
+
+    python src/implied_moments.py --series KXU3
+"""
+
+import argparse
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from granger_batch import IV_COLUMNS, granger_ftest
+from ladder_density import series_grid
+from panel_store import read_iv
+
+MOMENTS = ("mean", "std", "skew", "tail_lo", "tail_hi")
+MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], 1)}
+
+_EVENT_DATE = re.compile(r"-(\d{2})([A-Z]{3})(\d{2})?$")
+
+
+def catalog_close_times(keys):
+    """
+    {event: close epoch seconds} from the local market catalog, or {} when
+    it hasn't been synced (no API calls are made here).
+    """
+    from market_catalog import CATALOG_PATH, get_catalog
+
+    if not Path(CATALOG_PATH).exists():
+        return {}
+    return get_catalog().event_close_times(str(k) for k in keys)
+
+
+def event_expiry(keys, close_times=None):
+    """
+    Resolution date per event ticker. Events in `close_times` ({event:
+    epoch seconds}, e.g. from catalog_close_times) use their markets'
+    close date. Otherwise the date is parsed from the ticker (KXU3-25JUN,
+    KXFED-25DEC10), and a month-only ticker is taken as that month's end.
+    That is an approximation: KXU3-25JUN resolves on the early-July data
+    release, about a week later. NaT if neither is available.
+    """
+    close_times = close_times or {}
+    out = []
+    for key in keys:
+        if close_times.get(str(key)) is not None:
+            out.append(pd.Timestamp(int(close_times[str(key)]), unit="s").normalize())
+            continue
+        m = _EVENT_DATE.search(str(key))
+        if not m or m.group(2) not in MONTHS:
+            out.append(pd.NaT)
+            continue
+        month = pd.Timestamp(year=2000 + int(m.group(1)), month=MONTHS[m.group(2)], day=1)
+        out.append(month.replace(day=int(m.group(3))) if m.group(3) else
+                   month + pd.offsets.MonthEnd(0))
+    return pd.DatetimeIndex(out)
+
+
+def fill_missing_strikes(strikes, survival):
+    """
+    Linearly interpolate P(X > strike) across strikes at NaNs that have a
+    quote on both sides, for every row at once. Leading/trailing NaNs stay.
+    """
+    s = np.asarray(survival, dtype=np.float64)
+    K = s.shape[-1]
+    have = ~np.isnan(s)
+    pos = np.arange(K)
+
+    prev = np.maximum.accumulate(np.where(have, pos, -1), axis=-1)
+    nxt = np.flip(np.minimum.accumulate(np.flip(np.where(have, pos, K), -1), axis=-1), -1)
+    inside = ~have & (prev >= 0) & (nxt < K)
+
+    p = np.clip(prev, 0, K - 1)
+    n = np.clip(nxt, 0, K - 1)
+    kp, kn = strikes[p], strikes[n]
+    sp = np.take_along_axis(s, p, axis=-1)
+    sn = np.take_along_axis(s, n, axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        interp = sp + (sn - sp) * (strikes - kp) / (kn - kp)
+    return np.where(inside, interp, s)
+
+
+def ladder_moments(strikes, survival, min_strikes=2):
+    """
+    Moments of the distribution implied by P(X > strike) along the last
+    axis. Returns {name: array shaped like survival[..., 0]}; rows with
+    fewer than `min_strikes` quotes are NaN.
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    s = fill_missing_strikes(strikes, survival)
+    have = ~np.isnan(s)
+    K = s.shape[-1]
+    ok = have.sum(axis=-1) >= min_strikes
+
+    first = np.argmax(have, axis=-1)
+    last = K - 1 - np.argmax(np.flip(have, -1), axis=-1)
+    s_first = np.take_along_axis(s, first[..., None], axis=-1)[..., 0]
+    s_last = np.take_along_axis(s, last[..., None], axis=-1)[..., 0]
+
+    step = np.median(np.diff(strikes)) if K > 1 else 1.0
+    mids = (strikes[:-1] + strikes[1:]) / 2
+    inner = np.nan_to_num(s[..., :-1] - s[..., 1:])  # 0 unless both edges quoted
+    tail_lo = 1.0 - s_first
+    tail_hi = s_last
+
+    # Mass and location of every bin: lower tail, interior midpoints, upper tail
+    mass = np.concatenate([tail_lo[..., None], inner, tail_hi[..., None]], axis=-1)
+    x = np.concatenate([(strikes[first] - step / 2)[..., None],
+                        np.broadcast_to(mids, inner.shape),
+                        (strikes[last] + step / 2)[..., None]], axis=-1)
+    mass = np.where(ok[..., None], mass, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = mass.sum(axis=-1)
+        mean = (mass * x).sum(axis=-1) / total
+        dev = x - mean[..., None]
+        var = (mass * dev ** 2).sum(axis=-1) / total
+        skew = (mass * dev ** 3).sum(axis=-1) / total / var ** 1.5
+
+    out = {"mean": mean, "std": np.sqrt(var), "skew": skew,
+           "tail_lo": tail_lo, "tail_hi": tail_hi}
+    return {k: np.where(ok, v, np.nan) for k, v in out.items()}
+
+
+def grid_moments(grid, min_strikes=2):
+    """ladder_moments over a density grid: {name: (E, D)} aligned with grid['key'], grid['dates']"""
+    return ladder_moments(grid["strikes"], grid["survival"], min_strikes)
+
+
+def front_events(grid, quoted, close_times=None):
+    """
+    Index of the nearest unresolved event per date among those with
+    `quoted` (E, D) data, and whether there is one. Events order by
+    resolution date (`close_times` defaults to catalog_close_times);
+    unparsable tickers sort last by name. An event is live through its
+    resolution day.
+    """
+    dates = pd.DatetimeIndex(grid["dates"])
+    if close_times is None:
+        close_times = catalog_close_times(grid["key"])
+    expiry = event_expiry(grid["key"], close_times)
+    order = np.lexsort((grid["key"], expiry.isna(), expiry.fillna(pd.Timestamp.max)))
+
+    live = quoted[order] & ~(expiry[order].to_numpy()[:, None] < dates.to_numpy()[None, :])
+    return order[np.argmax(live, axis=0)], live.any(axis=0)
+
+
+def front_moments(grid, moments=None):
+    """
+    Date-indexed frame of the nearest unresolved event's moments, plus
+    their day-over-day changes within that event (d_mean, d_std, ...).
+    """
+    moments = moments or grid_moments(grid)
+    front, has = front_events(grid, ~np.isnan(moments["mean"]))
+    cols = np.arange(len(grid["dates"]))
+
+    out = pd.DataFrame({"event": np.where(has, grid["key"][front], None)},
+                       index=pd.DatetimeIndex(grid["dates"], name="date"))
+    for name in MOMENTS:
+        m = moments[name]
+        change = np.diff(m, axis=1, prepend=np.nan)  # NaN when the event wasn't quoted the day before
+        out[name] = np.where(has, m[front, cols], np.nan)
+        out[f"d_{name}"] = np.where(has, change[front, cols], np.nan)
+    return out[has]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Implied moments from Kalshi threshold ladders")
+    parser.add_argument("--series", default="KXU3")
+    parser.add_argument("--maxlag", type=int, default=5)
+    parser.add_argument("--min-strikes", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"IMPLIED MOMENTS: {args.series}")
+    print("=" * 70)
+
+    grid = series_grid(args.series)
+    moments = grid_moments(grid, args.min_strikes)
+    front = front_moments(grid, moments)
+    if front.empty:
+        print("✗ No ladder with enough strikes")
+        return front
+
+    print(f"{len(grid['key'])} events, {len(front)} dates with a front event")
+    print(front[["event", *MOMENTS]].tail(5).to_string(float_format=lambda v: f"{v:.4f}"))
+
+    Path("outputs").mkdir(exist_ok=True)
+    front.to_csv(f"outputs/implied_moments_{args.series}.csv")
+    print(f"\n✓ Saved outputs/implied_moments_{args.series}.csv")
+
+    # Do moment changes lead IV changes? One batched test for every pair.
+    iv = read_iv().set_index("date").sort_index()
+    iv_cols = [c for c in IV_COLUMNS if c in iv.columns]
+    df = front.join(iv[iv_cols].diff(), how="inner")
+    names = ["d_mean", "d_std", "d_skew"]
+    X = df[names].to_numpy().T[:, None, :]
+    Y = df[iv_cols].to_numpy().T[None, :, :]
+    res = granger_ftest(Y, X, args.maxlag)
+
+    print(f"\nGranger: implied-moment changes → IV changes (min p over lags 1..{args.maxlag})")
+    print(f"{'Moment':<8} " + " ".join(f"{c:>14}" for c in iv_cols))
+    print("-" * (9 + 15 * len(iv_cols)))
+    for i, name in enumerate(names):
+        cells = []
+        for j in range(len(iv_cols)):
+            p = res["pvalue"][i, j]
+            lag = int(np.nanargmin(p)) + 1 if np.isfinite(p).any() else 0
+            cells.append(f"{np.nanmin(p):>8.4f} (l{lag})" if lag else f"{'-':>14}")
+        print(f"{name:<8} " + " ".join(f"{c:>14}" for c in cells))
+    return front
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Implied Volatility
+Inverts Black-Scholes for every contract of a chain at once, so N(d2) can
+use strike-specific σ rather than VIX.
+
+- Every price is mapped by parity to the out-of-the-money option at its
+  strike (call above the forward, put below), which is all time value and
+  so keeps σ well determined.
+- Start from the Corrado-Miller rational approximation.
+- Newton steps (price error / vega), safeguarded by a per-contract bracket
+  that every evaluation tightens. Contracts whose Newton step would leave
+  the bracket, or whose vega is too flat to trust, bisect instead (a mask,
+  not a branch).
+- Only unconverged contracts are evaluated on later iterations.
+
+Status per contract: 0 converged, 1 price outside no-arbitrage bounds,
+2 not converged within max_iter, 3 missing inputs, 4 no time value left
+(σ can't be recovered from the price).
+
+    python src/implied_vol.py --chain data/fixtures/options
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from black_scholes import SQRT_2PI, chain_greeks
+
+SIGMA_LO = 1e-4
+SIGMA_HI = 5.0
+TOL = 1e-10
+MAX_ITER = 50
+TIME_VALUE_FLOOR = 1e-12  # out-of-the-money price / discounted spot
+
+CONVERGED, OUT_OF_BOUNDS, NOT_CONVERGED, MISSING, NO_TIME_VALUE = 0, 1, 2, 3, 4
+
+
+def _otm_vega(fs, dk, T, sigma, put):
+    """Out-of-the-money price (put where `put`, else call) and vega from discounted spot/strike"""
+    vol = sigma * np.sqrt(T)
+    d1 = np.log(fs / dk) / vol + 0.5 * vol
+    d2 = d1 - vol
+    value = np.where(put, dk * ndtr(-d2) - fs * ndtr(-d1), fs * ndtr(d1) - dk * ndtr(d2))
+    return value, fs * np.exp(-0.5 * d1 * d1) / SQRT_2PI * np.sqrt(T)
+
+
+def initial_guess(c, fs, dk, T):
+    """Corrado-Miller approximation from the call price, clipped to the search range"""
+    m = c - (fs - dk) / 2
+    root = np.sqrt(np.maximum(m * m - (fs - dk) ** 2 / np.pi, 0.0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        guess = np.sqrt(2 * np.pi / T) / (fs + dk) * (m + root)
+    return np.clip(np.nan_to_num(guess, nan=0.2), 0.01, 2.0)
+
+
+def implied_vol(prices, S, K, T, r=0.0, q=0.0, call=True, tol=TOL, max_iter=MAX_ITER,
+                lo=SIGMA_LO, hi=SIGMA_HI):
+    """
+    σ for every option price (arrays broadcast). Returns (iv, status, iterations);
+    iv is NaN unless status is CONVERGED.
+    """
+    prices, S, K, T, r, q, call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=np.float64) for a in (prices, S, K, T, r, q)),
+        np.asarray(call, dtype=bool))
+    shape = prices.shape
+    prices, S, K, T, r, q, call = (a.ravel() for a in (prices, S, K, T, r, q, call))
+
+    fs = S * np.exp(-q * T)
+    dk = K * np.exp(-r * T)
+    put = fs > dk  # the call is in the money, so solve on the put
+    otm = np.where(call == put, prices - np.where(call, fs - dk, dk - fs), prices)
+
+    n = len(otm)
+    iv = np.full(n, np.nan)
+    status = np.full(n, NOT_CONVERGED, dtype=np.int8)
+    iters = np.zeros(n, dtype=np.int16)
+
+    missing = np.isnan(otm) | ~(T > 0) | ~(fs > 0) | ~(dk > 0)
+    status[missing] = MISSING
+    with np.errstate(invalid="ignore", divide="ignore"):
+        v_lo = _otm_vega(fs, dk, T, lo, put)[0]
+        v_hi = _otm_vega(fs, dk, T, hi, put)[0]
+        flat = ~missing & (otm <= TIME_VALUE_FLOOR * fs) & (otm >= -tol * fs)
+        outside = ~missing & ~flat & ((otm < v_lo - tol * fs) | (otm > v_hi + tol * fs))
+    status[flat] = NO_TIME_VALUE
+    status[outside] = OUT_OF_BOUNDS
+
+    idx = np.flatnonzero(~missing & ~flat & ~outside)
+    a = np.full(len(idx), lo)
+    b = np.full(len(idx), hi)
+    call_eq = np.where(put, otm + fs - dk, otm)
+    sig = initial_guess(call_eq[idx], fs[idx], dk[idx], T[idx])
+    tgt, f_s, d_k, t, pt = otm[idx], fs[idx], dk[idx], T[idx], put[idx]
+
+    for it in range(1, max_iter + 1):
+        if idx.size == 0:
+            break
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            model, veg = _otm_vega(f_s, d_k, t, sig, pt)
+            err = model - tgt
+
+            # The bracket always holds the root: price is increasing in σ
+            high = err > 0
+            b = np.where(high, sig, b)
+            a = np.where(high, a, sig)
+
+            step = err / veg
+            newton = sig - step
+        bisect = ~np.isfinite(newton) | (newton <= a) | (newton >= b)
+        new = np.where(bisect, 0.5 * (a + b), newton)
+
+        # Converge on σ, not price: far out of the money a loose σ still reprices to ~0
+        done = (np.abs(new - sig) <= tol) | (b - a <= tol) | (err == 0)
+        iv[idx[done]] = np.where(err[done] == 0, sig[done], new[done])
+        status[idx[done]] = CONVERGED
+        iters[idx[done]] = it
+
+        keep = ~done
+        idx, a, b, sig = idx[keep], a[keep], b[keep], new[keep]
+        tgt, f_s, d_k, t, pt = tgt[keep], f_s[keep], d_k[keep], t[keep], pt[keep]
+
+    iters[idx] = max_iter
+    return iv.reshape(shape), status.reshape(shape), iters.reshape(shape)
+
+
+def solve_chain(chain, price_col="mid", **kwargs):
+    """iv_solved, iv_status and iv_iters for every contract of a load_chain frame"""
+    iv, status, iters = implied_vol(
+        chain[price_col].to_numpy(np.float64), chain["underlying"].to_numpy(np.float64),
+        chain["strike"].to_numpy(np.float64), chain["T"].to_numpy(np.float64),
+        chain["rate"].to_numpy(np.float64), chain["div_yield"].to_numpy(np.float64),
+        chain["type"].to_numpy() == "C", **kwargs)
+    return pd.DataFrame({"iv_solved": iv, "iv_status": status, "iv_iters": iters},
+                        index=chain.index)
+
+
+def print_status(solved):
+    counts = solved["iv_status"].value_counts()
+    names = {CONVERGED: "converged", OUT_OF_BOUNDS: "outside arbitrage bounds",
+             NOT_CONVERGED: "not converged", MISSING: "missing inputs",
+             NO_TIME_VALUE: "no time value"}
+    for code, name in names.items():
+        if counts.get(code, 0):
+            print(f"  {name:<26} {counts[code]:>9}")
+    ok = solved["iv_status"] == CONVERGED
+    if ok.any():
+        print(f"  iterations (converged)     mean {solved.loc[ok, 'iv_iters'].mean():.1f}, "
+              f"max {solved.loc[ok, 'iv_iters'].max()}")
+
+
+def main(argv=None):
+    from option_chain import load_chain, write_frame
+
+    parser = argparse.ArgumentParser(description="Batched implied-vol solver for option chains")
+    parser.add_argument("--chain", required=True, help="CSV/Parquet file or directory of them")
+    parser.add_argument("--price", default="mid", help="price column to invert")
+    parser.add_argument("--out", help="write chain + solved iv + N(d2) here (.parquet/.csv)")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"IMPLIED VOL: {args.chain} ({args.price} prices)")
+    print("=" * 70)
+
+    chain = load_chain(args.chain)
+    t0 = time.perf_counter()
+    solved = solve_chain(chain, args.price)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(chain)} contracts in {elapsed * 1000:.0f}ms "
+          f"({len(chain) / elapsed / 1e6:.2f}M contracts/s)")
+    print_status(solved)
+
+    ok = solved["iv_status"] == CONVERGED
+    if chain["iv"].notna().any():
+        diff = (solved["iv_solved"] - chain["iv"])[ok].abs()
+        print(f"\n|solved - quoted iv|: median {diff.median():.2e}, p99 {diff.quantile(0.99):.2e}")
+
+    out = pd.concat([chain, solved], axis=1)
+    out = pd.concat([out, chain_greeks(out, sigma=out["iv_solved"])], axis=1)
+    if args.out:
+        write_frame(out, args.out)
+        print(f"✓ Saved {args.out}")
+    return out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Kalshi API Client
+Shared keep-alive HTTP session with adaptive token-bucket rate limiting
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from candle_cache import CandleCache
+from request_metrics import get_metrics
+
+# KALSHI_API_BASE points everything at another server, e.g. mock_kalshi_server
+BASE = os.environ.get("KALSHI_API_BASE", "https://api.elections.kalshi.com/trade-api/v2")
+RATE_PER_SEC = 10.0  # Kalshi basic tier allows ~20 reads/sec; stay under it
+BURST = 10
+MIN_RATE_PER_SEC = 1.0
+POOL_SIZE = 16
+TIMEOUT = 30
+MAX_THROTTLE_RETRIES = 5
+
+# Transient failures (connection errors, timeouts, 5xx) are retried with
+# full-jitter exponential backoff; sustained failures trip the breaker
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 30.0
+RETRY_STATUSES = (500, 502, 503, 504)
+BREAKER_THRESHOLD = 5  # consecutive failures before the circuit opens
+BREAKER_COOLDOWN = 30.0  # seconds every request waits while open
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Halves its rate on a 429 (and honours Retry-After), then creeps
+    back up towards the configured rate on every successful request.
+    """
+
+    def __init__(self, rate=RATE_PER_SEC, burst=BURST, min_rate=MIN_RATE_PER_SEC):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                else:
+                    wait = (1.0 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """Take a token if one is available, without blocking"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.blocked_until or self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+    def throttled(self, retry_after=None):
+        """Back off after a 429 response"""
+        with self.lock:
+            now = time.monotonic()
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self.tokens = 0.0
+            self.updated = now
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+    def succeeded(self):
+        """Additive increase back towards the configured rate"""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+
+class CircuitBreaker:
+    """
+    Shared across every worker thread. After `threshold` consecutive
+    transient failures the circuit opens and all requests pause for
+    `cooldown` seconds; the next request is a probe, and one more failure
+    re-opens it immediately.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block while the circuit is open"""
+        while True:
+            with self.lock:
+                wait = self.open_until - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def failed(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures < self.threshold:
+                return
+
+            now = time.monotonic()
+            if now >= self.open_until:
+                self.trips += 1
+                print(f"  ⚠ {self.failures} consecutive API failures, "
+                      f"pausing requests for {self.cooldown:g}s")
+            self.open_until = max(self.open_until, now + self.cooldown)
+            # Half-open: one more failure after the pause re-opens it
+            self.failures = self.threshold - 1
+
+    def succeeded(self):
+        with self.lock:
+            self.failures = 0
+
+
+def backoff_delay(attempt: int, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0.0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """Retry-After may be delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class KalshiClient:
+    """Pooled, rate-limited client for the public Kalshi trade API"""
+
+    def __init__(self, base=BASE, rate=RATE_PER_SEC, burst=BURST,
+                 pool_size=POOL_SIZE, timeout=TIMEOUT, cache=None,
+                 max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE, breaker=None):
+        self.base = base.rstrip("/")
+        self.timeout = timeout
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.limiter = TokenBucket(rate=rate, burst=burst)
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path: str, params=None, cache=None):
+        """
+        GET an API path and return the decoded JSON body. 429s slow the
+        token bucket down (and raise once MAX_THROTTLE_RETRIES are used up);
+        only 2xx responses speed it back up. Connection errors, timeouts and
+        5xx responses are retried with jittered backoff and then raised.
+        Other 4xx raise at once.
+        Every call is recorded in request_metrics (`cache` tags it hit/miss).
+        """
+        url = f"{self.base}/{path.lstrip('/')}"
+        throttles = failures = 0
+        latency = wait = 0.0
+        status, nbytes = None, 0
+
+        try:
+            while True:
+                t0 = time.perf_counter()
+                self.breaker.wait()
+                self.limiter.acquire()
+                t1 = time.perf_counter()
+                wait += t1 - t0
+                try:
+                    r = self.session.get(url, params=params, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    latency += time.perf_counter() - t1
+                    status, error = type(e).__name__, e
+                else:
+                    latency += time.perf_counter() - t1
+                    status, nbytes = r.status_code, len(r.content)
+                    if r.status_code == 429:
+                        # Slow down even when out of retries; a 429 is never a success
+                        self.limiter.throttled(parse_retry_after(r.headers.get("Retry-After")))
+                        if throttles < MAX_THROTTLE_RETRIES:
+                            throttles += 1
+                            continue
+                        r.raise_for_status()
+
+                    if r.ok:
+                        self.limiter.succeeded()
+                    if r.status_code not in RETRY_STATUSES:
+                        # A 4xx is our request's fault, not an outage
+                        self.breaker.succeeded()
+                        r.raise_for_status()
+                        return r.json()
+
+                    try:
+                        r.raise_for_status()
+                    except requests.HTTPError as e:
+                        error = e
+
+                self.breaker.failed()
+                if failures >= self.max_retries:
+                    raise error
+                t0 = time.perf_counter()
+                time.sleep(backoff_delay(failures, base=self.backoff_base))
+                wait += time.perf_counter() - t0
+                failures += 1
+        finally:
+            get_metrics().record("kalshi", path, status, latency, nbytes=nbytes,
+                                 retries=throttles + failures, wait=wait, cache=cache)
+
+    def iter_pages(self, path: str, key: str, params=None):
+        """Yield lists under `key` from a cursor-paginated endpoint"""
+        params = dict(params or {})
+        cursor = None
+        while True:
+            if cursor:
+                params["cursor"] = cursor
+            data = self.get(path, params)
+
+            items = data.get(key) or []
+            if items:
+                yield items
+
+            cursor = data.get("cursor")
+            if not cursor or not items:
+                return
+
+    def iter_market_pages(self, series_ticker: str = None, status: str = None,
+                          min_close_ts: int = None, max_close_ts: int = None,
+                          limit: int = 1000, **params):
+        """
+        Yield /markets pages (lists of market dicts) following the API cursor.
+        Filters are passed to the server so only matching markets are paged.
+        """
+        params = {"limit": limit, **params}
+        for key, value in (("series_ticker", series_ticker), ("status", status),
+                           ("min_close_ts", min_close_ts), ("max_close_ts", max_close_ts)):
+            if value is not None:
+                params[key] = value
+
+        yield from self.iter_pages("/markets", "markets", params)
+
+    def iter_event_pages(self, series_ticker: str = None, limit: int = 200, **params):
+        params = {"limit": limit, **params}
+        if series_ticker is not None:
+            params["series_ticker"] = series_ticker
+        yield from self.iter_pages("/events", "events", params)
+
+    def list_series(self, **params):
+        return self.get("/series", params).get("series") or []
+
+    def list_markets(self, series_ticker: str = None, limit: int = 1000, **params):
+        """All markets matching the filters, across every page"""
+        return [m for page in self.iter_market_pages(series_ticker, limit=limit, **params)
+                for m in page]
+
+    def get_market(self, ticker: str):
+        return self.get(f"/markets/{ticker}").get("market", {})
+
+    def get_candlesticks(self, series_ticker: str, market_ticker: str,
+                         start_ts: int, end_ts: int, period_interval: int = 1440,
+                         finalized: bool = False):
+        """
+        Candlestick payload for one market. With a cache attached, finalized
+        markets are served from disk forever and active ones within the TTL.
+        """
+        key = (series_ticker, market_ticker, start_ts, end_ts, period_interval)
+        path = f"/series/{series_ticker}/markets/{market_ticker}/candlesticks"
+        if self.cache is not None:
+            t0 = time.perf_counter()
+            data = self.cache.get(*key)
+            if data is not None:
+                get_metrics().record("kalshi", path, "cached", time.perf_counter() - t0,
+                                     cache="hit")
+                return data
+
+        params = {"start_ts": start_ts, "end_ts": end_ts, "period_interval": period_interval}
+        data = self.get(path, params, cache="miss" if self.cache is not None else None)
+
+        if self.cache is not None:
+            self.cache.put(*key, data, finalized=finalized)
+        return data
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide shared client so every caller shares one pool and one rate budget"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = KalshiClient(cache=CandleCache())
+        return _client
@@ -0,0 +1,226 @@
+"""
+Concurrent Candle Fetcher
+Pulls candlesticks for many markets in parallel. Throughput is bounded by
+max_in_flight and by the shared client's token bucket, so adding workers
+never pushes us past the API rate limit.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+import pandas as pd
+
+MAX_IN_FLIGHT = 8
+PANEL_COLUMNS = ["date", "prob_close", "ticker", "threshold", "title"]
+MARKET_COLUMNS = ["ticker", "threshold", "title"]
+LIFETIME_COLUMNS = ["status", "open_time", "close_time"]
+
+SUPPORTED_INTERVALS = (1, 60, 1440)  # minutes
+MAX_CANDLES_PER_REQUEST = 5000
+MAX_CHUNKS_IN_FLIGHT = 4
+
+
+def parse_time(value):
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def candle_chunks(start_ts: int, end_ts: int, period_interval: int,
+                  max_candles: int = MAX_CANDLES_PER_REQUEST):
+    """
+    Split [start_ts, end_ts] into windows of at most `max_candles` periods.
+    Boundaries sit on absolute multiples of the chunk span, so interior
+    chunks are identical from run to run and stay cacheable.
+    """
+    if period_interval not in SUPPORTED_INTERVALS:
+        raise ValueError(f"period_interval must be one of {SUPPORTED_INTERVALS}, got {period_interval}")
+
+    span = max_candles * period_interval * 60
+    chunks = []
+    lo = start_ts
+    while lo < end_ts:
+        hi = min(end_ts, (lo // span + 1) * span)
+        chunks.append((lo, hi))
+        lo = hi
+    return chunks or [(start_ts, end_ts)]
+
+
+def fetch_candles_chunked(client, series_ticker: str, market_ticker: str, start_ts: int,
+                          end_ts: int, period_interval: int = 1440, finalized: bool = False,
+                          max_in_flight: int = MAX_CHUNKS_IN_FLIGHT, gate=None):
+    """
+    Candlestick payload for any window length and resolution. Chunks are
+    fetched concurrently, then stitched and de-duplicated on end_period_ts
+    (a candle on a chunk boundary comes back from both sides). `gate`, a
+    semaphore shared with other callers, is held around each chunk request
+    so it caps requests in flight, not markets.
+    """
+    chunks = candle_chunks(start_ts, end_ts, period_interval)
+
+    def one(window):
+        with gate if gate is not None else nullcontext():
+            return client.get_candlesticks(series_ticker, market_ticker, window[0], window[1],
+                                           period_interval=period_interval, finalized=finalized)
+
+    if len(chunks) == 1:
+        payloads = [one(chunks[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_in_flight, len(chunks))) as pool:
+            payloads = list(pool.map(one, chunks))
+
+    by_ts = {}
+    for payload in payloads:
+        for c in payload.get("candlesticks", []):
+            ts = c.get("end_period_ts", c.get("ts"))
+            if ts is not None:
+                by_ts[ts] = c
+
+    return {"candlesticks": [by_ts[ts] for ts in sorted(by_ts)]}
+
+
+def request_window(rec, start_ts: int, end_ts: int):
+    """
+    (start_ts, end_ts, finalized) to request for one market.
+
+    A finalized market's candles are immutable, so we ask for its whole
+    life instead of the moving now-minus-DAYS_BACK window. The request,
+    and therefore the cache key, is then identical on every rerun; rows
+    are trimmed back to the caller's window afterwards.
+    """
+    if rec.get("status") != "finalized":
+        return start_ts, end_ts, False
+
+    open_ts = parse_time(rec.get("open_time"))
+    close_ts = parse_time(rec.get("close_time"))
+    if open_ts is None or close_ts is None:
+        return start_ts, end_ts, True
+
+    return open_ts, close_ts, True
+
+
+def _trim(c, start_ts: int, end_ts: int):
+    first = datetime.fromtimestamp(start_ts, tz=timezone.utc).date()
+    last = datetime.fromtimestamp(end_ts, tz=timezone.utc).date()
+    return c[(c["date"] >= first) & (c["date"] <= last)]
+
+
+def fetch_panel(markets, series_ticker: str, start_ts: int, end_ts: int,
+                pull_fn, max_in_flight: int = MAX_IN_FLIGHT):
+    """
+    Fetch candles for every row of `markets` (ticker, threshold, title)
+    with at most `max_in_flight` requests outstanding.
+
+    pull_fn(series_ticker, ticker, start_ts, end_ts, finalized=...) must
+    return a DataFrame with date and prob_close columns (empty if no data).
+    If `markets` carries status/open_time/close_time, finalized markets are
+    requested over their whole life so their responses stay cacheable.
+    Rows come back in the same order as `markets`, in the panel schema.
+    """
+    return fetch_panel_pages([markets], series_ticker, start_ts, end_ts,
+                             pull_fn, max_in_flight=max_in_flight)
+
+
+def fetch_panel_pages(pages, series_ticker: str, start_ts: int, end_ts: int,
+                      pull_fn, select=None, max_markets: int = None,
+                      max_in_flight: int = MAX_IN_FLIGHT, window_fn=request_window,
+                      skip=(), on_result=None, on_error=None):
+    """
+    Streaming variant of fetch_panel.
+
+    `pages` is any iterable of market pages (DataFrames or lists of market
+    dicts), e.g. KalshiClient.iter_market_pages(). Candle requests for a
+    page are submitted as soon as it arrives, so page 1 is being pulled
+    while page 2 is still loading. `select(page_df)` may filter a page and
+    must leave ticker, threshold and title columns.
+
+    `window_fn(rec, start_ts, end_ts)` picks each market's request range as
+    (start_ts, end_ts, finalized); returning None skips the market, as does
+    listing its ticker in `skip` (it still counts towards max_markets).
+
+    on_result(rec, rows) is called as each market finishes, with its panel
+    rows (empty if it had no data); on_error(rec, exc) when its pull failed.
+    """
+    records = []
+    futures = []
+    seen = 0
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for page in pages:
+            page = page if isinstance(page, pd.DataFrame) else pd.DataFrame(page)
+            if select is not None and not page.empty:
+                page = select(page)
+            if page.empty:
+                continue
+
+            cols = MARKET_COLUMNS + [c for c in LIFETIME_COLUMNS if c in page.columns]
+            for rec in page[cols].to_dict("records"):
+                if max_markets is not None and seen >= max_markets:
+                    break
+                seen += 1
+                if rec["ticker"] in skip:
+                    continue
+
+                window = window_fn(rec, start_ts, end_ts)
+                if window is None:
+                    continue
+
+                s, e, finalized = window
+                records.append(rec)
+                futures.append(pool.submit(pull_fn, series_ticker, rec["ticker"], s, e,
+                                           finalized=finalized))
+
+            if max_markets is not None and seen >= max_markets:
+                break
+
+        results = _collect(records, futures, start_ts, end_ts, on_result, on_error)
+
+    frames = [c for c in results if c is not None]
+    if not frames:
+        return pd.DataFrame(columns=PANEL_COLUMNS)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _collect(records, futures, start_ts, end_ts, on_result=None, on_error=None):
+    """Wait for every candle request and tag the frames with market metadata"""
+    index = {fut: i for i, fut in enumerate(futures)}
+    results = [None] * len(records)
+    done = 0
+
+    for fut in as_completed(futures):
+        i = index[fut]
+        rec = records[i]
+        done += 1
+
+        try:
+            c = fut.result()
+        except Exception as e:
+            print(f"  [{done}/{len(records)}] {rec['ticker']}... ✗ {e}")
+            if on_error is not None:
+                on_error(rec, e)
+            continue
+
+        if c is not None and not c.empty:
+            c = _trim(c, start_ts, end_ts)
+
+        if c is None or c.empty:
+            print(f"  [{done}/{len(records)}] {rec['ticker']}... no data")
+            if on_result is not None:
+                on_result(rec, pd.DataFrame(columns=PANEL_COLUMNS))
+            continue
+
+        c = c.copy()
+        c["ticker"] = rec["ticker"]
+        c["threshold"] = rec["threshold"]
+        c["title"] = rec["title"]
+        results[i] = c
+        if on_result is not None:
+            on_result(rec, c)
+        print(f"  [{done}/{len(records)}] {rec['ticker']}... ✓ {len(c)} candles")
+
+    return results
@@ -0,0 +1,222 @@
+"""
+Multi-Series Kalshi Pull
+Single entry point for Kalshi candle pulls. Reads a config listing any
+number of series and pulls them all concurrently under one shared rate
+budget (the shared client's token bucket plus a global in-flight cap).
+Each series is written to its own panel-store partition.
+
+Finished markets are checkpointed as they complete, so rerunning after a
+crash or an outage resumes the job rather than starting over.
+
+    python src/kalshi_pull_multi.py
+    python src/kalshi_pull_multi.py --config pull_config.json --incremental
+    python src/kalshi_pull_multi.py --restart   # ignore existing checkpoints
+    python src/kalshi_pull_multi.py --metrics-out outputs/pull_metrics.prom
+"""
+
+import argparse
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from candle_decode import candles_to_frame
+from kalshi_client import get_client
+from kalshi_fetch import SUPPORTED_INTERVALS, fetch_candles_chunked, fetch_panel_pages
+from panel_refresh import panel_key, refresh_panel
+from panel_store import KALSHI, STORE_DIR, write_kalshi_panel
+from pull_checkpoint import PullCheckpoint
+from request_metrics import get_metrics
+
+CONFIG_PATH = "pull_config.json"
+MAX_IN_FLIGHT = 16  # candle requests (chunks) outstanding across *all* series
+THRESHOLD_PATTERN = r"above\s*([0-9][0-9,]*(?:\.[0-9]+)?)"  # commas for e.g. payrolls
+
+# Per-series settings; anything here can be overridden in the config's
+# top-level "defaults" or on an individual series entry
+SERIES_DEFAULTS = {
+    "days_back": 365,
+    "period_interval": 1440,
+    "max_markets": None,
+    "statuses": ["finalized"],  # null/empty pulls every market in the series
+    "threshold_pattern": THRESHOLD_PATTERN,
+}
+
+
+def ensure_data_dir():
+    Path("data").mkdir(exist_ok=True)
+
+
+def load_config(path=CONFIG_PATH):
+    """(settings, [series specs]) with defaults filled in"""
+    with open(path) as f:
+        cfg = json.load(f)
+
+    defaults = {**SERIES_DEFAULTS, **cfg.get("defaults", {})}
+    specs = []
+    for entry in cfg["series"]:
+        if isinstance(entry, str):
+            entry = {"ticker": entry}
+        specs.append({**defaults, **entry})
+
+    settings = {k: v for k, v in cfg.items() if k not in ("defaults", "series")}
+    return settings, specs
+
+
+def extract_threshold(title: str, pattern=THRESHOLD_PATTERN):
+    if not isinstance(title, str):
+        return None
+    m = re.search(pattern, title, re.IGNORECASE)
+    return float(m.group(1).replace(",", "")) if m else None
+
+
+def make_selector(spec):
+    """Page filter: configured statuses, and a parsable threshold"""
+    statuses = spec.get("statuses")
+    pattern = spec["threshold_pattern"]
+
+    def select(page):
+        if statuses:
+            page = page[page["status"].isin(statuses)]
+        page = page.copy()
+        page["threshold"] = page["title"].apply(lambda t: extract_threshold(t, pattern))
+        return page[page["threshold"].notna()]
+
+    return select
+
+
+def pull_candles(series_ticker: str, market_ticker: str, start_ts: int, end_ts: int,
+                 finalized: bool = False, period_interval: int = 1440, gate=None):
+    data = fetch_candles_chunked(get_client(), series_ticker, market_ticker, start_ts, end_ts,
+                                 period_interval=period_interval, finalized=finalized, gate=gate)
+    with get_metrics().stage("kalshi.decode"):
+        return candles_to_frame(data)
+
+
+def pull_series(spec, gate, max_in_flight: int = MAX_IN_FLIGHT, incremental: bool = False,
+                restart: bool = False):
+    """Pull one series and write its partition. Returns the panel."""
+    series = spec["ticker"]
+
+    checkpoint = PullCheckpoint(series, job={**spec, "incremental": incremental})
+    if restart:
+        checkpoint.clear()
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=spec["days_back"])
+    start_ts, end_ts = checkpoint.start(int(start.timestamp()), int(end.timestamp()))
+
+    def pull(series_ticker, market_ticker, s, e, finalized=False):
+        # The gate is taken per chunk request inside, so a long or intraday
+        # window split into chunks still counts each request against it
+        return pull_candles(series_ticker, market_ticker, s, e, finalized=finalized,
+                            period_interval=spec["period_interval"], gate=gate)
+
+    carried = checkpoint.rows()
+    if checkpoint.resumed:
+        print(f"[{series}] resuming checkpoint: {len(checkpoint.done)} markets already pulled")
+
+    print(f"[{series}] streaming markets (up to {spec['max_markets'] or 'all'})...")
+    # Status and close-time filters go to the server so settled markets outside
+    # the window are never paged; make_selector re-checks status per page
+    statuses = spec.get("statuses")
+    pages = get_client().iter_market_pages(series, status=",".join(statuses) if statuses else None,
+                                           min_close_ts=start_ts)
+    kwargs = dict(select=make_selector(spec), max_markets=spec["max_markets"],
+                  max_in_flight=max_in_flight, skip=set(checkpoint.done),
+                  on_result=checkpoint.mark_done, on_error=checkpoint.mark_failed)
+
+    if incremental:
+        panel = refresh_panel(pages, series, start_ts, end_ts, pull, carried=carried,
+                              period_interval=spec["period_interval"], **kwargs)
+    else:
+        panel = fetch_panel_pages(pages, series, start_ts, end_ts, pull, **kwargs)
+        if not carried.empty:
+            panel = pd.concat([carried, panel], ignore_index=True)
+        if not panel.empty:
+            # Replacing the partition would drop every market that failed this
+            # run; until the checkpoint is clean, only upsert what did arrive
+            write_kalshi_panel(panel, series, replace=not checkpoint.failed,
+                               key=panel_key(spec["period_interval"]))
+
+    if checkpoint.failed:
+        print(f"[{series}] ✗ {len(checkpoint.failed)} markets failed; "
+              f"rerun to retry just those (checkpoint kept)")
+    else:
+        checkpoint.clear()
+
+    return panel
+
+
+def run(specs, max_in_flight: int = MAX_IN_FLIGHT, incremental: bool = False,
+        restart: bool = False):
+    """Pull every series concurrently. Returns {series: panel}."""
+    # Fail before any request rather than in one series' worker thread
+    bad = {s["ticker"]: s["period_interval"] for s in specs
+           if s["period_interval"] not in SUPPORTED_INTERVALS}
+    if bad:
+        raise ValueError(f"period_interval must be one of {SUPPORTED_INTERVALS}: {bad}")
+    ensure_data_dir()
+    gate = threading.BoundedSemaphore(max_in_flight)
+
+    with ThreadPoolExecutor(max_workers=len(specs)) as pool:
+        futures = {spec["ticker"]: pool.submit(pull_series, spec, gate, max_in_flight, incremental,
+                                                 restart)
+                   for spec in specs}
+
+    panels = {}
+    print("\n" + "=" * 60)
+    for series, fut in futures.items():
+        try:
+            panel = fut.result()
+        except Exception as e:
+            print(f"✗ {series}: {e}")
+            continue
+
+        panels[series] = panel
+        if panel.empty:
+            print(f"✗ {series}: no data retrieved")
+            continue
+
+        print(f"✓ {series}: {panel['ticker'].nunique()} markets, {len(panel)} rows, "
+              f"{panel['date'].min()} to {panel['date'].max()} "
+              f"→ {STORE_DIR}/{KALSHI}/series={series}")
+
+    return panels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pull Kalshi candles for many series")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only request dates after what the store already holds")
+    parser.add_argument("--restart", action="store_true",
+                        help="discard checkpoints from an interrupted run and start over")
+    parser.add_argument("--metrics-out",
+                        help="also write request metrics here (.json, or .prom for Prometheus text)")
+    args = parser.parse_args(argv)
+
+    settings, specs = load_config(args.config)
+
+    print("=" * 60)
+    print(f"Kalshi Data Pull - {', '.join(s['ticker'] for s in specs)}")
+    print("=" * 60)
+
+    if "rate_per_sec" in settings:
+        limiter = get_client().limiter
+        limiter.max_rate = limiter.rate = float(settings["rate_per_sec"])
+
+    run(specs, max_in_flight=settings.get("max_in_flight", MAX_IN_FLIGHT),
+        incremental=args.incremental, restart=args.restart)
+
+    get_metrics().summary()
+    if args.metrics_out:
+        get_metrics().dump(args.metrics_out)
+
+
+if __name__ == "__main__":
+    main()
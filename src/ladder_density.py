@@ -0,0 +1,184 @@
+"""
+Ladder Density
+Turns each event's ladder of "above x" threshold contracts into an implied
+distribution for every date, instead of reading one median threshold.
+
+The panel is pivoted into a dense event x date x strike cube of
+P(X > strike). Quotes are noisy and not always monotone in the strike, so
+each (event, date) row gets the least-squares non-increasing projection
+(isotonic regression), computed for all rows at once. Differencing
+adjacent strikes then gives the discrete distribution of docs/main.tex:
+
+    pmf  = [1 - S(k0), S(k0) - S(k1), ..., S(k_last)]   # bins split at the strikes
+    pdf  = (S(k_i) - S(k_i+1)) / (k_i+1 - k_i)           # interior bins
+
+Grids are plain dicts of numpy arrays that save to .npz, and the options-
+side densities use the same layout so the two can be compared directly:
+
+    key       (E,)       event ticker (or expiry for options)
+    dates     (D,)       datetime64[D]
+    strikes   (K,)       ascending
+    survival  (E, D, K)  P(X > strike), NaN where no quote
+    pmf       (E, D, K+1)
+    pdf       (E, D, K-1)
+
+    python src/ladder_density.py --series KXU3
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from panel_store import read_kalshi_panel
+
+DENSITY_DIR = "data/density"
+
+
+def event_of(tickers):
+    """Event ticker from market tickers: KXU3-25JUN-T4.2 -> KXU3-25JUN"""
+    return pd.Series(tickers).str.rsplit("-", n=1).str[0]
+
+
+def isotonic_decreasing(s):
+    """
+    Least-squares non-increasing fit along the last axis, for every row at
+    once, via the min-max formula over block averages (O(K^2) per row, so
+    meant for ladders of tens of strikes). NaNs carry no weight and stay NaN.
+    """
+    s = np.asarray(s, dtype=np.float64)
+    w = ~np.isnan(s)
+    v = np.where(w, -s, 0.0)  # non-decreasing fit of -s
+
+    # Sums and weights of every block [j, k], from prefix sums
+    cw = np.concatenate([np.zeros(s.shape[:-1] + (1,)), np.cumsum(w, axis=-1)], axis=-1)
+    cv = np.concatenate([np.zeros(s.shape[:-1] + (1,)), np.cumsum(v, axis=-1)], axis=-1)
+    W = cw[..., None, 1:] - cw[..., :-1, None]  # (..., j, k)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        M = (cv[..., None, 1:] - cv[..., :-1, None]) / W
+
+    K = s.shape[-1]
+    upper = np.triu(np.ones((K, K), dtype=bool))
+    M = np.where(upper & (W > 0), M, np.inf)
+
+    # fit_i = max_{j <= i} min_{k >= i} M[j, k]
+    g = np.flip(np.minimum.accumulate(np.flip(M, -1), axis=-1), -1)
+    g = np.where(upper & np.isfinite(g), g, -np.inf)
+    fit = -g.max(axis=-2)
+    return np.where(w, fit, np.nan)
+
+
+def ladder_grid(panel, monotone=True):
+    """
+    Density grid from a Kalshi panel (date, ticker, threshold, prob_close).
+    With monotone=True the survival curve is projected to be non-increasing
+    in the strike before differencing.
+    """
+    df = panel[["date", "ticker", "threshold", "prob_close"]].dropna(subset=["threshold"])
+    df = df.assign(event=event_of(df["ticker"]).to_numpy())
+    df = df.drop_duplicates(subset=["event", "date", "threshold"], keep="last")
+
+    e, events = pd.factorize(df["event"], sort=True)
+    d, dates = pd.factorize(pd.to_datetime(df["date"]), sort=True)
+    k, strikes = pd.factorize(df["threshold"], sort=True)
+
+    raw = np.full((len(events), len(dates), len(strikes)), np.nan)
+    raw[e, d, k] = df["prob_close"].to_numpy(dtype=np.float64)
+    survival = np.clip(isotonic_decreasing(raw) if monotone else raw, 0.0, 1.0)
+
+    grid = {
+        "key": np.asarray(events, dtype=str),
+        "dates": np.asarray(dates, dtype="datetime64[D]"),
+        "strikes": np.asarray(strikes, dtype=np.float64),
+        "survival": survival,
+    }
+    grid.update(ladder_pmf(grid["strikes"], survival))
+    grid["adjusted"] = np.nan_to_num(np.abs(survival - raw)).max(axis=-1)  # (E, D)
+    return grid
+
+
+def ladder_pmf(strikes, survival):
+    """
+    Discrete distribution from P(X > strike) on ascending strikes: pmf over
+    the K+1 bins the strikes split the line into, and the interior pdf.
+    Bins touching a missing quote are NaN.
+    """
+    ones = np.ones(survival.shape[:-1] + (1,))
+    zeros = np.zeros_like(ones)
+    cdf_edges = np.concatenate([zeros, 1.0 - survival, ones], axis=-1)
+    pmf = np.diff(cdf_edges, axis=-1)
+    pdf = pmf[..., 1:-1] / np.diff(strikes)
+    return {"pmf": pmf, "pdf": pdf}
+
+
+def series_grid(series_ticker, start=None, end=None, monotone=True):
+    panel = read_kalshi_panel(series_ticker, start=start, end=end,
+                              columns=["ticker", "threshold", "prob_close"])
+    return ladder_grid(panel, monotone=monotone)
+
+
+def grid_path(name, root=DENSITY_DIR):
+    return Path(root) / f"{name}.npz"
+
+
+def save_grid(grid, name, root=DENSITY_DIR):
+    path = grid_path(name, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp, **grid)
+    tmp.replace(path)
+    return path
+
+
+def load_grid(name, root=DENSITY_DIR):
+    with np.load(grid_path(name, root)) as f:
+        return {k: f[k] for k in f.files}
+
+
+def grid_frame(grid, i):
+    """One event's survival curve as a date x strike DataFrame, for inspection"""
+    return pd.DataFrame(grid["survival"][i], index=pd.DatetimeIndex(grid["dates"], name="date"),
+                        columns=pd.Index(grid["strikes"], name="strike"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Implied distributions from Kalshi ladders")
+    parser.add_argument("--series", default="KXU3")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--raw", action="store_true", help="skip the monotone projection")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"LADDER DENSITY: {args.series}")
+    print("=" * 70)
+
+    grid = series_grid(args.series, args.start, args.end, monotone=not args.raw)
+    E, D, K = grid["survival"].shape
+    quoted = ~np.isnan(grid["survival"])
+    print(f"{E} events x {D} dates x {K} strikes "
+          f"({quoted.sum()} quotes, {100 * quoted.mean():.0f}% of the cube)")
+
+    fixed = grid["adjusted"] > 1e-12
+    print(f"Monotone projection adjusted {fixed.sum()} of {quoted.any(-1).sum()} ladders "
+          f"(largest move {grid['adjusted'].max():.4f})")
+
+    print(f"\n{'Event':<16} {'Dates':>6} {'Strikes':>8}  Latest P(X > strike)")
+    print("-" * 70)
+    for i, event in enumerate(grid["key"]):
+        rows = np.flatnonzero(quoted[i].any(-1))
+        if rows.size == 0:
+            continue
+        last = grid["survival"][i, rows[-1]]
+        curve = " ".join(f"{k:g}:{p:.2f}" for k, p in zip(grid["strikes"], last)
+                         if not np.isnan(p))
+        print(f"{event:<16} {rows.size:>6} {(~np.isnan(last)).sum():>8}  {curve}")
+
+    path = save_grid(grid, f"kalshi_{args.series}")
+    print(f"\n✓ Saved {path}")
+    return grid
+
+
+if __name__ == "__main__":
+    main()
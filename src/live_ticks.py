@@ -0,0 +1,363 @@
+"""
+Live Tick Ingestion
+Subscribes to Kalshi ticker/trade updates over the WebSocket API, keeps
+the most recent ticks per market in a fixed-size numpy ring buffer, and
+periodically rolls completed bars into the panel store (kalshi_live
+dataset). Intraday signals can read the rings directly for sub-second
+freshness, or the stored bars for history.
+
+    python src/live_ticks.py --series KXU3 --tickers KXU3-26JAN-T4.2 KXU3-26JAN-T4.4
+    python src/live_ticks.py --stand-in --port 8765          # local fake feed
+    python src/live_ticks.py --series KXU3 --tickers ... --url ws://127.0.0.1:8765
+
+The production endpoint needs Kalshi API-key auth headers (pass them via
+`headers`); the stand-in server accepts anything.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+from kalshi_client import backoff_delay
+from panel_store import STORE_DIR, write_live_bars
+
+WS_URL = "wss://api.elections.kalshi.com/trade-api/ws/v2"
+CHANNELS = ("ticker", "trade")
+RING_SIZE = 4096  # ticks kept per market; must cover one flush interval
+BAR_SECONDS = 60
+FLUSH_EVERY = 60.0  # seconds between bar flushes
+STABLE_AFTER = 30.0  # a connection this old (or that delivered a tick) resets the backoff
+
+# One row per tick. Prices are probabilities (0-1); size is contracts
+# traded (trades only), NaN where a message type doesn't carry the field.
+TICK_FIELDS = ("ts", "price", "yes_bid", "yes_ask", "size", "open_interest")
+
+
+class TickRing:
+    """
+    Fixed-size ring of ticks for one market. Writes overwrite the oldest
+    row; nothing is allocated after construction.
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.data = np.full((size, len(TICK_FIELDS)), np.nan)
+        self.count = 0  # total ticks ever pushed
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+    def push(self, row):
+        with self.lock:
+            self.data[self.count % self.size] = row
+            self.count += 1
+
+    def arrays(self, since=None):
+        """{field: array} oldest to newest (copies), optionally ts >= since"""
+        with self.lock:
+            n = len(self)
+            start = self.count % self.size if self.count > self.size else 0
+            rows = np.roll(self.data, -start, axis=0)[:n]
+
+        if since is not None:
+            rows = rows[rows[:, 0] >= since]
+        return {f: rows[:, i] for i, f in enumerate(TICK_FIELDS)}
+
+    def latest(self):
+        """Most recent tick as a dict, or None"""
+        with self.lock:
+            if self.count == 0:
+                return None
+            row = self.data[(self.count - 1) % self.size].copy()
+        return dict(zip(TICK_FIELDS, row))
+
+
+def _cents(msg, key):
+    """Field in probability units; accepts cents or *_dollars strings"""
+    v = msg.get(key)
+    if v is not None:
+        return float(v) / 100.0
+    v = msg.get(f"{key}_dollars")
+    return np.nan if v is None else float(v)
+
+
+def parse_message(message):
+    """(market_ticker, tick row) for ticker/trade messages, else None"""
+    kind = message.get("type")
+    msg = message.get("msg") or {}
+    ticker = msg.get("market_ticker")
+    if ticker is None or kind not in ("ticker", "trade"):
+        return None
+
+    ts = float(msg.get("ts") or time.time())
+    if kind == "ticker":
+        oi = msg.get("open_interest")
+        row = (ts, _cents(msg, "price"), _cents(msg, "yes_bid"), _cents(msg, "yes_ask"),
+               np.nan, np.nan if oi is None else float(oi))
+    else:
+        row = (ts, _cents(msg, "yes_price"), np.nan, np.nan,
+               float(msg.get("count") or 0), np.nan)
+    return ticker, row
+
+
+def ticks_to_bars(ticks, bar_seconds=BAR_SECONDS):
+    """
+    Roll tick arrays into bars in the panel schema: date, prob_close,
+    end_period_ts, price_open/high/low, yes_bid_close, yes_ask_close,
+    volume, open_interest. first/last skip NaN, so ticker and trade
+    messages can share a ring.
+    """
+    ts = ticks["ts"]
+    if len(ts) == 0:
+        return pd.DataFrame()
+
+    df = pd.DataFrame({k: v for k, v in ticks.items() if k != "ts"})
+    df["end_period_ts"] = (ts // bar_seconds).astype(np.int64) * bar_seconds + bar_seconds
+
+    bars = df.groupby("end_period_ts").agg(
+        price_open=("price", "first"),
+        price_high=("price", "max"),
+        price_low=("price", "min"),
+        prob_close=("price", "last"),
+        yes_bid_close=("yes_bid", "last"),
+        yes_ask_close=("yes_ask", "last"),
+        volume=("size", "sum"),
+        open_interest=("open_interest", "last"),
+    ).reset_index()
+
+    bars = bars[bars["prob_close"].notna()]
+    bars.insert(0, "date", pd.to_datetime(bars["end_period_ts"], unit="s", utc=True).dt.date)
+    return bars.reset_index(drop=True)
+
+
+class LiveIngestor:
+    """
+    Keeps a TickRing per market from a WebSocket feed and flushes completed
+    bars to the store. `meta` maps ticker -> {"threshold", "title"} for the
+    panel columns (missing entries are written with nulls).
+    """
+
+    def __init__(self, series_ticker, tickers, url=WS_URL, channels=CHANNELS,
+                 ring_size=RING_SIZE, bar_seconds=BAR_SECONDS, flush_every=FLUSH_EVERY,
+                 headers=None, meta=None, root=STORE_DIR):
+        self.series_ticker = series_ticker
+        self.tickers = list(tickers)
+        self.url = url
+        self.channels = list(channels)
+        self.bar_seconds = bar_seconds
+        self.flush_every = flush_every
+        self.headers = headers
+        self.meta = meta or {}
+        self.root = root
+
+        self.rings = {t: TickRing(ring_size) for t in self.tickers}
+        self.flushed_until = {t: 0 for t in self.tickers}  # end ts of last written bar
+        self.messages = 0
+        self.bars_written = 0
+        self.flush_lock = threading.Lock()
+
+    def latest(self, ticker):
+        return self.rings[ticker].latest()
+
+    def handle(self, raw):
+        """Route one raw WebSocket message into its market's ring"""
+        parsed = parse_message(json.loads(raw))
+        if parsed is None:
+            return
+        ticker, row = parsed
+        ring = self.rings.get(ticker)
+        if ring is not None:
+            ring.push(row)
+            self.messages += 1
+
+    def flush(self, now=None, final=False):
+        """
+        Write every bar that has closed since the last flush (or all bars,
+        including the one still forming, when `final`). Returns the number
+        of bars written.
+        """
+        with self.flush_lock:
+            return self._flush(time.time() if now is None else now, final)
+
+    def _flush(self, now, final):
+        frames = []
+
+        for ticker, ring in self.rings.items():
+            bars = ticks_to_bars(ring.arrays(since=self.flushed_until[ticker]), self.bar_seconds)
+            if bars.empty:
+                continue
+
+            bars = bars[bars["end_period_ts"] > self.flushed_until[ticker]]
+            if not final:
+                bars = bars[bars["end_period_ts"] <= now]
+            if bars.empty:
+                continue
+
+            info = self.meta.get(ticker, {})
+            bars = bars.assign(ticker=ticker, threshold=info.get("threshold"),
+                               title=info.get("title"))
+            frames.append(bars)
+            self.flushed_until[ticker] = int(bars["end_period_ts"].max())
+
+        if not frames:
+            return 0
+
+        bars = pd.concat(frames, ignore_index=True)
+        write_live_bars(bars, self.series_ticker, root=self.root)
+        self.bars_written += len(bars)
+        return len(bars)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_every)
+            n = await asyncio.to_thread(self.flush)
+            if n:
+                print(f"[{self.series_ticker}] flushed {n} bars ({self.messages} ticks so far)")
+
+    async def _consume(self):
+        async with connect(self.url, additional_headers=self.headers) as ws:
+            await ws.send(json.dumps({
+                "id": 1, "cmd": "subscribe",
+                "params": {"channels": self.channels, "market_tickers": self.tickers},
+            }))
+            print(f"[{self.series_ticker}] subscribed to {len(self.tickers)} markets at {self.url}")
+            async for raw in ws:
+                self.handle(raw)
+
+    async def run(self, duration=None):
+        """
+        Stream until cancelled (or for `duration` seconds), reconnecting
+        with jittered backoff after every disconnect, clean or not. The
+        backoff only starts over once a connection has delivered a tick or
+        stayed up STABLE_AFTER seconds, so a feed that accepts and then
+        immediately closes can't spin. Remaining bars are flushed on the
+        way out.
+        """
+        flusher = asyncio.create_task(self._flush_loop())
+        deadline = None if duration is None else time.monotonic() + duration
+        attempt = 0
+
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                opened, seen = time.monotonic(), self.messages
+                try:
+                    await asyncio.wait_for(self._consume(), timeout)
+                    reason = "closed by server"
+                except asyncio.TimeoutError:
+                    break
+                except (OSError, ConnectionClosed) as e:
+                    reason = f"connection lost ({e})"
+
+                if self.messages > seen or time.monotonic() - opened >= STABLE_AFTER:
+                    attempt = 0
+                delay = backoff_delay(attempt)
+                attempt += 1
+                print(f"[{self.series_ticker}] {reason}; reconnecting in {delay:.1f}s")
+                if deadline is not None:
+                    delay = min(delay, max(0.0, deadline - time.monotonic()))
+                await asyncio.sleep(delay)
+        finally:
+            flusher.cancel()
+            n = self.flush(final=True)
+            print(f"[{self.series_ticker}] stopped: {self.messages} ticks, "
+                  f"{self.bars_written} bars written (last flush {n})")
+
+
+# --- local stand-in feed -----------------------------------------------------
+
+async def stand_in_server(host="127.0.0.1", port=0, interval=0.05, trade_prob=0.3, seed=0):
+    """
+    Fake Kalshi WebSocket feed for tests and offline runs: after a
+    subscribe command it sends random-walk ticker messages (and occasional
+    trades) for every requested market. Returns the running server; its
+    port is server.sockets[0].getsockname()[1].
+    """
+    rng = random.Random(seed)
+
+    async def handler(ws):
+        try:
+            sub = json.loads(await ws.recv())
+            tickers = sub["params"]["market_tickers"]
+            await ws.send(json.dumps({"id": sub.get("id"), "type": "subscribed",
+                                      "msg": {"channel": "ticker", "sid": 1}}))
+            price = {t: rng.randint(20, 80) for t in tickers}
+
+            while True:
+                for t in tickers:
+                    price[t] = min(99, max(1, price[t] + rng.choice((-1, 0, 1))))
+                    now = time.time()
+                    await ws.send(json.dumps({"type": "ticker", "sid": 1, "msg": {
+                        "market_ticker": t, "price": price[t], "yes_bid": price[t] - 1,
+                        "yes_ask": price[t] + 1, "open_interest": 1000, "ts": now}}))
+                    if rng.random() < trade_prob:
+                        await ws.send(json.dumps({"type": "trade", "sid": 2, "msg": {
+                            "market_ticker": t, "yes_price": price[t],
+                            "no_price": 100 - price[t], "count": rng.randint(1, 50),
+                            "ts": now}}))
+                await asyncio.sleep(interval)
+        except ConnectionClosed:
+            pass
+
+    return await serve(handler, host, port)
+
+
+def market_meta(tickers):
+    """threshold/title per ticker from the local market catalog, if synced"""
+    from kalshi_pull_multi import extract_threshold
+    from market_catalog import get_catalog
+
+    catalog = get_catalog()
+    meta = {}
+    for t in tickers:
+        m = catalog.market(t)
+        if m is not None:
+            meta[t] = {"title": m.get("title"), "threshold": extract_threshold(m.get("title"))}
+    return meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Kalshi ticks into the panel store")
+    parser.add_argument("--series")
+    parser.add_argument("--tickers", nargs="*", default=[])
+    parser.add_argument("--url", default=WS_URL)
+    parser.add_argument("--duration", type=float, help="seconds to run (default: forever)")
+    parser.add_argument("--bar-seconds", type=int, default=BAR_SECONDS)
+    parser.add_argument("--flush-every", type=float, default=FLUSH_EVERY)
+    parser.add_argument("--stand-in", action="store_true", help="run the local fake feed instead")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.stand_in:
+        async def serve_forever():
+            server = await stand_in_server(port=args.port)
+            print(f"Stand-in feed on ws://127.0.0.1:{args.port}")
+            await server.serve_forever()
+
+        asyncio.run(serve_forever())
+        return
+
+    if not args.series or not args.tickers:
+        parser.error("--series and --tickers are required")
+
+    ingestor = LiveIngestor(args.series, args.tickers, url=args.url,
+                            bar_seconds=args.bar_seconds, flush_every=args.flush_every,
+                            meta=market_meta(args.tickers))
+    try:
+        asyncio.run(ingestor.run(args.duration))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
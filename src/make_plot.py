@@ -8,6 +8,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+from cross_corr import lagged_corr
+from panel_store import read_iv, read_kalshi_panel
+
+SERIES_TICKER = "KXCPICOREYOY"
+
 
 def ensure_outputs_dir():
     """Create outputs directory if it doesn't exist"""
@@ -18,22 +23,9 @@ def load_data():
     """Load Kalshi and Yahoo data"""
     print("Loading data...")
     
-    # Check if data files exist
-    kalshi_path = "data/kalshi_threshold_panel.csv"
-    yahoo_path = "data/yahoo_iv_proxy.csv"
-    
-    if not Path(kalshi_path).exists():
-        raise FileNotFoundError(f"{kalshi_path} not found. Run kalshi_pull.py first.")
-    
-    if not Path(yahoo_path).exists():
-        raise FileNotFoundError(f"{yahoo_path} not found. Run yahoo_pull.py first.")
-    
-    kalshi = pd.read_csv(kalshi_path)
-    iv = pd.read_csv(yahoo_path)
-    
-    # Convert dates
-    kalshi["date"] = pd.to_datetime(kalshi["date"])
-    iv["date"] = pd.to_datetime(iv["date"])
+    # Raises FileNotFoundError if the pull scripts haven't populated the store
+    kalshi = read_kalshi_panel(SERIES_TICKER, columns=["prob_close", "threshold"])
+    iv = read_iv()
     
     print(f"Kalshi data: {len(kalshi)} rows, {kalshi['date'].min()} to {kalshi['date'].max()}")
     print(f"Yahoo data: {len(iv)} rows, {iv['date'].min()} to {iv['date'].max()}")
@@ -153,13 +145,12 @@ def compute_correlation(df, threshold, iv_col):
     corr = df[col_name].corr(df[iv_col])
     print(f"\nCorrelation between Kalshi and {iv_col}: {corr:.3f}")
     
-    # Lagged correlations
+    # Lagged correlations, all in one pass (positive lag = Kalshi leads)
     print("\nLagged correlations (Kalshi leads):")
-    for lag in range(1, 6):
-        df_lag = df.copy()
-        df_lag["kalshi_lag"] = df_lag[col_name].shift(lag)
-        lag_corr = df_lag["kalshi_lag"].corr(df_lag[iv_col])
-        print(f"  Lag {lag}: {lag_corr:.3f}")
+    lags, corrs = lagged_corr(df[col_name], df[iv_col], 5)
+    for lag, lag_corr in zip(lags, corrs):
+        if lag >= 1:
+            print(f"  Lag {lag}: {lag_corr:.3f}")
     
     return corr
 
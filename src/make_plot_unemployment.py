@@ -3,17 +3,18 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+from panel_store import read_iv, read_kalshi_panel
+
+SERIES_TICKER = "KXU3"
+
 def ensure_outputs_dir():
     Path("outputs").mkdir(exist_ok=True)
 
 def load_data():
     print("Loading data...")
     
-    kalshi = pd.read_csv("data/kalshi_unemployment_panel.csv")
-    iv = pd.read_csv("data/yahoo_iv_proxy.csv")
-    
-    kalshi["date"] = pd.to_datetime(kalshi["date"])
-    iv["date"] = pd.to_datetime(iv["date"])
+    kalshi = read_kalshi_panel(SERIES_TICKER, columns=["prob_close", "threshold"])
+    iv = read_iv()
     
     print(f"Kalshi data: {len(kalshi)} rows")
     print(f"Yahoo data: {len(iv)} rows")
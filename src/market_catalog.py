@@ -0,0 +1,393 @@
+"""
+Market Catalog
+Local SQLite copy of Kalshi series, events and markets, so discovery is a
+query instead of re-downloading every market and substring-scanning it.
+
+Market titles are full-text indexed (FTS5) and the columns we filter on
+(series, status, open/close time) have ordinary indexes. Syncs are
+incremental: after the first full pass, only markets closing after the
+oldest still-open market we hold are re-paged and upserted.
+
+    python src/market_catalog.py sync
+    python src/market_catalog.py sync --series KXU3 KXCPICOREYOY
+    python src/market_catalog.py search "unemployment" --status finalized
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from kalshi_client import get_client
+from kalshi_fetch import parse_time
+
+CATALOG_PATH = "data/catalog.sqlite"
+SETTLED = ("settled", "finalized")  # "closed" markets can still settle
+FTS_OPERATORS = ("AND", "OR", "NOT")
+FTS_COLUMNS = ("ticker", "title", "subtitle")  # indexed in markets_fts
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    ticker     TEXT PRIMARY KEY,
+    title      TEXT,
+    category   TEXT,
+    frequency  TEXT,
+    raw        TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    event_ticker  TEXT PRIMARY KEY,
+    series_ticker TEXT,
+    title         TEXT,
+    raw           TEXT
+);
+CREATE TABLE IF NOT EXISTS markets (
+    ticker        TEXT PRIMARY KEY,
+    event_ticker  TEXT,
+    series_ticker TEXT,
+    title         TEXT,
+    subtitle      TEXT,
+    status        TEXT,
+    open_time     INTEGER,
+    close_time    INTEGER,
+    raw           TEXT,
+    updated_at    REAL
+);
+CREATE INDEX IF NOT EXISTS markets_series ON markets(series_ticker);
+CREATE INDEX IF NOT EXISTS markets_status ON markets(status);
+CREATE INDEX IF NOT EXISTS markets_open ON markets(open_time);
+CREATE INDEX IF NOT EXISTS markets_close ON markets(close_time);
+CREATE INDEX IF NOT EXISTS events_series ON events(series_ticker);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS markets_fts USING fts5(
+    ticker, title, subtitle, content='markets', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS markets_ai AFTER INSERT ON markets BEGIN
+    INSERT INTO markets_fts(rowid, ticker, title, subtitle)
+    VALUES (new.rowid, new.ticker, new.title, new.subtitle);
+END;
+CREATE TRIGGER IF NOT EXISTS markets_ad AFTER DELETE ON markets BEGIN
+    INSERT INTO markets_fts(markets_fts, rowid, ticker, title, subtitle)
+    VALUES ('delete', old.rowid, old.ticker, old.title, old.subtitle);
+END;
+CREATE TRIGGER IF NOT EXISTS markets_au AFTER UPDATE ON markets BEGIN
+    INSERT INTO markets_fts(markets_fts, rowid, ticker, title, subtitle)
+    VALUES ('delete', old.rowid, old.ticker, old.title, old.subtitle);
+    INSERT INTO markets_fts(rowid, ticker, title, subtitle)
+    VALUES (new.rowid, new.ticker, new.title, new.subtitle);
+END;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope      TEXT PRIMARY KEY,  -- '*' for the whole exchange, else a series ticker
+    synced_at  REAL
+);
+"""
+
+MARKET_UPSERT = """
+INSERT INTO markets (ticker, event_ticker, series_ticker, title, subtitle, status,
+                     open_time, close_time, raw, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(ticker) DO UPDATE SET
+    event_ticker=excluded.event_ticker, series_ticker=excluded.series_ticker,
+    title=excluded.title, subtitle=excluded.subtitle, status=excluded.status,
+    open_time=excluded.open_time, close_time=excluded.close_time,
+    raw=excluded.raw, updated_at=excluded.updated_at
+"""
+
+
+def series_of(market):
+    """Series ticker, falling back to the event ticker's prefix"""
+    series = market.get("series_ticker")
+    if series:
+        return series
+    event = market.get("event_ticker") or market.get("ticker") or ""
+    return event.split("-")[0] or None
+
+
+class MarketCatalog:
+    """SQLite-backed catalog of Kalshi markets"""
+
+    def __init__(self, path=CATALOG_PATH, client=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.client = client
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def _client(self):
+        return self.client or get_client()
+
+    def close(self):
+        self.conn.close()
+
+    # --- writes -------------------------------------------------------------
+
+    def upsert_markets(self, markets):
+        now = time.time()
+        rows = [(m["ticker"], m.get("event_ticker"), series_of(m), m.get("title"),
+                 m.get("subtitle") or m.get("yes_sub_title"), m.get("status"),
+                 parse_time(m.get("open_time")), parse_time(m.get("close_time")),
+                 json.dumps(m), now)
+                for m in markets if m.get("ticker")]
+        with self.lock, self.conn:
+            self.conn.executemany(MARKET_UPSERT, rows)
+        return len(rows)
+
+    def upsert_events(self, events):
+        rows = [(e["event_ticker"], e.get("series_ticker") or series_of(e), e.get("title"),
+                 json.dumps(e))
+                for e in events if e.get("event_ticker")]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO events (event_ticker, series_ticker, title, raw) "
+                "VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def upsert_series(self, series):
+        rows = [(s["ticker"], s.get("title"), s.get("category"), s.get("frequency"),
+                 json.dumps(s))
+                for s in series if s.get("ticker")]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO series (ticker, title, category, frequency, raw) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # --- sync ---------------------------------------------------------------
+
+    def _synced_at(self, scope):
+        row = self.conn.execute("SELECT synced_at FROM sync_state WHERE scope = ?",
+                                (scope,)).fetchone()
+        return row[0] if row else None
+
+    def _resume_close_ts(self, series_ticker=None):
+        """
+        min_close_ts for an incremental pass: markets that closed before the
+        oldest one we still hold as unsettled cannot have changed.
+        """
+        sql = ("SELECT MIN(close_time) FROM markets "
+               f"WHERE status NOT IN ({', '.join('?' * len(SETTLED))})")
+        args = list(SETTLED)
+        if series_ticker is not None:
+            sql += " AND series_ticker = ?"
+            args.append(series_ticker)
+        row = self.conn.execute(sql, args).fetchone()
+        return row[0]
+
+    def sync(self, series_ticker=None, full=False):
+        """
+        Page markets (one series, or the whole exchange) into the catalog.
+        Incremental unless `full` or this scope has never been synced.
+        Returns the number of markets upserted.
+        """
+        scope = series_ticker or "*"
+        started = time.time()
+        min_close_ts = None
+
+        synced_at = None if full else self._synced_at(scope)
+        if synced_at is not None:
+            # Anything still open, plus whatever was listed since the last pass
+            resume = self._resume_close_ts(series_ticker)
+            min_close_ts = int(min(resume, synced_at) if resume is not None else synced_at)
+
+        client = self._client()
+        n = 0
+        for page in client.iter_market_pages(series_ticker, min_close_ts=min_close_ts):
+            n += self.upsert_markets(page)
+            print(f"  [{scope}] {n} markets synced", end="\r")
+        print()
+
+        if series_ticker is not None:
+            for page in client.iter_event_pages(series_ticker):
+                self.upsert_events(page)
+
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                              (scope, started))
+        return n
+
+    def sync_series_list(self):
+        """Refresh the series table (a single unpaginated call)"""
+        return self.upsert_series(self._client().list_series())
+
+    def ensure(self, series_ticker=None):
+        """Sync a scope only if it has never been synced"""
+        scopes = [series_ticker, "*"] if series_ticker else ["*"]
+        if not any(self._synced_at(s) is not None for s in scopes):
+            self.sync(series_ticker)
+
+    # --- queries ------------------------------------------------------------
+
+    def search(self, query=None, series_ticker=None, status=None, closes_after=None,
+               closes_before=None, limit=None, raw=False):
+        """
+        Markets matching a text query (e.g. "cpi", "unemployment OR jobs",
+        "core*", "KXU3-26JAN*") and the given filters, as a DataFrame with
+        one row per market. The query goes through fts_query unless raw=True,
+        in which case it is passed to FTS5 MATCH as is. status may be a
+        string or a list. Times accept anything parse_time does.
+        """
+        sql = ("SELECT m.ticker, m.event_ticker, m.series_ticker, m.title, m.subtitle, "
+               "m.status, m.open_time, m.close_time FROM markets m")
+        where, args = [], []
+
+        if query:
+            sql += " JOIN markets_fts f ON f.rowid = m.rowid"
+            where.append("markets_fts MATCH ?")
+            args.append(query if raw else fts_query(query))
+        if series_ticker is not None:
+            series = [series_ticker] if isinstance(series_ticker, str) else list(series_ticker)
+            where.append(f"m.series_ticker IN ({', '.join('?' * len(series))})")
+            args.extend(series)
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            where.append(f"m.status IN ({', '.join('?' * len(statuses))})")
+            args.extend(statuses)
+        if closes_after is not None:
+            where.append("m.close_time >= ?")
+            args.append(parse_time(closes_after))
+        if closes_before is not None:
+            where.append("m.close_time <= ?")
+            args.append(parse_time(closes_before))
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY m.series_ticker, m.close_time"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        with self.lock:
+            df = pd.read_sql_query(sql, self.conn, params=args)
+        for col in ("open_time", "close_time"):
+            df[col] = pd.to_datetime(df[col], unit="s", utc=True)
+        return df
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+
+    def market(self, ticker):
+        """Full API record for one market, or None"""
+        row = self.conn.execute("SELECT raw FROM markets WHERE ticker = ?",
+                                (ticker,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def series_markets(self, series_ticker, status=None):
+        """Full API records for a series (what /markets?series_ticker= returns)"""
+        sql = "SELECT raw FROM markets WHERE series_ticker = ?"
+        args = [series_ticker]
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            sql += f" AND status IN ({', '.join('?' * len(statuses))})"
+            args.extend(statuses)
+        sql += " ORDER BY close_time"
+        return [json.loads(r[0]) for r in self.conn.execute(sql, args)]
+
+    def event_close_times(self, event_tickers):
+        """{event_ticker: latest close_time (epoch seconds) of its markets} for those held"""
+        events = list(event_tickers)
+        if not events:
+            return {}
+        rows = self.conn.execute(
+            "SELECT event_ticker, MAX(close_time) FROM markets "
+            f"WHERE event_ticker IN ({', '.join('?' * len(events))}) AND close_time IS NOT NULL "
+            "GROUP BY event_ticker", events)
+        return dict(rows.fetchall())
+
+    def find_series(self, query):
+        """Series whose ticker or title contains any of the given words"""
+        words = [query] if isinstance(query, str) else list(query)
+        clause = " OR ".join("ticker LIKE ? OR title LIKE ?" for _ in words)
+        args = [a for w in words for a in (f"%{w}%", f"%{w}%")]
+        with self.lock:
+            return pd.read_sql_query(
+                f"SELECT ticker, title, category, frequency FROM series WHERE {clause} "
+                "ORDER BY ticker", self.conn, params=args)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def fts_query(text):
+    """
+    Search text as an FTS5 MATCH expression. Every term is quoted, so
+    tickers like KXU3-26JAN* are matched literally rather than read as
+    column filters; a trailing * stays a prefix match, bare AND/OR/NOT
+    stay operators, and a prefix naming an indexed column (title:cpi*,
+    ticker:kxcpi*) stays a column filter.
+    """
+    terms = []
+    for term in text.split():
+        if term in FTS_OPERATORS:
+            terms.append(term)
+            continue
+        column, sep, rest = term.partition(":")
+        if sep and column.lower() in FTS_COLUMNS:
+            column, term = column.lower() + ":", rest
+        else:
+            column = ""
+        word = term.rstrip("*")
+        if word:
+            terms.append(column + '"' + word.replace('"', '""') + '"'
+                         + ("*" if word != term else ""))
+    return " ".join(terms)
+
+
+def get_catalog():
+    """Process-wide catalog at CATALOG_PATH"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = MarketCatalog()
+        return _catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Kalshi market catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sync", help="page markets from the API into the catalog")
+    p.add_argument("--series", nargs="*", help="only these series (default: everything)")
+    p.add_argument("--full", action="store_true", help="ignore previous syncs")
+
+    p = sub.add_parser("search", help="full-text search market titles")
+    p.add_argument("query", nargs="?")
+    p.add_argument("--series")
+    p.add_argument("--status", nargs="*")
+    p.add_argument("--closes-after")
+    p.add_argument("--closes-before")
+    p.add_argument("--limit", type=int, default=50)
+    p.add_argument("--raw", action="store_true", help="pass the query to FTS5 MATCH unchanged")
+
+    args = parser.parse_args(argv)
+    catalog = get_catalog()
+
+    if args.command == "sync":
+        catalog.sync_series_list()
+        for series in args.series or [None]:
+            n = catalog.sync(series, full=args.full)
+            print(f"✓ {series or 'all markets'}: {n} markets upserted")
+        return
+
+    try:
+        df = catalog.search(args.query, series_ticker=args.series, status=args.status or None,
+                            closes_after=args.closes_after, closes_before=args.closes_before,
+                            limit=args.limit, raw=args.raw)
+    except (sqlite3.Error, pd.errors.DatabaseError) as e:
+        print(f"✗ Bad search query {args.query!r}: {e}")
+        print('  Terms are matched literally; use OR/AND/NOT between terms and a trailing * '
+              'for prefixes (e.g. "KXU3-26JAN*", "cpi OR inflation")')
+        return
+    if df.empty:
+        print("No matching markets in the catalog (run `sync` first?)")
+    else:
+        print(df[["ticker", "series_ticker", "status", "close_time", "title"]]
+              .to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Mock Kalshi API
+Local stand-in for the public trade API serving synthetic, deterministic
+data, so pulls can be benchmarked and debugged with no network:
+
+    /exchange/status
+    /markets                (series_ticker, status, min/max_close_ts, limit, cursor)
+    /markets/{ticker}
+    /series, /series/{series_ticker}
+    /events                 (series_ticker, limit, cursor)
+    /series/{s}/markets/{t}/candlesticks   (start_ts, end_ts, period_interval)
+
+Latency, rate limiting (429 + Retry-After), random 5xx errors and the
+maximum page size are all configurable.
+
+    python src/mock_kalshi_server.py --port 8000 --latency 0.05 --rate-limit 20
+    KALSHI_API_BASE=http://127.0.0.1:8000 python src/debug_kalshi_api.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from kalshi_client import TokenBucket
+from kalshi_fetch import MAX_CANDLES_PER_REQUEST, SUPPORTED_INTERVALS
+
+SERIES = {
+    "KXU3": ("Unemployment", [3.8, 4.0, 4.2, 4.4, 4.6]),
+    "KXCPICOREYOY": ("Core CPI year-over-year", [2.5, 2.7, 2.9, 3.1, 3.3]),
+    "KXFED": ("Fed funds rate", [3.50, 3.75, 4.00, 4.25, 4.50]),
+}
+MONTHS = 24  # one event per series per month; the last closes at the start of next month
+PAGE_SIZE = 100
+DAY = 86400
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_markets(series=SERIES, months=MONTHS, now=None):
+    """
+    Synthetic markets: per series, one event a month with a ladder of
+    thresholds. Each market opens 60 days before it closes; markets that
+    have closed are finalized.
+    """
+    now = time.time() if now is None else now
+    today = datetime.fromtimestamp(now, tz=timezone.utc)
+    markets = []
+
+    for series_ticker, (title, thresholds) in series.items():
+        for k in range(months):
+            month = (today.year * 12 + today.month - 1) - (months - 1) + k + 1
+            year, mon = divmod(month, 12)
+            close = datetime(year, mon + 1, 1, 14, tzinfo=timezone.utc)
+            close_ts = int(close.timestamp())
+            event = f"{series_ticker}-{close:%y%b}".upper()
+
+            for thr in thresholds:
+                markets.append({
+                    "ticker": f"{event}-T{thr}",
+                    "event_ticker": event,
+                    "series_ticker": series_ticker,
+                    "title": f"{title} above {thr}%?",
+                    "subtitle": f"Above {thr}%",
+                    "status": "finalized" if close_ts < now else "active",
+                    "open_time": _iso(close_ts - 60 * DAY),
+                    "close_time": _iso(close_ts),
+                })
+
+    markets.sort(key=lambda m: m["close_time"])
+    return markets
+
+
+def make_candles(ticker, open_ts, close_ts, start_ts, end_ts, period_interval):
+    """
+    Deterministic candles for a market: the same (ticker, timestamp) always
+    gives the same prices, however the range is chunked.
+    """
+    step = period_interval * 60
+    lo = max(start_ts, open_ts)
+    hi = min(end_ts, close_ts)
+    if hi < lo:
+        return []
+
+    ts = np.arange((lo // step + 1) * step, hi + 1, step, dtype=np.int64)
+    seed = zlib.crc32(ticker.encode())
+    phase = (seed % 1000) / 1000 * 2 * np.pi
+    noise = ((ts * 2654435761 + seed) % 1000) / 1000 - 0.5
+    close = np.clip(50 + 35 * np.sin(ts / (30 * DAY) + phase) + 6 * noise, 1, 99).round()
+    spread = 1 + (ts // step) % 3
+
+    candles = []
+    for t, c, s in zip(ts.tolist(), close.tolist(), spread.tolist()):
+        c = int(c)
+        candles.append({
+            "end_period_ts": t,
+            "volume": int(t % 997),
+            "open_interest": 1000 + int(t % 4999),
+            "price": {"open": c, "high": min(99, c + s), "low": max(1, c - s), "close": c,
+                      "mean": c, "previous": c},
+            "yes_bid": {"open": c - 1, "high": c, "low": c - 2, "close": c - 1},
+            "yes_ask": {"open": c + 1, "high": c + 2, "low": c, "close": c + 1},
+        })
+    return candles
+
+
+class MockKalshiServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server playing the Kalshi API.
+
+    latency/jitter: seconds added to every response (uniform jitter)
+    rate_limit:     requests/sec before answering 429 (None = unlimited)
+    error_rate:     probability of a 503 on any request
+    page_size:      cap on markets/events per page, whatever limit asks for
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit=None,
+                 error_rate=0.0, page_size=PAGE_SIZE, series=SERIES, months=MONTHS, seed=0):
+        super().__init__((host, port), MockHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.limiter = None if rate_limit is None else TokenBucket(rate_limit, burst=rate_limit)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.series = series
+        self.markets = make_markets(series, months)
+        self.by_ticker = {m["ticker"]: m for m in self.markets}
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "candles": 0}
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in a background thread; returns self"""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def admit(self):
+        """None if the request may proceed, else (status, headers) to reply with"""
+        with self.lock:
+            self.stats["requests"] += 1
+            fail = self.rng.random() < self.error_rate
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+
+        if self.limiter is not None and not self.limiter.try_acquire():
+            self.count("throttled")
+            return 429, {"Retry-After": "1"}
+
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.count("errors")
+            return 503, {}
+        return None
+
+
+def _page(items, params, page_size):
+    start = int(params.get("cursor") or 0)
+    limit = min(int(params.get("limit") or page_size), page_size)
+    end = start + limit
+    return items[start:end], (str(end) if end < len(items) else "")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is exercised
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=None, headers=None):
+        data = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        srv = self.server
+        rejected = srv.admit()
+        if rejected is not None:
+            status, headers = rejected
+            return self.reply(status, {"error": "mock"}, headers)
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        # Accept both /markets and /trade-api/v2/markets
+        if parts[:2] == ["trade-api", "v2"]:
+            parts = parts[2:]
+
+        if parts == ["exchange", "status"]:
+            return self.reply(200, {"exchange_active": True, "trading_active": True})
+        if parts == ["markets"]:
+            return self.markets(params)
+        if len(parts) == 2 and parts[0] == "markets":
+            m = srv.by_ticker.get(parts[1].upper())
+            return self.reply(200, {"market": m}) if m else self.reply(404, {"error": "not found"})
+        if parts == ["series"]:
+            return self.reply(200, {"series": [self.series_record(s) for s in srv.series]})
+        if len(parts) == 2 and parts[0] == "series":
+            if parts[1].upper() not in srv.series:
+                return self.reply(404, {"error": "not found"})
+            return self.reply(200, {"series": self.series_record(parts[1].upper())})
+        if parts == ["events"]:
+            return self.events(params)
+        if len(parts) == 5 and parts[0] == "series" and parts[4] == "candlesticks":
+            return self.candlesticks(parts[1].upper(), parts[3].upper(), params)
+
+        self.reply(404, {"error": "unknown path"})
+
+    def series_record(self, ticker):
+        return {"ticker": ticker, "title": self.server.series[ticker][0],
+                "category": "Economics", "frequency": "monthly"}
+
+    def markets(self, params):
+        ms = self.server.markets
+        if "series_ticker" in params:
+            # Tickers are case-insensitive on the real API
+            ms = [m for m in ms if m["series_ticker"] == params["series_ticker"].upper()]
+        if "status" in params:
+            statuses = params["status"].split(",")
+            ms = [m for m in ms if m["status"] in statuses]
+        if "min_close_ts" in params:
+            lo = _iso(int(params["min_close_ts"]))
+            ms = [m for m in ms if m["close_time"] >= lo]
+        if "max_close_ts" in params:
+            hi = _iso(int(params["max_close_ts"]))
+            ms = [m for m in ms if m["close_time"] <= hi]
+
+        page, cursor = _page(ms, params, self.server.page_size)
+        self.reply(200, {"markets": page, "cursor": cursor})
+
+    def events(self, params):
+        seen = {}
+        for m in self.server.markets:
+            if params.get("series_ticker", m["series_ticker"]).upper() == m["series_ticker"]:
+                seen.setdefault(m["event_ticker"], {
+                    "event_ticker": m["event_ticker"], "series_ticker": m["series_ticker"],
+                    "title": m["title"].split(" above ")[0]})
+        page, cursor = _page(list(seen.values()), params, self.server.page_size)
+        self.reply(200, {"events": page, "cursor": cursor})
+
+    def candlesticks(self, series_ticker, ticker, params):
+        m = self.server.by_ticker.get(ticker)
+        if m is None or m["series_ticker"] != series_ticker:
+            return self.reply(404, {"error": "not found"})
+
+        try:
+            start_ts = int(params["start_ts"])
+            end_ts = int(params["end_ts"])
+            interval = int(params.get("period_interval", 1440))
+        except (KeyError, ValueError):
+            return self.reply(400, {"error": "start_ts, end_ts required"})
+        if interval not in SUPPORTED_INTERVALS:
+            return self.reply(400, {"error": "bad period_interval"})
+        if (end_ts - start_ts) // (interval * 60) > MAX_CANDLES_PER_REQUEST:
+            return self.reply(400, {"error": "too many candles requested"})
+
+        open_ts = int(datetime.fromisoformat(m["open_time"].replace("Z", "+00:00")).timestamp())
+        close_ts = int(datetime.fromisoformat(m["close_time"].replace("Z", "+00:00")).timestamp())
+        candles = make_candles(ticker, open_ts, close_ts, start_ts, end_ts, interval)
+        self.server.count("candles", len(candles))
+        self.reply(200, {"ticker": ticker, "candlesticks": candles})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock Kalshi API locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform latency")
+    parser.add_argument("--rate-limit", type=float, help="requests/sec before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503s")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--months", type=int, default=MONTHS)
+    args = parser.parse_args(argv)
+
+    server = MockKalshiServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                              rate_limit=args.rate_limit, error_rate=args.error_rate,
+                              page_size=args.page_size, months=args.months)
+    print(f"Mock Kalshi API on {server.url} ({len(server.markets)} markets)")
+    print(f"  export KALSHI_API_BASE={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Option Chains
+Loads option chains from local CSV/Parquet fixtures into one normalised
+frame, one row per contract:
+
+    date, expiry, strike, type ("C"/"P"), underlying, rate, div_yield,
+    iv (optional), bid/ask/mid (optional), T (years to expiry, ACT/365)
+
+A directory is read as the union of its *.csv and *.parquet files. Without
+a market-data feed, `make_fixture_chain` writes a synthetic SPX chain off
+the store's SPX and VIX closes (skewed smile, monthly expiries) so the
+options stages can run offline:
+
+    python src/option_chain.py --make-fixtures data/fixtures/options
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_DIR = "data/fixtures/options"
+COLUMNS = ["date", "expiry", "strike", "type", "underlying", "rate", "div_yield",
+           "iv", "bid", "ask", "mid"]
+
+
+def read_frame(path):
+    path = Path(path)
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+
+
+def write_frame(df, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def chain_files(path=FIXTURE_DIR):
+    """The fixture file itself, or every CSV/Parquet file in the directory"""
+    path = Path(path)
+    return sorted([*path.glob("*.parquet"), *path.glob("*.csv")]) if path.is_dir() else [path]
+
+
+def load_chain(path=FIXTURE_DIR, start=None, end=None):
+    """Normalised chain frame from a fixture file or directory"""
+    path = Path(path)
+    files = chain_files(path)
+    if not files:
+        raise FileNotFoundError(f"No option chain fixtures in {path}")
+    df = pd.concat([read_frame(f) for f in files], ignore_index=True)
+
+    df["date"] = pd.to_datetime(df["date"])
+    df["expiry"] = pd.to_datetime(df["expiry"])
+    if start is not None:
+        df = df[df["date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["date"] <= pd.Timestamp(end)]
+
+    df["type"] = df["type"].astype(str).str.upper().str[0]
+    for col, default in (("rate", 0.0), ("div_yield", 0.0)):
+        df[col] = df[col].fillna(default) if col in df.columns else default
+    if "mid" not in df.columns and {"bid", "ask"} <= set(df.columns):
+        df["mid"] = (df["bid"] + df["ask"]) / 2
+    for col in ("iv", "bid", "ask", "mid"):
+        if col not in df.columns:
+            df[col] = np.nan
+
+    df["T"] = (df["expiry"] - df["date"]).dt.days / 365.0
+    df = df[df["T"] > 0]
+    return df[[*COLUMNS, "T"]].sort_values(["date", "expiry", "type", "strike"]) \
+        .reset_index(drop=True)
+
+
+def chain_cube(chain, value, option_type="C"):
+    """
+    (dates, expiries, strikes, cube) with cube[d, e, k] = `value` for one
+    option type, NaN where no contract is listed.
+    """
+    c = chain[chain["type"] == option_type]
+    d, dates = pd.factorize(c["date"], sort=True)
+    e, expiries = pd.factorize(c["expiry"], sort=True)
+    k, strikes = pd.factorize(c["strike"], sort=True)
+    cube = np.full((len(dates), len(expiries), len(strikes)), np.nan)
+    cube[d, e, k] = c[value].to_numpy(np.float64)
+    return (np.asarray(dates, dtype="datetime64[D]"), np.asarray(expiries, dtype="datetime64[D]"),
+            np.asarray(strikes, dtype=np.float64), cube)
+
+
+def make_fixture_chain(spot, atm_vol, expiries_per_date=6, strike_step=25.0, width=0.3,
+                       rate=0.04, div_yield=0.013, spread=0.02, seed=0):
+    """
+    Synthetic chain: for each date (index of `spot`/`atm_vol`), calls and
+    puts on the next `expiries_per_date` monthly (third-Friday) expiries,
+    strikes every `strike_step` within ±`width` of spot. The smile is
+    skewed down-side and flattens with maturity; prices are Black-Scholes
+    on that smile with a small bid/ask spread.
+    """
+    from black_scholes import price
+
+    rng = np.random.default_rng(seed)
+    spot = spot.dropna()
+    atm_vol = atm_vol.reindex(spot.index).ffill().bfill()
+    dates = pd.DatetimeIndex(spot.index)
+    monthly = pd.date_range(dates.min(), dates.max() + pd.DateOffset(months=expiries_per_date + 1),
+                            freq="WOM-3FRI")
+
+    frames = []
+    for date, S, vol in zip(dates, spot.to_numpy(), atm_vol.to_numpy()):
+        exps = monthly[monthly > date][:expiries_per_date]
+        lo = np.floor(S * (1 - width) / strike_step) * strike_step
+        strikes = np.arange(lo, S * (1 + width) + strike_step, strike_step)
+        E, K = np.meshgrid(exps.to_numpy(), strikes, indexing="ij")
+        T = ((exps - date).days.to_numpy() / 365.0)[:, None]
+        m = np.log(K / S) / np.sqrt(T)
+        iv = np.clip(vol * (1 - 0.35 * m + 0.6 * m * m), 0.05, 2.0)
+        for typ in ("C", "P"):
+            mid = price(S, K, T, iv, rate, div_yield, call=typ == "C")
+            half = np.maximum(0.05, spread * mid) * rng.uniform(0.5, 1.0, mid.shape)
+            frames.append(pd.DataFrame({
+                "date": date, "expiry": E.ravel(), "strike": K.ravel(), "type": typ,
+                "underlying": S, "rate": rate, "div_yield": div_yield, "iv": iv.ravel(),
+                "bid": np.maximum(mid - half, 0.0).ravel(), "ask": (mid + half).ravel(),
+            }))
+    out = pd.concat(frames, ignore_index=True)
+    out["mid"] = (out["bid"] + out["ask"]) / 2
+    return out
+
+
+def main(argv=None):
+    from panel_store import read_iv
+
+    parser = argparse.ArgumentParser(description="Option chain fixtures")
+    parser.add_argument("--make-fixtures", metavar="DIR", default=None,
+                        help=f"write a synthetic SPX chain here (e.g. {FIXTURE_DIR})")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--expiries", type=int, default=6)
+    parser.add_argument("--strike-step", type=float, default=25.0)
+    args = parser.parse_args(argv)
+
+    if args.make_fixtures:
+        iv = read_iv(start=args.start, end=args.end, columns=["SPX", "VIX"]).set_index("date")
+        chain = make_fixture_chain(iv["SPX"], iv["VIX"] / 100, args.expiries, args.strike_step)
+        # One file per month keeps fixtures small enough to diff and reload piecemeal
+        for month, part in chain.groupby(chain["date"].dt.to_period("M")):
+            write_frame(part, Path(args.make_fixtures) / f"spx_{month}.parquet")
+        print(f"✓ Wrote {len(chain)} contracts ({chain['date'].nunique()} dates) "
+              f"to {args.make_fixtures}")
+        return chain
+
+    chain = load_chain(start=args.start, end=args.end)
+    print(f"{len(chain)} contracts, {chain['date'].min().date()} to {chain['date'].max().date()}")
+    return chain
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Incremental Panel Refresh
+Reads an existing panel, works out the last stored date per ticker and
+requests only the missing range. New rows are upserted on (ticker, date),
+so a daily refresh costs one request per live market instead of a full
+DAYS_BACK window for every market.
+
+Intraday panels (period_interval < 1440) hold many candles per day, so
+they are keyed on (ticker, end_period_ts) instead and the gap starts at
+the last stored candle rather than the last stored day.
+"""
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from kalshi_fetch import (MAX_IN_FLIGHT, PANEL_COLUMNS, fetch_panel_pages, parse_time,
+                          request_window)
+from panel_store import STORE_DIR, read_kalshi_panel, write_kalshi_panel
+
+
+def load_panel(series_ticker: str, root=STORE_DIR):
+    """Stored panel for a series with `date` as datetime.date (empty if missing)"""
+    try:
+        panel = read_kalshi_panel(series_ticker, root=root)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=PANEL_COLUMNS)
+
+    panel["date"] = panel["date"].dt.date
+    return panel
+
+
+def panel_key(period_interval: int = 1440):
+    """Upsert key for a panel of `period_interval`-minute candles"""
+    return ("ticker", "date") if period_interval >= 1440 else ("ticker", "end_period_ts")
+
+
+def last_dates(panel, key=("ticker", "date")):
+    """{ticker: last stored date}, or last end_period_ts when keyed on it"""
+    if panel.empty:
+        return {}
+    return panel.dropna(subset=[key[-1]]).groupby("ticker")[key[-1]].max().to_dict()
+
+
+def upsert(panel, new_rows, key=("ticker", "date")):
+    """Append new rows, letting them replace stored rows with the same key"""
+    if new_rows.empty:
+        return panel
+    if panel.empty:
+        return new_rows.sort_values(list(key)).reset_index(drop=True)
+
+    merged = pd.concat([panel, new_rows], ignore_index=True)
+    merged = merged.drop_duplicates(subset=list(key), keep="last")
+    return merged.sort_values(list(key)).reset_index(drop=True)
+
+
+def gap_window_fn(stored, period_interval: int = 1440):
+    """
+    window_fn for fetch_panel_pages that only asks for dates after what is
+    already stored. The last stored day (or, intraday, the last stored
+    candle) is re-requested because it may have been a partial bar when it
+    was written.
+    """
+    intraday = period_interval < 1440
+    span = period_interval * 60 if intraday else 86400
+
+    def window(rec, start_ts, end_ts):
+        last = stored.get(rec["ticker"])
+        if last is None:
+            return request_window(rec, start_ts, end_ts)
+
+        finalized = rec.get("status") == "finalized"
+        close_ts = parse_time(rec.get("close_time"))
+        if intraday:
+            last_ts = int(last) - span  # start of the last stored candle
+        else:
+            last_ts = int(datetime(last.year, last.month, last.day,
+                                   tzinfo=timezone.utc).timestamp())
+
+        if not finalized:
+            return max(start_ts, last_ts), end_ts, False
+
+        # Settled and already stored through its close: nothing can change
+        if close_ts is None or close_ts < last_ts + span:
+            return None
+
+        # Settled after we last stored it: the gap up to close is fixed, so
+        # the request stays cacheable even if the market stopped trading early
+        return max(start_ts, last_ts), close_ts, True
+
+    return window
+
+
+def refresh_panel(pages, series_ticker: str, start_ts: int, end_ts: int,
+                  pull_fn, select=None, max_markets: int = None,
+                  max_in_flight: int = MAX_IN_FLIGHT, root=STORE_DIR,
+                  carried=None, period_interval: int = 1440, **fetch_kwargs):
+    """
+    Incrementally refresh the stored panel for `series_ticker`. Only the
+    month partitions that received new rows are rewritten.
+    `carried` rows (e.g. from a resumed checkpoint) are written alongside
+    the freshly fetched ones; `period_interval` must match the candles
+    pull_fn returns; other keyword arguments go to fetch_panel_pages.
+    Returns the merged panel.
+    """
+    key = panel_key(period_interval)
+    existing = load_panel(series_ticker, root=root)
+    stored = last_dates(existing, key)
+    print(f"[{series_ticker}] existing panel: {len(existing)} rows, {len(stored)} tickers")
+
+    new_rows = fetch_panel_pages(pages, series_ticker, start_ts, end_ts, pull_fn,
+                                 select=select, max_markets=max_markets,
+                                 max_in_flight=max_in_flight,
+                                 window_fn=gap_window_fn(stored, period_interval),
+                                 **fetch_kwargs)
+    print(f"[{series_ticker}] fetched {len(new_rows)} new/updated rows")
+
+    if carried is not None and not carried.empty:
+        new_rows = pd.concat([carried, new_rows], ignore_index=True)
+
+    if not new_rows.empty:
+        write_kalshi_panel(new_rows, series_ticker, replace=False, key=key, root=root)
+    return upsert(existing, new_rows, key)
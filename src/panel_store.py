@@ -0,0 +1,238 @@
+"""
+Panel Store
+Columnar (Parquet) store for the Kalshi and Yahoo panels, replacing the
+CSV round-trips. Datasets are hive-partitioned by series and month:
+
+    data/store/kalshi/series=KXU3/month=2025-01/part-0.parquet
+    data/store/yahoo/month=2025-01/part-0.parquet
+
+Dates are stored as date32 and prices as float64, so nothing needs
+re-parsing on load. Readers push series/threshold/date filters down to
+pyarrow and only touch the partitions and columns they ask for.
+"""
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from candle_decode import COUNT_FIELDS, PRICE_FIELDS
+
+STORE_DIR = "data/store"
+KALSHI = "kalshi"
+KALSHI_LIVE = "kalshi_live"  # bars built from websocket ticks, same schema as KALSHI
+YAHOO = "yahoo"
+
+# Core panel columns, then every other decoded candle field (nullable, so
+# partitions written before they existed still read back cleanly)
+KALSHI_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("prob_close", pa.float64()),
+    ("ticker", pa.string()),
+    ("threshold", pa.float64()),
+    ("title", pa.string()),
+    ("end_period_ts", pa.int64()),
+] + [(f, pa.float64()) for f in PRICE_FIELDS if f != "price_close"]
+  + [(f, pa.float64()) for f in COUNT_FIELDS])
+
+
+def _dataset_dir(dataset: str, root=STORE_DIR):
+    return Path(root) / dataset
+
+
+def _partition_fields(with_series: bool):
+    fields = [pa.field("series", pa.string())] if with_series else []
+    fields.append(pa.field("month", pa.string()))
+    return fields
+
+
+def _partitioning(with_series: bool):
+    return ds.partitioning(pa.schema(_partition_fields(with_series)), flavor="hive")
+
+
+def _open(base, with_series: bool, schema=None):
+    if schema is not None:
+        schema = pa.schema(list(schema) + _partition_fields(with_series))
+    return ds.dataset(base, format="parquet", schema=schema,
+                      partitioning=_partitioning(with_series))
+
+
+def _month_key(d):
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def _to_date(value):
+    if value is None:
+        return None
+    return pd.Timestamp(value).date()
+
+
+def _to_table(df, schema=None):
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    df["month"] = [_month_key(d) for d in df["date"]]
+
+    if schema is None:
+        for c in df.columns:
+            if c not in ("date", "month", "series") and pd.api.types.is_numeric_dtype(df[c]):
+                df[c] = df[c].astype("float64")
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    fields = list(schema) + [pa.field(c, pa.string()) for c in ("series", "month") if c in df.columns]
+    schema = pa.schema(fields)
+    return pa.Table.from_pandas(df.reindex(columns=schema.names), schema=schema,
+                                preserve_index=False)
+
+
+def write_panel(df, dataset: str, series: str = None, replace: bool = True,
+                key=("date",), schema=None, root=STORE_DIR):
+    """
+    Write `df` into `dataset`. With replace=True the whole series (or the
+    whole dataset, if unpartitioned by series) is rewritten. Otherwise rows
+    are upserted on `key`, and only the month partitions `df` touches are
+    read and rewritten.
+    """
+    base = _dataset_dir(dataset, root)
+    df = df.copy()
+    if df.empty and not replace:
+        return
+
+    if replace:
+        target = base / f"series={series}" if series is not None else base
+        if target.exists():
+            shutil.rmtree(target)
+    elif base.exists():
+        months = sorted({_month_key(d) for d in pd.to_datetime(df["date"])})
+        existing = _read_months(base, series, months, schema)
+        if not existing.empty:
+            df["date"] = pd.to_datetime(df["date"])
+            df = pd.concat([existing, df], ignore_index=True)
+            df = df.drop_duplicates(subset=list(key), keep="last")
+
+    if df.empty:
+        return
+    if series is not None:
+        df["series"] = series
+
+    ds.write_dataset(
+        _to_table(df, schema),
+        base,
+        format="parquet",
+        partitioning=_partitioning(series is not None),
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+
+
+def _read_months(base, series, months, schema=None):
+    """Rows of the given month partitions (without partition columns)"""
+    with_series = series is not None
+    dataset_obj = _open(base, with_series, schema)
+    expr = ds.field("month").isin(months)
+    if with_series:
+        expr = expr & (ds.field("series") == series)
+
+    df = dataset_obj.to_table(filter=expr).to_pandas()
+    df = df.drop(columns=[c for c in ("series", "month") if c in df.columns])
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def _filter(series=None, thresholds=None, start=None, end=None):
+    expr = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    if series is not None:
+        series = [series] if isinstance(series, str) else list(series)
+        expr = both(expr, ds.field("series").isin(series))
+    if thresholds is not None:
+        expr = both(expr, ds.field("threshold").isin([float(t) for t in thresholds]))
+
+    start, end = _to_date(start), _to_date(end)
+    if start is not None:
+        # Month comparison prunes whole directories; date comparison trims rows
+        expr = both(expr, ds.field("month") >= _month_key(start))
+        expr = both(expr, ds.field("date") >= start)
+    if end is not None:
+        expr = both(expr, ds.field("month") <= _month_key(end))
+        expr = both(expr, ds.field("date") <= end)
+
+    return expr
+
+
+def read_panel(dataset: str, series=None, thresholds=None, start=None, end=None,
+               columns=None, schema=None, root=STORE_DIR):
+    """
+    Load a dataset as a DataFrame with `date` as datetime64.
+    Only the requested series, thresholds, date range and columns are read.
+    """
+    base = _dataset_dir(dataset, root)
+    if not base.exists():
+        raise FileNotFoundError(f"{base} not found. Run the pull scripts first.")
+
+    with_series = any(p.name.startswith("series=") for p in base.iterdir())
+    dataset_obj = _open(base, with_series, schema)
+
+    if columns is not None:
+        columns = list(dict.fromkeys(["date", *columns]))
+
+    table = dataset_obj.to_table(
+        columns=columns,
+        filter=_filter(series if with_series else None, thresholds, start, end),
+    )
+    df = table.to_pandas()
+    if columns is None:
+        df = df.drop(columns=["month"])
+    df["date"] = pd.to_datetime(df["date"])
+    return df.sort_values("date").reset_index(drop=True)
+
+
+def list_thresholds(series: str, root=STORE_DIR):
+    """Sorted thresholds stored for a Kalshi series (reads one column)"""
+    df = read_panel(KALSHI, series=series, columns=["threshold"], schema=KALSHI_SCHEMA,
+                    root=root)
+    return sorted(df["threshold"].unique())
+
+
+def write_kalshi_panel(panel, series_ticker: str, replace: bool = True,
+                       key=("ticker", "date"), root=STORE_DIR):
+    """Pass key=("ticker", "end_period_ts") when upserting intraday candles"""
+    write_panel(panel, KALSHI, series=series_ticker, replace=replace,
+                key=key, schema=KALSHI_SCHEMA, root=root)
+
+
+def read_kalshi_panel(series_ticker: str, thresholds=None, start=None, end=None,
+                      columns=None, root=STORE_DIR):
+    df = read_panel(KALSHI, series=series_ticker, thresholds=thresholds, start=start,
+                    end=end, columns=columns, schema=KALSHI_SCHEMA, root=root)
+    if "series" in df.columns:
+        df = df.drop(columns=["series"])
+    return df
+
+
+def write_live_bars(bars, series_ticker: str, root=STORE_DIR):
+    """Upsert intraday bars on (ticker, end_period_ts)"""
+    write_panel(bars, KALSHI_LIVE, series=series_ticker, replace=False,
+                key=("ticker", "end_period_ts"), schema=KALSHI_SCHEMA, root=root)
+
+
+def read_live_bars(series_ticker: str, start=None, end=None, columns=None, root=STORE_DIR):
+    df = read_panel(KALSHI_LIVE, series=series_ticker, start=start, end=end,
+                    columns=columns, schema=KALSHI_SCHEMA, root=root)
+    if "series" in df.columns:
+        df = df.drop(columns=["series"])
+    return df.sort_values(["date", "end_period_ts"] if "end_period_ts" in df.columns
+                          else ["date"]).reset_index(drop=True)
+
+
+def write_iv(df, replace: bool = True, root=STORE_DIR):
+    """replace=False upserts on date, touching only the months in `df`"""
+    write_panel(df, YAHOO, replace=replace, root=root)
+
+
+def read_iv(start=None, end=None, columns=None, root=STORE_DIR):
+    return read_panel(YAHOO, start=start, end=end, columns=columns, root=root)
@@ -0,0 +1,120 @@
+"""
+Pull Checkpoints
+Records each market a pull job has finished, with its rows, so a job that
+crashes or is interrupted resumes where it stopped instead of re-pulling
+the whole series. Layout per series:
+
+    data/checkpoints/KXU3/job.json           job settings, request window, finished tickers
+    data/checkpoints/KXU3/rows/<ticker>.parquet
+
+A checkpoint is only resumed by a job with the same settings, and only
+within MAX_AGE; it is removed once the job has written its panel with no
+failed markets.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+CHECKPOINT_DIR = "data/checkpoints"
+MAX_AGE = 24 * 60 * 60  # seconds; older checkpoints are discarded
+
+
+class PullCheckpoint:
+    """Thread-safe record of finished markets for one series pull"""
+
+    def __init__(self, series_ticker: str, job: dict, root=CHECKPOINT_DIR, max_age=MAX_AGE):
+        self.series_ticker = series_ticker
+        self.dir = Path(root) / series_ticker
+        self.rows_dir = self.dir / "rows"
+        self.manifest = self.dir / "job.json"
+        self.lock = threading.Lock()
+
+        self.job = dict(job)
+        self.window = None
+        self.done = {}  # ticker -> rows saved
+        self.failed = {}  # ticker -> last error
+
+        state = self._load()
+        fresh = state is not None and time.time() - state["created_at"] <= max_age
+        if fresh and state["job"] == self.job:
+            self.created_at = state["created_at"]
+            self.window = tuple(state["window"]) if state.get("window") else None
+            self.done = state["done"]
+        else:
+            self.clear()
+            self.created_at = time.time()
+
+    @property
+    def resumed(self):
+        return bool(self.done)
+
+    def _load(self):
+        try:
+            with open(self.manifest) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        body = json.dumps({"job": self.job, "created_at": self.created_at,
+                           "window": self.window, "done": self.done})
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(body)
+        os.replace(tmp, self.manifest)
+
+    def start(self, start_ts: int, end_ts: int):
+        """
+        Request window for this job: a resumed job keeps the window it was
+        started with, so finished and remaining markets line up.
+        """
+        with self.lock:
+            if self.window is None:
+                self.window = (int(start_ts), int(end_ts))
+                self._save()
+            return self.window
+
+    def mark_done(self, rec, rows):
+        """fetch_panel_pages on_result hook; `rows` may be empty"""
+        ticker = rec["ticker"]
+        n = 0 if rows is None else len(rows)
+        if n:
+            self.rows_dir.mkdir(parents=True, exist_ok=True)
+            path = self.rows_dir / f"{ticker}.parquet"
+            tmp = path.with_suffix(".tmp")
+            rows.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+
+        with self.lock:
+            self.done[ticker] = n
+            self.failed.pop(ticker, None)
+            self._save()
+
+    def mark_failed(self, rec, error):
+        """fetch_panel_pages on_error hook"""
+        with self.lock:
+            self.failed[rec["ticker"]] = str(error)
+
+    def rows(self):
+        """Every checkpointed market's rows as one frame"""
+        frames = [pd.read_parquet(self.rows_dir / f"{t}.parquet")
+                  for t, n in self.done.items() if n]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def clear(self):
+        with self.lock:
+            if self.dir.exists():
+                shutil.rmtree(self.dir)
+            self.window = None
+            self.done = {}
+            self.failed = {}
@@ -0,0 +1,269 @@
+"""
+Request Metrics
+Per-endpoint instrumentation for Kalshi and Yahoo requests: status,
+latency, payload bytes, retries, time spent waiting (rate limiter,
+circuit breaker, backoff) and cache hit/miss, aggregated into latency
+histograms. Named stages (e.g. candle decoding) are timed the same way,
+so a slow run shows whether it was bound by latency, rate limits or
+decoding.
+
+    from request_metrics import get_metrics
+    get_metrics().summary()                       # table at end of run
+    get_metrics().dump("outputs/pull_metrics.json")   # or .prom
+"""
+
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# Upper bounds in seconds (Prometheus client defaults); the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# /series/KXU3/markets/KXU3-25JAN-T4.2/candlesticks -> /series/{series}/markets/{ticker}/candlesticks
+_ENDPOINT_RULES = [
+    (re.compile(r"/series/[^/]+/markets/[^/]+/candlesticks$"),
+     "/series/{series}/markets/{ticker}/candlesticks"),
+    (re.compile(r"/markets/[^/]+$"), "/markets/{ticker}"),
+    (re.compile(r"/series/[^/]+$"), "/series/{series}"),
+    (re.compile(r"/events/[^/]+$"), "/events/{event}"),
+]
+
+
+def endpoint_template(path: str):
+    """Collapse ticker-specific path segments so requests aggregate per endpoint"""
+    path = "/" + path.lstrip("/")
+    for pattern, template in _ENDPOINT_RULES:
+        if pattern.search(path):
+            return pattern.sub(template, path)
+    return path
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with exact count/sum/min/max"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = np.asarray(buckets, dtype=float)
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def observe(self, value):
+        self.counts[np.searchsorted(self.bounds, value, side="left")] += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile q, capped at the observed max"""
+        n = self.count
+        if n == 0:
+            return float("nan")
+        i = int(np.searchsorted(np.cumsum(self.counts), q * n, side="left"))
+        return min(float(self.bounds[i]), self.max) if i < len(self.bounds) else self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5) if self.count else None,
+            "p95": self.quantile(0.95) if self.count else None,
+            "buckets": {**{f"{b:g}": int(c) for b, c in
+                           zip(self.bounds, np.cumsum(self.counts[:-1]))},
+                        "+Inf": self.count},
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.wait = Histogram()
+        self.statuses = {}
+        self.bytes = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def to_dict(self):
+        return {
+            "requests": self.latency.count,
+            "statuses": dict(self.statuses),
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "latency": self.latency.to_dict(),
+            "wait": self.wait.to_dict(),
+        }
+
+
+class RequestMetrics:
+    """Thread-safe registry of per-(source, endpoint) stats and stage timings"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}  # (source, endpoint) -> EndpointStats
+        self.stages = {}  # name -> Histogram
+
+    def record(self, source, endpoint, status, latency, nbytes=0, retries=0,
+               wait=0.0, cache=None):
+        """
+        One logical request. `latency` is time on the wire (all attempts),
+        `wait` time blocked before sending; `cache` is "hit", "miss" or None.
+        """
+        key = (source, endpoint_template(endpoint) if source == "kalshi" else endpoint)
+        with self.lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.latency.observe(latency)
+            stats.wait.observe(wait)
+            stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+            stats.bytes += int(nbytes)
+            stats.retries += int(retries)
+            if cache == "hit":
+                stats.cache_hits += 1
+            elif cache == "miss":
+                stats.cache_misses += 1
+
+    def observe_stage(self, name, seconds):
+        with self.lock:
+            hist = self.stages.get(name)
+            if hist is None:
+                hist = self.stages[name] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of non-request work, e.g. `with metrics.stage("kalshi.decode"):`"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - t0)
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.endpoints = {}
+            self.stages = {}
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "elapsed": time.time() - self.started,
+                "endpoints": [{"source": s, "endpoint": e, **stats.to_dict()}
+                              for (s, e), stats in sorted(self.endpoints.items())],
+                "stages": {name: h.to_dict() for name, h in sorted(self.stages.items())},
+            }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+
+        def hist(metric, labels, h):
+            label = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            cum = np.cumsum(h.counts)
+            for b, c in zip(h.bounds, cum[:-1]):
+                lines.append(f'{metric}_bucket{{{label},le="{b:g}"}} {int(c)}')
+            lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {int(cum[-1])}')
+            lines.append(f"{metric}_sum{{{label}}} {h.total:.6f}")
+            lines.append(f"{metric}_count{{{label}}} {h.count}")
+
+        with self.lock:
+            items = sorted(self.endpoints.items())
+            stages = sorted(self.stages.items())
+
+            lines.append("# TYPE pull_request_latency_seconds histogram")
+            for (source, endpoint), st in items:
+                hist("pull_request_latency_seconds", {"source": source, "endpoint": endpoint},
+                     st.latency)
+            lines.append("# TYPE pull_request_wait_seconds histogram")
+            for (source, endpoint), st in items:
+                hist("pull_request_wait_seconds", {"source": source, "endpoint": endpoint},
+                     st.wait)
+
+            counters = [
+                ("pull_requests_total", lambda st: st.statuses.items(), "status"),
+                ("pull_response_bytes_total", lambda st: [(None, st.bytes)], None),
+                ("pull_request_retries_total", lambda st: [(None, st.retries)], None),
+                ("pull_cache_requests_total",
+                 lambda st: [("hit", st.cache_hits), ("miss", st.cache_misses)], "result"),
+            ]
+            for metric, values, extra in counters:
+                lines.append(f"# TYPE {metric} counter")
+                for (source, endpoint), st in items:
+                    for tag, v in values(st):
+                        label = f'source="{source}",endpoint="{endpoint}"'
+                        if extra is not None:
+                            label += f',{extra}="{tag}"'
+                        lines.append(f"{metric}{{{label}}} {v}")
+
+            lines.append("# TYPE pull_stage_seconds histogram")
+            for name, h in stages:
+                hist("pull_stage_seconds", {"stage": name}, h)
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write JSON, or Prometheus text if `path` ends in .prom/.txt"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix in (".prom", ".txt"):
+            path.write_text(self.to_prometheus())
+        else:
+            path.write_text(json.dumps(self.to_dict(), indent=2))
+        print(f"✓ Metrics written to {path}")
+
+    def summary(self):
+        """Print a per-endpoint and per-stage table"""
+        data = self.to_dict()
+        if not data["endpoints"] and not data["stages"]:
+            return
+
+        def ms(v):
+            return "-" if v is None else f"{v * 1000:.0f}"
+
+        print("\n" + "=" * 100)
+        print(f"Request summary ({data['elapsed']:.1f}s)")
+        print("=" * 100)
+        print(f"{'source':<7} {'endpoint':<46} {'reqs':>6} {'p50ms':>6} {'p95ms':>6} "
+              f"{'maxms':>6} {'waits':>6} {'MB':>7} {'retry':>5} {'hit%':>5}  statuses")
+        for e in data["endpoints"]:
+            lat, wait = e["latency"], e["wait"]
+            looked_up = e["cache_hits"] + e["cache_misses"]
+            hit = f"{100 * e['cache_hits'] / looked_up:.0f}" if looked_up else "-"
+            statuses = " ".join(f"{k}:{v}" for k, v in sorted(e["statuses"].items()))
+            print(f"{e['source']:<7} {e['endpoint'][:46]:<46} {e['requests']:>6} "
+                  f"{ms(lat['p50']):>6} {ms(lat['p95']):>6} {ms(lat['max']):>6} "
+                  f"{wait['sum']:>6.1f} {e['bytes'] / 1e6:>7.2f} {e['retries']:>5} {hit:>5}  "
+                  f"{statuses}")
+
+        if data["stages"]:
+            print("-" * 100)
+            for name, h in data["stages"].items():
+                print(f"stage   {name:<46} {h['count']:>6} {ms(h['p50']):>6} {ms(h['p95']):>6} "
+                      f"{ms(h['max']):>6} total {h['sum']:.2f}s")
+        print("(p50/p95 are histogram bucket bounds; waits = seconds blocked on "
+              "rate limiter/breaker/backoff)")
+
+
+_metrics = RequestMetrics()
+
+
+def get_metrics():
+    """Process-wide metrics registry"""
+    return _metrics
@@ -0,0 +1,244 @@
+"""
+Resampling Significance
+Bootstrap confidence bands and permutation p-values for the lead-lag
+correlations and Granger F-tests, instead of leaning on asymptotics for a
+couple of hundred daily changes.
+
+- Moving-block bootstrap (circular blocks) of the (x[t], y[t + lag]) pairs
+  keeps short-range autocorrelation and gives a percentile band per lag.
+- Circular-shift permutation rotates x against y, which destroys any
+  cross-dependence but keeps each series' own autocorrelation, giving a
+  null distribution for |corr| at every lag and for the Granger F.
+
+Every resample is an index array; a chunk of replicates is evaluated as
+one batched numpy call. Chunks run on a process pool, each with its own
+child of one SeedSequence, so results depend on `seed` only, not on the
+number of workers or scheduling order.
+
+    python src/resampling.py --series KXU3 --n 10000
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from cross_corr import lagged_corr
+from granger_batch import granger_ftest
+
+N_RESAMPLES = 10000
+CHUNK = 500
+
+
+def default_block(T):
+    """Block length ~ T^(1/3), the usual rate for block bootstraps"""
+    return max(1, int(round(T ** (1 / 3))))
+
+
+def block_bootstrap_indices(rng, T, n, block):
+    """(n, T) moving-block bootstrap indices; blocks wrap around the end"""
+    n_blocks = -(-T // block)
+    starts = rng.integers(0, T, size=(n, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)) % T
+    return idx.reshape(n, -1)[:, :T]
+
+
+def circular_shift_indices(rng, T, n, min_shift):
+    """(n, T) indices rotating the series by a shift in [min_shift, T - min_shift]"""
+    shifts = rng.integers(min_shift, T - min_shift + 1, size=n)
+    return (np.arange(T) + shifts[:, None]) % T
+
+
+def _lagged_pairs(x, y, max_lag):
+    """xs[k, t] = x[t - lag_k] (NaN outside), so corr(xs[k], y) is lagged_corr's lag k"""
+    T = len(x)
+    lags = np.arange(-max_lag, max_lag + 1)
+    xs = np.full((len(lags), T), np.nan)
+    for k, lag in enumerate(lags):
+        if lag >= 0:
+            xs[k, lag:] = x[:T - lag]
+        else:
+            xs[k, :lag] = x[-lag:]
+    return lags, xs
+
+
+def _pair_corr(a, b):
+    """Pearson correlation along the last axis over pairs where both are present"""
+    m = ~(np.isnan(a) | np.isnan(b))
+    n = m.sum(axis=-1)
+    a = np.where(m, a, 0.0)
+    b = np.where(m, b, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ma = a.sum(axis=-1, keepdims=True) / n[..., None]
+        mb = b.sum(axis=-1, keepdims=True) / n[..., None]
+        da = np.where(m, a - ma, 0.0)
+        db = np.where(m, b - mb, 0.0)
+        corr = (da * db).sum(-1) / np.sqrt((da * da).sum(-1) * (db * db).sum(-1))
+    return np.where(n >= 2, corr, np.nan)
+
+
+def _run_chunk(task):
+    kind, seed, n, x, y, params = task
+    rng = np.random.default_rng(seed)
+    T = len(x)
+
+    if kind == "boot_corr":
+        _, xs = _lagged_pairs(x, y, params["max_lag"])
+        idx = block_bootstrap_indices(rng, T, n, params["block"])
+        return _pair_corr(xs[:, idx], y[idx]).T  # (n, lags)
+
+    idx = circular_shift_indices(rng, T, n, params["min_shift"])
+    if kind == "perm_corr":
+        return lagged_corr(x[idx], y, params["max_lag"])[1]  # (n, lags)
+    if kind == "perm_granger":
+        return granger_ftest(y, x[idx], params["maxlag"])["F"]  # (n, maxlag)
+    raise ValueError(f"unknown resample kind {kind!r}")
+
+
+def run_resamples(kind, x, y, n, seed=0, workers=None, chunk=CHUNK, **params):
+    """
+    `n` replicates of statistic `kind`, stacked (n, ...). Work is split into
+    chunks seeded from SeedSequence(seed).spawn, and spread over `workers`
+    processes (all CPUs by default; 1 runs inline).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    sizes = [min(chunk, n - i) for i in range(0, n, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(kind, s, k, x, y, params) for s, k in zip(seeds, sizes)]
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return np.concatenate([_run_chunk(t) for t in tasks])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(_run_chunk, tasks)))
+
+
+def bootstrap_corr(x, y, max_lag, n=N_RESAMPLES, block=None, alpha=0.05, seed=0,
+                   workers=None):
+    """
+    Lead-lag correlations with moving-block bootstrap percentile bands.
+    Returns dict: lags, corr, lo, hi, se (each per lag).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    lags, corr = lagged_corr(x, y, max_lag)
+    boot = run_resamples("boot_corr", x, y, n, seed=seed, workers=workers,
+                         max_lag=len(lags) // 2, block=block or default_block(len(x)))
+    lo, hi = np.nanquantile(boot, [alpha / 2, 1 - alpha / 2], axis=0)
+    return {"lags": lags, "corr": corr, "lo": lo, "hi": hi, "se": np.nanstd(boot, axis=0)}
+
+
+def permutation_corr(x, y, max_lag, n=N_RESAMPLES, min_shift=None, alpha=0.05, seed=0,
+                     workers=None):
+    """
+    Circular-shift null for the lead-lag correlations. Returns dict: lags,
+    corr, pvalue (two-sided, per lag), null_lo, null_hi (null band per lag).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    lags, corr = lagged_corr(x, y, max_lag)
+    max_lag = len(lags) // 2
+    null = run_resamples("perm_corr", x, y, n, seed=seed, workers=workers, max_lag=max_lag,
+                         min_shift=min_shift or 2 * max_lag + 1)
+    exceed = (np.abs(null) >= np.abs(corr)).sum(axis=0)
+    null_lo, null_hi = np.nanquantile(null, [alpha / 2, 1 - alpha / 2], axis=0)
+    return {"lags": lags, "corr": corr, "pvalue": (1 + exceed) / (1 + n),
+            "null_lo": null_lo, "null_hi": null_hi}
+
+
+def permutation_granger(y, x, maxlag, n=N_RESAMPLES, min_shift=None, seed=0, workers=None):
+    """
+    Circular-shift permutation p-values for "x Granger-causes y" at lags
+    1..maxlag, next to the asymptotic ones. Returns dict: F, pvalue,
+    perm_pvalue.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    obs = granger_ftest(y, x, maxlag)
+    null = run_resamples("perm_granger", x, y, n, seed=seed, workers=workers, maxlag=maxlag,
+                         min_shift=min_shift or 2 * maxlag + 1)
+    exceed = (null >= obs["F"]).sum(axis=0)
+    return {"F": obs["F"], "pvalue": obs["pvalue"], "perm_pvalue": (1 + exceed) / (1 + n)}
+
+
+def plot_bands(boot, perm, path, var1="Kalshi", var2="VIX"):
+    lags = boot["lags"]
+    fig, ax = plt.subplots(figsize=(12, 6))
+    colors = ['#2E86AB' if x >= 0 else '#A23B72' for x in lags]
+    ax.bar(lags, boot["corr"], color=colors, alpha=0.7, edgecolor='black')
+    ax.errorbar(lags, boot["corr"], yerr=[boot["corr"] - boot["lo"], boot["hi"] - boot["corr"]],
+                fmt='none', ecolor='black', capsize=3, label='95% block-bootstrap CI')
+    ax.fill_between(lags, perm["null_lo"], perm["null_hi"], color='gray', alpha=0.25,
+                    step='mid', label='95% circular-shift null')
+    ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+    ax.axvline(x=0, color='gray', linestyle='--', linewidth=1)
+
+    ax.set_xlabel('Lag (days)', fontsize=12)
+    ax.set_ylabel('Correlation', fontsize=12)
+    ax.set_title(f'Lead-Lag Correlation with Resampling Bands: {var1} vs {var2}',
+                 fontsize=14, fontweight='bold')
+    ax.legend(loc='best')
+    ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def main(argv=None):
+    from granger_rolling import load_changes
+
+    parser = argparse.ArgumentParser(description="Bootstrap/permutation significance")
+    parser.add_argument("--series", default="KXU3")
+    parser.add_argument("--n", type=int, default=N_RESAMPLES, help="replicates per test")
+    parser.add_argument("--max-lag", type=int, default=10)
+    parser.add_argument("--maxlag", type=int, default=5, help="Granger lags")
+    parser.add_argument("--block", type=int, help="bootstrap block length (default T^1/3)")
+    parser.add_argument("--workers", type=int, help="processes (default: all CPUs)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"RESAMPLING SIGNIFICANCE: {args.series} ({args.n} replicates)")
+    print("=" * 70)
+
+    df, mid_thr = load_changes(args.series)
+    x, y = df["kalshi_change"].to_numpy(), df["vix_change"].to_numpy()
+    print(f"Threshold: {mid_thr}, {len(df)} daily changes, "
+          f"block length {args.block or default_block(len(x))}")
+
+    t0 = time.perf_counter()
+    boot = bootstrap_corr(x, y, args.max_lag, args.n, args.block, seed=args.seed,
+                          workers=args.workers)
+    perm = permutation_corr(x, y, args.max_lag, args.n, seed=args.seed, workers=args.workers)
+    gc = permutation_granger(y, x, args.maxlag, args.n, seed=args.seed, workers=args.workers)
+    print(f"✓ Resampling done in {time.perf_counter() - t0:.1f}s")
+
+    print(f"\n{'Lag':<6} {'Corr':>8} {'95% CI':>18} {'perm p':>8}")
+    print("-" * 44)
+    for k, lag in enumerate(boot["lags"]):
+        if abs(lag) <= 5:
+            print(f"{lag:<6} {boot['corr'][k]:>8.4f} "
+                  f"[{boot['lo'][k]:>7.4f}, {boot['hi'][k]:>7.4f}] {perm['pvalue'][k]:>8.4f}")
+
+    print("\nGranger Kalshi → VIX")
+    print(f"{'Lag':<6} {'F-stat':<12} {'asym p':<10} {'perm p':<10} {'Result'}")
+    print("-" * 56)
+    for p in range(args.maxlag):
+        result = "✓ Significant" if gc["perm_pvalue"][p] < 0.05 else "✗ Not significant"
+        print(f"{p + 1:<6} {gc['F'][p]:<12.4f} {gc['pvalue'][p]:<10.4f} "
+              f"{gc['perm_pvalue'][p]:<10.4f} {result}")
+
+    Path("outputs").mkdir(exist_ok=True)
+    plot_bands(boot, perm, "outputs/granger_unemployment_leadlag_bands.png")
+    print("\n✓ Saved granger_unemployment_leadlag_bands.png")
+    return boot, perm, gc
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Risk-Neutral Density
+The options side of the Kalshi-vs-options comparison in docs/main.tex: a
+full risk-neutral distribution of the underlying per date and expiry
+(Breeden-Litzenberger), instead of one VIX level.
+
+    P(S_T > K) = -e^{rT} ∂C/∂K        density = e^{rT} ∂²C/∂K²
+
+Quoted mids are noisy, so they are not differenced directly. For every
+(date, expiry) slice at once:
+
+- Out-of-the-money mids (puts below the forward, calls above) are turned
+  into implied vols (implied_vol).
+- A polynomial smile σ(x), x = log(K/F)/√T, is fitted by least squares
+  weighted by vega² (≈ least squares in price, so far-wing quotes stuck
+  at a minimum tick barely count), from stacked normal equations: one
+  solve for all slices.
+- The smooth call-price curve C(K) = BS(K, σ(x(K))) is differentiated
+  twice by central differences, inside each slice's quoted strike range
+  only (no extrapolation into the wings).
+
+The result is a density grid in the ladder_density layout, with expiries
+as the keys. It is cached under data/density/ and rebuilt only when a
+chain file is newer than the cache or the fit settings change:
+
+    key       (E,)       expiry, YYYY-MM-DD
+    dates     (D,)       datetime64[D]
+    strikes   (K,)       every strike listed in the chain
+    survival  (E, D, K)  P(S_T > strike)
+    pmf, pdf             from ladder_pmf
+    density   (E, D, K)  e^{rT} ∂²C/∂K² at each strike
+    forward, fit_rmse (E, D)
+    fit       ()         price column and smile degree, e.g. "mid/2"
+
+    python src/risk_neutral_density.py --chain data/fixtures/options
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from black_scholes import price, vega
+from implied_vol import CONVERGED, SIGMA_HI, SIGMA_LO, implied_vol
+from ladder_density import DENSITY_DIR, grid_path, ladder_pmf, load_grid, save_grid
+
+DEGREE = 2
+BUMP = 1e-3  # finite-difference step, as a fraction of the forward
+
+
+def otm_smiles(chain, price_col="mid"):
+    """
+    Implied vol and vega of the out-of-the-money contract at every strike
+    as (D, E, K) cubes, plus the (D, E) spot, rate, dividend yield and T.
+    """
+    d, dates = pd.factorize(chain["date"], sort=True)
+    e, expiries = pd.factorize(chain["expiry"], sort=True)
+    k, strikes = pd.factorize(chain["strike"], sort=True)
+
+    S = chain["underlying"].to_numpy(np.float64)
+    K = chain["strike"].to_numpy(np.float64)
+    T = chain["T"].to_numpy(np.float64)
+    r = chain["rate"].to_numpy(np.float64)
+    q = chain["div_yield"].to_numpy(np.float64)
+    call = chain["type"].to_numpy() == "C"
+    otm = np.where(call, K >= S * np.exp((r - q) * T), K < S * np.exp((r - q) * T))
+
+    iv, status, _ = implied_vol(chain[price_col].to_numpy(np.float64)[otm], S[otm], K[otm],
+                                T[otm], r[otm], q[otm], call[otm])
+    ok = status == CONVERGED
+    shape = (len(dates), len(expiries))
+    at = (d[otm][ok], e[otm][ok], k[otm][ok])
+    cube = np.full(shape + (len(strikes),), np.nan)
+    cube[at] = iv[ok]
+    vegas = np.full_like(cube, np.nan)
+    vegas[at] = vega(S[otm][ok], K[otm][ok], T[otm][ok], iv[ok], r[otm][ok], q[otm][ok])
+
+    slices = {}
+    for name, values in (("S", S), ("r", r), ("q", q), ("T", T)):
+        a = np.full(shape, np.nan)
+        a[d, e] = values
+        slices[name] = a
+    return (np.asarray(dates, dtype="datetime64[D]"), np.asarray(expiries, dtype="datetime64[D]"),
+            np.asarray(strikes, dtype=np.float64), cube, vegas, slices)
+
+
+def fit_smiles(x, iv, weights=None, degree=DEGREE):
+    """
+    Weighted least-squares polynomial σ(x) for every slice: x, iv and
+    weights are (..., K) with NaN where unquoted. Returns (coef
+    (..., degree+1), weighted rmse); slices with fewer than degree+2
+    quotes are NaN.
+    """
+    have = ~np.isnan(iv) & ~np.isnan(x)
+    if weights is not None:
+        have &= ~np.isnan(weights)
+    w = np.where(have, 1.0 if weights is None else weights, 0.0)
+    X = np.where(have[..., None], np.nan_to_num(x)[..., None] ** np.arange(degree + 1), 0.0)
+    G = np.einsum("...kp,...k,...kq->...pq", X, w, X)
+    rhs = np.einsum("...kp,...k->...p", X, w * np.where(have, iv, 0.0))
+    coef = np.einsum("...pq,...q->...p", np.linalg.pinv(G), rhs)
+
+    n = have.sum(axis=-1)
+    resid = np.where(have, iv - np.einsum("...kp,...p->...k", X, coef), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rmse = np.sqrt((w * resid ** 2).sum(axis=-1) / w.sum(axis=-1))
+    ok = n >= degree + 2
+    return np.where(ok[..., None], coef, np.nan), np.where(ok, rmse, np.nan)
+
+
+def smile_vol(coef, x):
+    """σ(x) from fit_smiles coefficients, clipped to the implied_vol search range"""
+    powers = x[..., None] ** np.arange(coef.shape[-1])
+    return np.clip(np.einsum("...kp,...p->...k", powers, coef), SIGMA_LO, SIGMA_HI)
+
+
+def chain_density(chain, price_col="mid", degree=DEGREE, bump=BUMP):
+    """Breeden-Litzenberger density grid for a load_chain frame (see module docstring)"""
+    dates, expiries, strikes, iv, vegas, sl = otm_smiles(chain, price_col)
+    S, r, q, T = (sl[n][..., None] for n in ("S", "r", "q", "T"))
+    F = S * np.exp((r - q) * T)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        coef, rmse = fit_smiles(np.log(strikes / F) / np.sqrt(T), iv, vegas ** 2, degree)
+
+    # Only between the lowest and highest strike quoted in each slice
+    quoted = ~np.isnan(iv)
+    lo = np.where(quoted, strikes, np.inf).min(axis=-1, keepdims=True)
+    hi = np.where(quoted, strikes, -np.inf).max(axis=-1, keepdims=True)
+    inside = (strikes >= lo) & (strikes <= hi) & ~np.isnan(rmse)[..., None]
+
+    h = bump * F
+    with np.errstate(invalid="ignore", divide="ignore"):
+        def call_curve(K):
+            sigma = smile_vol(coef, np.log(K / F) / np.sqrt(T))
+            return price(S, K, T, sigma, r, q)
+
+        c_dn, c_mid, c_up = (call_curve(strikes + s * h) for s in (-1, 0, 1))
+        growth = np.exp(r * T)
+        survival = np.clip(-growth * (c_up - c_dn) / (2 * h), 0.0, 1.0)
+        density = growth * (c_up - 2 * c_mid + c_dn) / (h * h)
+
+    # (D, E, ...) -> ladder layout (E, D, ...)
+    survival = np.where(inside, survival, np.nan).swapaxes(0, 1)
+    grid = {
+        "key": np.datetime_as_string(expiries, unit="D"),
+        "dates": dates,
+        "strikes": strikes,
+        "survival": survival,
+    }
+    grid.update(ladder_pmf(strikes, survival))
+    grid["density"] = np.where(inside, density, np.nan).swapaxes(0, 1)
+    grid["forward"] = F[..., 0].T
+    grid["fit_rmse"] = rmse.T
+    grid["fit"] = np.asarray(f"{price_col}/{degree}")
+    return grid
+
+
+def cached_density(path, name="options_spx", root=DENSITY_DIR, refresh=False,
+                   price_col="mid", degree=DEGREE):
+    """
+    chain_density for a fixture file/directory, reusing the saved grid
+    while it is newer than every chain file and was fitted with the same
+    settings. Returns (grid, from_cache).
+    """
+    from option_chain import chain_files, load_chain
+
+    cache = grid_path(name, root)
+    newest = max(f.stat().st_mtime for f in chain_files(path))
+    if not refresh and cache.exists() and cache.stat().st_mtime >= newest:
+        grid = load_grid(name, root)
+        if str(grid.get("fit")) == f"{price_col}/{degree}":
+            return grid, True
+    grid = chain_density(load_chain(path), price_col, degree)
+    save_grid(grid, name, root)
+    return grid, False
+
+
+def main(argv=None):
+    from implied_moments import ladder_moments
+
+    parser = argparse.ArgumentParser(description="Risk-neutral densities from option chains")
+    parser.add_argument("--chain", required=True, help="CSV/Parquet file or directory of them")
+    parser.add_argument("--name", default="options_spx", help=f"cache name under {DENSITY_DIR}/")
+    parser.add_argument("--price", default="mid", help="price column to fit")
+    parser.add_argument("--degree", type=int, default=DEGREE, help="smile polynomial degree")
+    parser.add_argument("--refresh", action="store_true", help="ignore the cached grid")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"RISK-NEUTRAL DENSITY: {args.chain}")
+    print("=" * 70)
+
+    grid, cached = cached_density(args.chain, args.name, refresh=args.refresh,
+                                  price_col=args.price, degree=args.degree)
+    E, D, K = grid["survival"].shape
+    fitted = ~np.isnan(grid["fit_rmse"])
+    print(f"{E} expiries x {D} dates x {K} strikes, {fitted.sum()} slices fitted"
+          f"{' (cached)' if cached else ''}")
+    print(f"Smile fit rmse: median {np.nanmedian(grid['fit_rmse']):.2e}, "
+          f"max {np.nanmax(grid['fit_rmse']):.2e} (vol points)")
+
+    negative = (grid["density"] < 0).sum()
+    print(f"Negative density at {negative} of {(~np.isnan(grid['density'])).sum()} points")
+
+    # Same moment code as the Kalshi ladders, so the two sides line up
+    moments = ladder_moments(grid["strikes"], grid["survival"])
+    last = D - 1
+    print(f"\nLatest {grid['dates'][last]}:")
+    print(f"{'Expiry':<12} {'Forward':>9} {'Mean':>9} {'Std':>8} {'Skew':>7} {'Tail lo':>8} "
+          f"{'Tail hi':>8}")
+    for i in np.flatnonzero(fitted[:, last]):
+        print(f"{grid['key'][i]:<12} {grid['forward'][i, last]:>9.1f} "
+              f"{moments['mean'][i, last]:>9.1f} {moments['std'][i, last]:>8.1f} "
+              f"{moments['skew'][i, last]:>7.2f} {moments['tail_lo'][i, last]:>8.3f} "
+              f"{moments['tail_hi'][i, last]:>8.3f}")
+
+    print(f"\n✓ {'Loaded' if cached else 'Saved'} {grid_path(args.name)}")
+    return grid
+
+
+if __name__ == "__main__":
+    main()
@@ -65,8 +65,8 @@ def main():
     print("=" * 70)
     print("\nGenerated files:")
     print("  Data:")
-    print("    - data/kalshi_threshold_panel.csv")
-    print("    - data/yahoo_iv_proxy.csv")
+    print("    - data/store/kalshi/series=KXCPICOREYOY/")
+    print("    - data/store/yahoo/")
     print("  Plots:")
     print("    - outputs/kalshi_signal.png")
     print("    - outputs/iv_proxy.png")
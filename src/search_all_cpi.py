@@ -1,22 +1,24 @@
 import requests
 from collections import defaultdict
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from market_catalog import get_catalog
 
 print("Searching ALL markets for CPI-related data...")
 print("=" * 80)
 
-# Get as many markets as possible
-r = requests.get(f"{BASE}/markets", params={"limit": 1000}, timeout=30)
+# Bring the local catalog up to date (only changed markets are re-paged)
+catalog = get_catalog()
+error = None
+try:
+    catalog.sync()
+except requests.exceptions.RequestException as e:
+    error = e
 
-if r.status_code == 200:
-    markets = r.json().get("markets", [])
-    
+if error is None:
     # Find CPI markets
-    cpi_markets = [m for m in markets if 'cpi' in m.get('title', '').lower() 
-                   or 'cpi' in m.get('ticker', '').lower()]
+    cpi_markets = catalog.search("cpi OR kxcpi*").to_dict("records")
     
-    print(f"Total markets: {len(markets)}")
+    print(f"Total markets: {catalog.count()}")
     print(f"CPI markets: {len(cpi_markets)}\n")
     
     # Group by status
@@ -59,7 +61,7 @@ if r.status_code == 200:
     
     keywords = ['inflation', 'fed', 'rate', 'unemployment', 'jobs']
     for keyword in keywords:
-        matches = [m for m in markets if keyword in m.get('title', '').lower()]
+        matches = catalog.search(f"title:{keyword}*").to_dict("records")
         if matches:
             settled = [m for m in matches if m.get('status') in ['settled', 'closed', 'finalized']]
             print(f"\n{keyword.upper()}: {len(matches)} total, {len(settled)} settled")
@@ -67,4 +69,4 @@ if r.status_code == 200:
                 print(f"  Example: {settled[0].get('title')[:70]}")
                 print(f"  Series: {settled[0].get('series_ticker')}")
 else:
-    print(f"Error: {r.text}")
+    print(f"Error: {error}")
@@ -1,7 +1,7 @@
 import requests
 from datetime import datetime, timezone, timedelta
 
-BASE = "https://api.elections.kalshi.com/trade-api/v2"
+from kalshi_client import BASE
 
 # Try a recent finalized market
 ticker = "KXCPICOREYOY-25DEC-T2.9"
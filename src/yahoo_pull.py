@@ -1,85 +1,231 @@
+"""
+Yahoo Finance Pull
+One batched, threaded download for every ticker, extending an on-disk
+per-ticker cache (data/cache/yahoo/<NAME>.parquet) only past its last
+stored date. The first run backfills from START; later runs fetch a few
+days. The data source is pluggable, so a FixtureSource can stand in for
+yfinance.
+
+    python src/yahoo_pull.py
+    python src/yahoo_pull.py --fixtures path/to/csvs   # offline
+"""
+
+import argparse
+import time
 from pathlib import Path
 import pandas as pd
 import yfinance as yf
 
+from panel_store import STORE_DIR, YAHOO, write_iv
+from request_metrics import get_metrics
+
 START = "2020-01-01"
+CACHE_DIR = "data/cache/yahoo"
 TICKERS = {
     "VIX": "^VIX",
     "SPX": "^GSPC",
     "VIX9D": "^VIX9D",
     "VIX1D": "^VIX1D",
+    "VIX3M": "^VIX3M",
+    "VIX6M": "^VIX6M",
+    "VVIX": "^VVIX",
 }
 
+
+class YFinanceSource:
+    """Batched yf.download: one call, fetched on yfinance's thread pool"""
+
+    def download(self, symbols, start):
+        """{symbol: close Series indexed by date} for symbols with data"""
+        metrics = get_metrics()
+        t0 = time.perf_counter()
+        try:
+            df = yf.download(list(symbols), start=start, progress=False, threads=True,
+                             group_by="column", auto_adjust=False, multi_level_index=True)
+        except Exception as e:
+            metrics.record("yahoo", "download", type(e).__name__, time.perf_counter() - t0)
+            raise
+
+        # yfinance hides the raw response; frame size stands in for payload bytes
+        empty = df is None or df.empty
+        metrics.record("yahoo", "download", "empty" if empty else "ok",
+                       time.perf_counter() - t0,
+                       nbytes=0 if empty else df.memory_usage(deep=True).sum())
+        if empty:
+            return {}
+
+        field = "Adj Close" if "Adj Close" in df.columns.get_level_values(0) else "Close"
+        closes = df[field]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(symbols[0])
+
+        out = {}
+        for sym in symbols:
+            if sym in closes.columns:
+                s = closes[sym].dropna()
+                if not s.empty:
+                    s.index = pd.to_datetime(s.index).date
+                    out[sym] = s.astype("float64")
+        return out
+
+
+class FixtureSource:
+    """
+    Local CSV fixtures for tests and offline runs: <dir>/<symbol without ^>.csv
+    with date and close columns.
+    """
+
+    def __init__(self, directory):
+        self.dir = Path(directory)
+
+    def download(self, symbols, start):
+        start = pd.Timestamp(start).date()
+        out = {}
+        for sym in symbols:
+            path = self.dir / f"{sym.lstrip('^')}.csv"
+            if not path.exists():
+                continue
+            df = pd.read_csv(path, parse_dates=["date"])
+            s = pd.Series(df["close"].to_numpy(dtype="float64"), index=df["date"].dt.date)
+            s = s[s.index >= start].dropna()
+            if not s.empty:
+                out[sym] = s
+        return out
+
+
 def ensure_data_dir():
     Path("data").mkdir(exist_ok=True)
 
-def main():
+
+def _cache_path(name, cache_dir=CACHE_DIR):
+    return Path(cache_dir) / f"{name}.parquet"
+
+
+def load_cached(name, cache_dir=CACHE_DIR):
+    """Cached closes for one ticker as a date-indexed Series (empty if none)"""
+    path = _cache_path(name, cache_dir)
+    if not path.exists():
+        return pd.Series(dtype="float64", name=name)
+    df = pd.read_parquet(path)
+    return pd.Series(df["close"].to_numpy(), index=list(df["date"]), name=name)
+
+
+def save_cached(name, closes, cache_dir=CACHE_DIR):
+    path = _cache_path(name, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    pd.DataFrame({"date": list(closes.index), "close": closes.to_numpy()}).to_parquet(
+        tmp, index=False)
+    tmp.replace(path)
+
+
+def refresh(tickers=TICKERS, source=None, start=START, cache_dir=CACHE_DIR):
+    """
+    Extend every ticker's cache past its last stored date. Tickers needing
+    the same start date share one batched download (normally that is all
+    of them, so adding tickers adds no round trips). The last cached day is
+    fetched again in case it was a partial session.
+
+    Returns ({name: closes}, earliest changed date or None).
+    """
+    source = source or YFinanceSource()
+    cached = {name: load_cached(name, cache_dir) for name in tickers}
+
+    starts = {}
+    for name, sym in tickers.items():
+        s = cached[name]
+        since = str(max(s.index)) if not s.empty else start
+        starts.setdefault(since, []).append(sym)
+
+    by_symbol = {sym: name for name, sym in tickers.items()}
+    changed_from = None
+
+    for since, symbols in sorted(starts.items()):
+        print(f"Fetching {len(symbols)} tickers from {since}: {', '.join(symbols)}")
+        fetched = source.download(symbols, since)
+
+        for sym in symbols:
+            name = by_symbol[sym]
+            new = fetched.get(sym)
+            if new is None or new.empty:
+                print(f"  {name}: ✗ no data")
+                continue
+
+            old = cached[name]
+            overlap = new.index.isin(old.index)
+            added = int((~overlap).sum())
+            revised = bool((old.reindex(new.index[overlap]) != new[overlap]).any())
+            if not added and not revised:
+                print(f"  {name}: up to date ({max(old.index)})")
+                continue
+
+            merged = pd.concat([old[~old.index.isin(new.index)], new]).sort_index()
+            merged.name = name
+            cached[name] = merged
+            save_cached(name, merged, cache_dir)
+
+            first = min(new.index[~overlap]) if added else min(new.index[overlap])
+            changed_from = first if changed_from is None else min(changed_from, first)
+            print(f"  {name}: ✓ {added} new days (through {max(merged.index)})")
+
+    return cached, changed_from
+
+
+def build_panel(closes):
+    """Wide date x ticker frame from per-ticker closes"""
+    frames = [s.rename(name) for name, s in closes.items() if not s.empty]
+    if not frames:
+        return pd.DataFrame()
+    out = pd.concat(frames, axis=1).sort_index()
+    out.index.name = "date"
+    return out.reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pull VIX term structure and SPX from Yahoo")
+    parser.add_argument("--fixtures", help="read CSV fixtures from this directory instead")
+    parser.add_argument("--full", action="store_true", help="rewrite the whole store panel")
+    parser.add_argument("--metrics-out",
+                        help="also write request metrics here (.json, or .prom for Prometheus text)")
+    args = parser.parse_args(argv)
+    metrics = get_metrics()
+
     print("=" * 60)
     print("Yahoo Finance Data Pull Started")
     print("=" * 60)
-    
+
     ensure_data_dir()
-    
-    print(f"\nFetching data from {START} to present...")
-    print(f"Tickers to fetch: {list(TICKERS.keys())}")
-    
-    dfs = []
-    
-    for name, tkr in TICKERS.items():
-        print(f"\nFetching {name} ({tkr})...", end=" ")
-        
-        try:
-            df = yf.download(tkr, start=START, progress=False)
-            
-            if df.empty:
-                print("✗ No data available")
-                continue
-            
-            # Handle multi-level columns from yfinance
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.droplevel(1)
-            
-            if "Adj Close" in df.columns:
-                series = df["Adj Close"].copy()
-            elif "Close" in df.columns:
-                series = df["Close"].copy()
-            else:
-                print(f"✗ No price column found")
-                continue
-            
-            series.name = name
-            dfs.append(series.to_frame())
-            
-            print(f"✓ {len(df)} days")
-            
-        except Exception as e:
-            print(f"✗ Error: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
-    
-    if not dfs:
+    print(f"Tickers: {list(TICKERS.keys())}\n")
+
+    source = FixtureSource(args.fixtures) if args.fixtures else YFinanceSource()
+    closes, changed_from = refresh(TICKERS, source)
+
+    metrics.summary()
+    if args.metrics_out:
+        metrics.dump(args.metrics_out)
+
+    out = build_panel(closes)
+    if out.empty:
         print("\nERROR: No data retrieved from Yahoo Finance")
         return
-    
-    print("\nCombining data...")
-    out = pd.concat(dfs, axis=1)
-    
-    out.index = pd.to_datetime(out.index).date
-    out = out.reset_index()
-    out = out.rename(columns={"index": "date"})
-    
+
     print(f"\nData shape: {out.shape}")
     print(f"Columns: {out.columns.tolist()}")
     print(f"Date range: {out['date'].min()} to {out['date'].max()}")
-    
-    out_path = "data/yahoo_iv_proxy.csv"
-    out.to_csv(out_path, index=False)
-    
-    print(f"\n✓ Saved to {out_path}")
-    print("\nSample data:")
-    print(out.head(10))
-    
+
+    if args.full:
+        write_iv(out)
+    elif changed_from is not None:
+        # The store upserts by date and rewrites only the months touched
+        write_iv(out[out["date"] >= changed_from], replace=False)
+    else:
+        print("\nNothing new; store left as is")
+        return
+
+    print(f"\n✓ Saved to {STORE_DIR}/{YAHOO}")
+    print("\nLatest data:")
+    print(out.tail(5))
+
     print("\n" + "=" * 60)
     print("Yahoo Finance data pull complete!")
     print("=" * 60)